@@ -0,0 +1,113 @@
+"""
+Filter engine benchmark.
+
+Imports a synthetic sponsor register and times the first page plus result
+count of a set of filters with the SQLite engine and the columnar (NumPy)
+engine. Memory is the Python heap retained by the columnar index, measured
+with tracemalloc, against the SQLite database file the SQL engine pages
+through its page cache.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_filter_engines.py [--rows N] [--repeat N]
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import tracemalloc
+
+from benchmarks.bench_ingest import write_register
+from models.transform_model import TransformDB
+from models.sponsor_query import SponsorFilter, SponsorQueryBuilder
+
+FILTERS = [
+    SponsorFilter(),
+    SponsorFilter(organisation="h"),
+    SponsorFilter(organisation="care"),
+    SponsorFilter(organisation="digital 12"),
+    SponsorFilter(city="lee"),
+    SponsorFilter(city="leeds", exact_city=True),
+    SponsorFilter(organisation="ca", city="b"),
+]
+LIMIT = 51
+
+
+def best_ms(run, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def time_filter(conn, builder, index, sponsor_filter, repeat):
+    """First page plus count of a filter with both engines"""
+    query, params, count_query, count_params = builder.build(
+        sponsor_filter, None, LIMIT
+    )
+
+    def run_sqlite():
+        conn.execute(query, params).fetchall()
+        return conn.execute(count_query, count_params).fetchone()[0]
+
+    def run_columnar():
+        return index.page(sponsor_filter, None, LIMIT)[1]
+
+    total = run_sqlite()
+    assert total == run_columnar(), f"Engines disagree on {sponsor_filter}"
+    return total, best_ms(run_sqlite, repeat), best_ms(run_columnar, repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sponsor filter engines")
+    parser.add_argument("--rows", type=int, default=120_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        csv_path = os.path.join(tempdir, "sponsors.csv")
+        write_register(csv_path, args.rows)
+        transform_db = TransformDB(
+            csv_path=csv_path, db_path=os.path.join(tempdir, "sponsors.db")
+        )
+        transform_db.import_csv()
+        conn = sqlite3.connect(transform_db.db_path)
+        builder = SponsorQueryBuilder(conn)
+
+        from models.columnar_index import ColumnarIndex  # Imports numpy
+
+        start = time.perf_counter()
+        index = ColumnarIndex.load(conn, builder.generation)
+        load_seconds = time.perf_counter() - start
+        del index
+        tracemalloc.start()
+        index = ColumnarIndex.load(conn, builder.generation)
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        db_mib = os.path.getsize(transform_db.db_path) / 1024 / 1024
+        print(f"{args.rows} rows")
+        print(
+            f"columnar index: loaded in {load_seconds:.2f} s, "
+            f"{retained / 1024 / 1024:.1f} MiB retained, "
+            f"{peak / 1024 / 1024:.1f} MiB peak"
+        )
+        print(f"sqlite database: {db_mib:.1f} MiB on disk")
+        print(f"{'filter':40} {'results':>8} {'sqlite ms':>10} {'columnar ms':>12}")
+        for sponsor_filter in FILTERS:
+            total, sqlite_ms, columnar_ms = time_filter(
+                conn, builder, index, sponsor_filter, args.repeat
+            )
+            label = (
+                f"{sponsor_filter.organisation!r} / {sponsor_filter.city!r}"
+                f"{' exact' if sponsor_filter.exact_city else ''}"
+            )
+            print(f"{label:40} {total:8} {sqlite_ms:10.2f} {columnar_ms:12.2f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Ingest engine benchmark.
+
+Imports a synthetic sponsor register with each TransformDB engine in a fresh
+process and reports wall time (including the engine's imports), peak RSS and
+the installed size of the packages the engine pulls into a desktop bundle.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_ingest.py [--rows N]
+"""
+
+import os
+import sys
+import csv
+import random
+import argparse
+import tempfile
+import subprocess
+import importlib.util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENGINE_PACKAGES = {"native": [], "pandas": ["pandas", "numpy"]}
+
+RUN_ENGINE = """
+import sys, time, resource
+start = time.perf_counter()
+from models.transform_model import TransformDB
+engine, csv_path, db_path = sys.argv[1:4]
+TransformDB(csv_path=csv_path, db_path=db_path, engine=engine).import_csv()
+elapsed = time.perf_counter() - start
+peak_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(f"{elapsed:.3f} {peak_kib}")
+"""
+
+
+def write_register(path, rows):
+    """Writes a register shaped like the Home Office csv"""
+    rng = random.Random(42)
+    words = "care tech health nursing agency services group digital home".split()
+    cities = ["London", "Manchester", "Leeds", "Birmingham", "Bristol", "Glasgow"]
+    ratings = ["Worker (A rating)", "Worker (B rating)", "Temporary Worker (A rating)"]
+    routes = ["Skilled Worker", "Global Business Mobility: Senior or Specialist Worker"]
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(
+            ["Organisation Name", "Town/City", "County", "Type & Rating", "Route"]
+        )
+        for i in range(rows):
+            name = " ".join(rng.choice(words).title() for _ in range(3))
+            writer.writerow(
+                [
+                    f"{name} {i} Ltd",
+                    rng.choice(cities),
+                    rng.choice(["", "Kent", "Essex"]),
+                    rng.choice(ratings),
+                    rng.choice(routes),
+                ]
+            )
+
+
+def package_size_mib(package):
+    spec = importlib.util.find_spec(package)
+    if spec is None or not spec.submodule_search_locations:
+        return 0.0
+    total = 0
+    for root, _, files in os.walk(spec.submodule_search_locations[0]):
+        total += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return total / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare TransformDB engines")
+    parser.add_argument("--rows", type=int, default=120_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        csv_path = os.path.join(tempdir, "sponsors.csv")
+        write_register(csv_path, args.rows)
+        print(
+            f"{args.rows} rows, {os.path.getsize(csv_path) / 1024 / 1024:.1f} MiB csv"
+        )
+        print(f"{'engine':8} {'seconds':>8} {'peak RSS MiB':>13} {'bundle MiB':>11}")
+        for engine, packages in ENGINE_PACKAGES.items():
+            db_path = os.path.join(tempdir, f"{engine}.db")
+            result = subprocess.run(
+                [sys.executable, "-c", RUN_ENGINE, engine, csv_path, db_path],
+                cwd=ROOT,
+                env=dict(os.environ, PYTHONPATH=ROOT),
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            seconds, peak_kib = result.stdout.split()
+            bundle = sum(package_size_mib(package) for package in packages)
+            print(
+                f"{engine:8} {float(seconds):8.2f} {int(peak_kib) / 1024:13.1f} "
+                f"{bundle:11.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
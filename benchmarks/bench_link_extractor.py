@@ -0,0 +1,69 @@
+"""
+Micro-benchmark for resolving the sponsor csv link from the publication page.
+
+Compares the previous BeautifulSoup DOM approach with the incremental
+find_csv_link parser on the saved html fixtures (parse time and peak memory).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_link_extractor.py [html files...]
+"""
+
+import os
+import sys
+import glob
+import timeit
+import tracemalloc
+from models.sponsor_model import CSV_LINK_MARKER, find_csv_link
+
+FIXTURES = glob.glob(
+    os.path.join(os.path.dirname(__file__), "..", "tests", "fixtures", "*.html")
+)
+CHUNK_SIZE = 16384
+REPEAT = 50
+
+
+def soup_link(html):
+    from bs4 import BeautifulSoup  # pylint: disable=import-outside-toplevel
+
+    soup = BeautifulSoup(html, "html.parser")
+    for link in soup.find_all("a", href=True):
+        if CSV_LINK_MARKER in link["href"]:
+            return link["href"]
+    return None
+
+
+def streaming_link(html):
+    return find_csv_link(
+        html[i : i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE)
+    )
+
+
+def measure(func, html):
+    seconds = min(timeit.repeat(lambda: func(html), number=1, repeat=REPEAT))
+    tracemalloc.start()
+    func(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds * 1000, peak / 1024
+
+
+def main(paths):
+    try:
+        import bs4  # pylint: disable=import-outside-toplevel,unused-import
+
+        candidates = [("bs4", soup_link), ("streaming", streaming_link)]
+    except ImportError:
+        print("bs4 not installed, only the streaming parser is measured")
+        candidates = [("streaming", streaming_link)]
+
+    print(f"{'fixture':40} {'parser':10} {'ms':>8} {'peak KiB':>10}")
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            html = f.read()
+        for name, func in candidates:
+            ms, kib = measure(func, html)
+            print(f"{os.path.basename(path):40} {name:10} {ms:8.2f} {kib:10.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or FIXTURES)
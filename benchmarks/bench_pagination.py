@@ -0,0 +1,89 @@
+"""
+Pagination benchmark.
+
+Imports a synthetic sponsor register and times loading page N with the old
+LIMIT/OFFSET query against the keyset seek used by the sponsor table.
+Keyset bookmarks are collected by paging forward once, as Ctrl+N does.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_pagination.py [--rows N] [--repeat N]
+"""
+
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+
+from benchmarks.bench_ingest import write_register
+from models.transform_model import TransformDB
+from models.sponsor_query import (
+    DISPLAY_COLUMNS,
+    KeysetPager,
+    SponsorFilter,
+    SponsorQueryBuilder,
+)
+
+PAGE_SIZE = 50
+
+
+def best_ms(conn, query, params, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(query, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare OFFSET and keyset pages")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        csv_path = os.path.join(tempdir, "sponsors.csv")
+        write_register(csv_path, args.rows)
+        transform_db = TransformDB(
+            csv_path=csv_path, db_path=os.path.join(tempdir, "sponsors.db")
+        )
+        transform_db.import_csv()
+        conn = sqlite3.connect(transform_db.db_path)
+
+        builder = SponsorQueryBuilder(conn)
+        pager = KeysetPager(PAGE_SIZE)
+        sponsor_filter = SponsorFilter()
+        bookmarks = {}
+        while True:
+            bookmarks[pager.page] = pager.after
+            query, params, _, _ = builder.build(
+                sponsor_filter, pager.after, pager.limit
+            )
+            pager.record(conn.execute(query, params).fetchall())
+            if not pager.next():
+                break
+        last_page = pager.page
+
+        offset_query = (
+            f"SELECT {', '.join(DISPLAY_COLUMNS)} FROM sponsors "
+            f"ORDER BY organisation_name, id LIMIT ? OFFSET ?"
+        )
+        print(f"{args.rows} rows, {last_page + 1} pages of {PAGE_SIZE}")
+        print(f"{'page':>8} {'offset ms':>10} {'keyset ms':>10}")
+        pages = [0, 10, 100, 1000, last_page // 2, last_page]
+        # Smaller registers have fewer pages than the fixed ones
+        for page in sorted({page for page in pages if page <= last_page}):
+            offset_ms = best_ms(
+                conn, offset_query, [PAGE_SIZE, page * PAGE_SIZE], args.repeat
+            )
+            query, params, _, _ = builder.build(
+                sponsor_filter, bookmarks[page], PAGE_SIZE + 1
+            )
+            keyset_ms = best_ms(conn, query, params, args.repeat)
+            print(f"{page + 1:>8} {offset_ms:10.2f} {keyset_ms:10.2f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+Startup timing harness.
+
+Measures
+- the import cost of every module pulled in by `import main` (python -X importtime)
+- the wall-clock time from interpreter start to the first paint of the main
+  window under the offscreen Qt platform
+
+and exits with status 1 if either goes over its budget. Runs in a throwaway HOME
+so the real ~/.TSA data is not touched.
+
+Usage:
+    PYTHONPATH=. python benchmarks/startup_budget.py [--import-budget-ms N]
+        [--paint-budget-ms N] [--top N]
+"""
+
+import os
+import sys
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_MS = 600
+PAINT_BUDGET_MS = 1500
+# Modules that must stay off the startup path
+LAZY_MODULES = ("pandas", "numpy", "requests", "bs4", "markdown2")
+
+FIRST_PAINT_PROBE = """
+import os, sys, time
+start = time.perf_counter()
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import QApplication
+import main
+from controllers.main_controller import TSAController
+
+app = QApplication(sys.argv)
+window = TSAController()
+window.show()
+
+def painted():
+    print(f"{(time.perf_counter() - start) * 1000:.1f}")
+    sys.stdout.flush()
+    os._exit(0)  # Do not wait for the ingest worker
+
+QTimer.singleShot(0, painted)
+app.exec()
+"""
+
+
+def isolated_env(home):
+    env = dict(os.environ, HOME=home, QT_QPA_PLATFORM="offscreen", PYTHONPATH=ROOT)
+    data_dir = os.path.join(home, ".TSA", "data")
+    os.makedirs(data_dir, exist_ok=True)
+    with open(os.path.join(data_dir, "settings.json"), "w", encoding="utf-8") as f:
+        f.write('{"check_for_release": false}')
+    return env
+
+
+def import_times(env):
+    """
+    Returns:
+        dict: module name -> (self_us, cumulative_us) for `import main`
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def first_paint_ms(env):
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_PAINT_PROBE],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+        timeout=60,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--import-budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--paint-budget-ms", type=float, default=PAINT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = isolated_env(home)
+        times = import_times(env)
+        paint_ms = first_paint_ms(env)
+
+    top_level = {}
+    for name, (_, cumulative) in times.items():
+        package = name.lstrip().split(".")[0]
+        top_level[package] = max(top_level.get(package, 0), cumulative)
+    print(f"{'module':30} {'cumulative ms':>14}")
+    for package, cumulative in sorted(top_level.items(), key=lambda x: -x[1])[
+        : args.top
+    ]:
+        print(f"{package:30} {cumulative / 1000:14.1f}")
+
+    import_ms = times["main"][1] / 1000
+    eager = [name for name in LAZY_MODULES if name in top_level]
+    print(f"\nimport main: {import_ms:.1f} ms (budget {args.import_budget_ms} ms)")
+    print(f"first paint: {paint_ms:.1f} ms (budget {args.paint_budget_ms} ms)")
+
+    failures = []
+    if import_ms > args.import_budget_ms:
+        failures.append("import budget exceeded")
+    if paint_ms > args.paint_budget_ms:
+        failures.append("first paint budget exceeded")
+    if eager:
+        failures.append(f"imported on startup: {', '.join(eager)}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -23,10 +23,24 @@ DEFAULT_SETTINGS = {
     "log_rotation_limit": 5,
     "log_level": "INFO",
     "check_for_release": True,
+    "ingest_chunk_size": 5000,
+    "release_check_interval_hours": 24,
+    # Show an estimated result count at once and the exact count when ready
+    "estimate_counts": False,
+    # "columnar" filters an in-memory NumPy copy of the table instead of SQLite
+    "filter_engine": "sqlite",
+    # Last GitHub release response: etag, checked_at (epoch seconds) and release
+    "release_cache": {},
 }
 
 LOG_ROTATION_LIMIT = 5
 
+# Quiet time after the last keystroke before the sponsor table is filtered
+SEARCH_DEBOUNCE_MS = 250
+
+# "sqlite" filters the sponsor table with SQL, "columnar" with NumPy
+FILTER_ENGINES = ("sqlite", "columnar")
+
 # Github release api endpoint and version is used for auto check for new releases
 GITHUB_REL = "https://api.github.com/repos/ugurserhattoy/TSA/releases/latest"
 VERSION = "v0.6.1"
@@ -0,0 +1,160 @@
+"""
+Applications screen of the main window.
+
+Lists the applications made to the selected sponsor and adds, edits and
+deletes them. Keeps the organisation city pairs with applications, used to
+highlight and filter the sponsor table.
+"""
+
+from PyQt6.QtWidgets import QTableWidgetItem
+from views.application_view import ApplicationFormView
+from views.application_view import confirm_delete
+from controllers.action_handlers import setup_applications_shortcuts, get_cell_text
+
+
+class ApplicationsController:
+    def __init__(self, window, data_manager, search):
+        self.window = window
+        self.view = window.view
+        self.data_manager = data_manager
+        self.search = search
+        # Applications organisation city pair
+        self.application_pairs: set = self.data_manager.get_applications_pairs()
+        self.current_organisation_name = None
+        self.current_city = None
+        self.current_org_row = None
+        self.current_org_col = None
+
+    def adjust_col_widths(self):
+        self.view.applications_table_view.adjust_applications_column_widths(
+            self.view.applications_table.viewport().width()
+        )
+
+    def open_applications_view(self, row, col):
+        self.set_current_organisation(row, col)
+        self.show_applications_view()
+        applications = self.data_manager.get_applications(
+            self.current_organisation_name, self.current_city
+        )
+        self.fill_applications_table(applications)
+        self.setup_applications_signals()
+        setup_applications_shortcuts(
+            self.view,
+            self.window.show_sponsor_table,
+            self.edit_application,
+            self.add_application,
+            self.delete_application,
+        )
+        # setup_enter_action(self.view.applications_table, self.edit_application)
+
+    def set_current_organisation(self, row, col):
+        org_item = self.view.sponsor_table.item(row, 0)
+        city_item = self.view.sponsor_table.item(row, 1)
+        if org_item and city_item:
+            self.current_organisation_name = org_item.text()
+            self.current_city = city_item.text()
+            self.current_org_row = row
+            self.current_org_col = col
+        else:
+            self.current_organisation_name = None
+            self.current_city = None
+
+    def fill_applications_table(self, applications):
+        table = self.view.applications_table_view.table
+        table.setRowCount(len(applications))
+        for row_idx, app_row in enumerate(applications):
+            for col_idx, value in enumerate(app_row):
+                item = QTableWidgetItem(str(value))
+                if col_idx == 6 and str(value).strip():
+                    item.setToolTip(str(value))
+                table.setItem(row_idx, col_idx, item)
+
+    def setup_applications_signals(self):
+        try:
+            self.view.back_button.clicked.disconnect()
+            self.view.edit_button.clicked.disconnect()
+            self.view.add_new_button.clicked.disconnect()
+            self.view.delete_button.clicked.disconnect()
+            self.view.applications_table_view.table.cellDoubleClicked.disconnect()
+        except TypeError:
+            pass
+        self.view.back_button.clicked.connect(self.window.show_sponsor_table)
+        self.view.add_new_button.clicked.connect(self.add_application)
+        self.view.edit_button.clicked.connect(self.edit_application)
+        self.view.delete_button.clicked.connect(self.delete_application)
+        self.view.applications_table_view.table.cellDoubleClicked.connect(
+            self.edit_application
+        )
+
+    def show_applications_view(self):
+        self.view.applications_table_view.setup_applications_table()
+        self.view.stacked_widget.setCurrentIndex(1)
+        self.adjust_col_widths()
+
+    def add_application(self):
+        """
+        Opens a dialog to add a new application for the selected organisation.
+        """
+        org = self.current_organisation_name
+        city = self.current_city
+
+        dialog = ApplicationFormView(org, city)
+        if dialog.exec():
+            data = dialog.get_form_data()
+            self.data_manager.add_application(org, city, **data)
+            self.applications_changed((org, city), applied=True)
+            self.open_applications_view(self.current_org_row, self.current_org_col)
+
+    def edit_application(self):
+        """Opens a dialog to edit the selected application entry."""
+        selected_row = self.view.applications_table_view.table.currentRow()
+        if selected_row < 0:
+            return  # No Selection No Action
+        table = self.view.applications_table_view.table
+
+        application_id = get_cell_text(table, selected_row, 0)
+        org = get_cell_text(table, selected_row, 1)
+        city = get_cell_text(table, selected_row, 2)
+        role = get_cell_text(table, selected_row, 3)
+        date = get_cell_text(table, selected_row, 4)
+        contact = get_cell_text(table, selected_row, 5)
+        note = get_cell_text(table, selected_row, 6)
+
+        dialog = ApplicationFormView(org, city, role, date, contact, note)
+        if dialog.exec():
+            data = dialog.get_form_data()
+            self.data_manager.update_application(application_id, org, city, **data)
+            self.open_applications_view(self.current_org_row, self.current_org_col)
+
+    def delete_application(self):
+        """
+        Deletes the selected application entry.
+        """
+        table = self.view.applications_table_view.table
+        selected_row = table.currentRow()
+        if selected_row < 0:
+            return  # No Selection No Action
+        id_item = table.item(selected_row, 0)
+        if id_item is None:
+            return  # No ID found, do nothing
+        application_id = id_item.text()
+        org = table.item(selected_row, 1).text()
+        city = table.item(selected_row, 2).text()
+        role = table.item(selected_row, 3).text()
+
+        if confirm_delete(self.window):
+            self.data_manager.delete_application(application_id, org, role)
+            if not self.data_manager.get_applications(org, city):
+                self.applications_changed((org, city), applied=False)
+            # Table update
+            self.open_applications_view(self.current_org_row, self.current_org_col)
+
+    def applications_changed(self, pair, applied):
+        """Records whether a sponsor has applications, for highlighting and filters"""
+        if (pair in self.application_pairs) == applied:
+            return
+        if applied:
+            self.application_pairs.add(pair)
+        else:
+            self.application_pairs.discard(pair)
+        self.search.applications_changed()
@@ -1,9 +1,10 @@
 import sqlite3
 import logging
-from models.sponsor_model import CSVManager
+from models.sponsor_model import CSVManager, IngestCancelled
 from models.transform_model import TransformDB
 from models.applications_model import ApplicationsModel
-from config import DB_PATH
+from models.settings_model import SettingsManager
+from config import DB_PATH, SETTINGS_PATH
 
 
 logger = logging.getLogger()
@@ -17,16 +18,48 @@ class DataManager:
         self.conn = None
         self.app_model = ApplicationsModel()
 
-    def prepare_database(self):
-        csv_manager = CSVManager()
-        csv_manager.download_csv()
+    def open_database(self):
+        """
+        Opens the connection used by the UI. WAL mode lets the UI keep reading
+        the current sponsors table while an import is written in the background.
+        """
+        self.conn = self.connect_database()
+        return self.conn
 
-        transform_db = TransformDB()
-        df = transform_db.clean_and_transform_csv()
-        transform_db.save_as_sqlite(df, DB_PATH)
+    @staticmethod
+    def connect_database():
+        """New WAL connection, for workers that query off the GUI thread."""
+        conn = sqlite3.connect(DB_PATH)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
 
-        self.conn = sqlite3.connect(DB_PATH)
-        return self.conn
+    def has_sponsors(self):
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sponsors'"
+        )
+        return cursor.fetchone() is not None
+
+    def prepare_database(self, progress=None, cancelled=None):
+        """
+        Downloads and imports the sponsor csv.
+        Runs on the ingest worker, progress callback receives step messages.
+        Raises IngestCancelled soon after cancelled starts returning True.
+
+        Returns:
+            bool: True if the sponsors table was updated
+        """
+        report = progress or (lambda message: None)
+        report("Checking sponsor register...")
+        csv_manager = CSVManager()
+        csv_manager.download_csv(cancelled)
+        if cancelled and cancelled():
+            raise IngestCancelled("Ingest cancelled")
+
+        report("Importing sponsor register...")
+        chunk_size = SettingsManager(SETTINGS_PATH).get_ingest_chunk_size()
+        transform_db = TransformDB(db_path=DB_PATH, chunk_size=chunk_size)
+        return transform_db.import_csv(progress=report, cancelled=cancelled)
 
     def get_applications(self, organisation_name, city):
         return self.app_model.get_applications_by_organisation(organisation_name, city)
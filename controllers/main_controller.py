@@ -12,6 +12,9 @@ Key Components:
 - NavigationManager: Manages pagination and result information display
 - MenuManager: Controls menu-related actions and signals
 - LogsViewer: Displays log file content in a separate window
+- SponsorSearch: Applies filters page by page and runs the work behind them
+- ApplicationsController: Runs the applications screen
+- ReleaseChecker: Checks for a newer release
 
 The TSAController class is the main entry point,
 tying together UI initialization and application logic.
@@ -19,29 +22,22 @@ tying together UI initialization and application logic.
 
 import logging
 
-from PyQt6.QtGui import QColor, QBrush
-from PyQt6.QtWidgets import (
-    QMainWindow,
-    QTableWidgetItem,
-)
-from config import DB_PATH, SETTINGS_PATH, VERSION, RES_SETTINGS
+from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtWidgets import QMainWindow
+from config import DB_PATH, SETTINGS_PATH, RES_SETTINGS, SEARCH_DEBOUNCE_MS
 from models.settings_model import SettingsManager
-from views.application_view import ApplicationFormView
-from views.application_view import confirm_delete
+from models.sponsor_query import DISPLAY_COLUMNS, SponsorFilter, SponsorSort
 from views.main_view import MainView
 from views.navigation_view import NavigationManager
 from views.menu_view import MenuManager
 from views.logs_viewer import LogsViewer
 from views.settings_view import SettingsUI
-from views.update_view import UpdateView
 from controllers.data_controller import DataManager
-from controllers.action_handlers import (
-    setup_main_shortcuts,
-    setup_applications_shortcuts,
-    setup_main_enter_action,
-    get_cell_text,
-)
-from utils.update_checker import fetch_latest_release
+from controllers.workers import IngestWorker, start_worker
+from controllers.sponsor_search import SponsorSearch
+from controllers.applications_controller import ApplicationsController
+from controllers.release_controller import ReleaseChecker
+from controllers.action_handlers import setup_main_shortcuts, setup_main_enter_action
 
 
 logger = logging.getLogger()
@@ -54,6 +50,8 @@ class TSAController(QMainWindow):
     Initializes the main window, sets up UI components,
     connects user interactions to logic,
     and handles loading and updating sponsor and application data.
+    Filtering and paging run in SponsorSearch, the applications screen in
+    ApplicationsController.
     """
 
     def __init__(self):
@@ -67,33 +65,53 @@ class TSAController(QMainWindow):
         self.setWindowTitle("TSA - Track Sponsored Applications")
         self.setGeometry(*RES_SETTINGS)
         self.data_manager = DataManager()
-        self.conn = self.data_manager.prepare_database()
-        self.data_manager.conn = self.conn
+        self.ingest_thread = None
+        self.ingest_worker = None
 
         # Initialize SettingsManager
         self.settings = SettingsManager(SETTINGS_PATH)
+        self.release_checker = ReleaseChecker(self, self.settings)
 
         self.logs_viewer = None
         self.settings_ui = None
-        self.current_page = 0
-        self.current_organisation_name = None
-        self.current_city = None
-        self.current_org_row = None
-        self.current_org_col = None
 
         self.view = MainView()
         self.setCentralWidget(self.view)
 
         self.page_size = 50
-
-        # Connect filter inputs and button
+        self.search = SponsorSearch(
+            self, self.data_manager, self.settings, self.page_size
+        )
+        self.search.found.connect(self.load_data_page)
+        self.search.failed.connect(self.statusBar().showMessage)
+        self.search.counted.connect(self.set_navigation_info)
+        self.search.facets_counted.connect(self.view.show_facet_counts)
+        self.applications = ApplicationsController(self, self.data_manager, self.search)
+
+        # Connect filter inputs and button, typing filters after a short pause
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.start_search)
+        self.view.city_input.textChanged.connect(
+            lambda _text: self.search_timer.start()
+        )
+        self.view.org_input.textChanged.connect(lambda _text: self.search_timer.start())
+        self.view.fuzzy_checkbox.toggled.connect(self.apply_filter)
+        for combo in self.view.facet_combos.values():
+            combo.activated.connect(self.apply_filter)
+        self.view.applied_combo.activated.connect(self.apply_filter)
         self.view.city_input.returnPressed.connect(self.apply_filter)
+        self.view.city_completer.activated.connect(self.city_chosen)
         self.view.org_input.returnPressed.connect(self.apply_filter)
         self.view.apply_filter_button.clicked.connect(self.apply_filter)
-        self.view.sponsor_table.cellDoubleClicked.connect(self.open_applications_view)
+        self.view.sponsor_table.cellDoubleClicked.connect(
+            self.applications.open_applications_view
+        )
+        self.view.sponsor_table_view.connect_sort_changed(self.sort_changed)
         setup_main_enter_action(
             self.view.sponsor_table,
-            self.open_applications_view,
+            self.applications.open_applications_view,
             self.view.city_input,
             self.view.org_input,
         )
@@ -112,7 +130,9 @@ class TSAController(QMainWindow):
         self.menu_manager = MenuManager(self)
         self.menu_manager.logs_requested.connect(self.show_logs_viewer)
         self.menu_manager.settings_requested.connect(self.show_settings_ui)
-        self.menu_manager.check_release_requested.connect(self.check_for_release)
+        self.menu_manager.check_release_requested.connect(
+            lambda: self.release_checker.check(force=True)
+        )
         # self.menu_manager.help_requested.connect(self.show_help_viewer)
 
         # Keyboard shortcuts
@@ -123,63 +143,57 @@ class TSAController(QMainWindow):
             # self.view.city_input.setFocus,
             self.view.sponsor_table.setFocus,
         )
-        # Applications organisation city pair
-        self.application_pairs: set = self.data_manager.get_applications_pairs()
 
         self.load_data_page()  # Initial data load after UI setup
+        self.search.load_columnar_index()
+        self.start_ingest()
 
         # Release check
         if self.settings.get_check_for_release():
-            self.check_for_release()
+            self.release_checker.check()
 
-    def build_query(self):
+    def start_ingest(self):
+        """
+        Starts the download/import pipeline on a worker thread.
+        The table is reloaded when the worker reports new data.
         """
-        Constructs the SQL query and parameters based on current filter inputs.
+        self.ingest_worker = IngestWorker(self.data_manager)
+        self.ingest_worker.progress.connect(self.statusBar().showMessage)
+        self.ingest_worker.finished.connect(self.ingest_finished)
+        self.ingest_worker.failed.connect(self.ingest_failed)
+        self.ingest_thread = start_worker(
+            self, self.ingest_worker, stopped=self._ingest_stopped
+        )
+
+    def _ingest_stopped(self):
+        """The ingest thread and worker are deleted once the thread stops"""
+        self.ingest_thread = None
+        self.ingest_worker = None
+
+    def ingest_finished(self, changed):
+        if changed:
+            logger.info("Sponsor register updated, reloading table")
+            self.search.data_changed()
+            self.load_data_page()
+        self.statusBar().showMessage("✅ Sponsor register is up to date", 5000)
+
+    def ingest_failed(self, message):
+        self.statusBar().showMessage(f"❌ Sponsor register update failed: {message}")
 
-        Returns:
-            - base_query (str): SELECT query with LIMIT/OFFSET
-            - params (list): parameters for base_query
-            - count_query (str): query for total result count
-            - count_params (list): parameters for count_query
+    def closeEvent(self, event):
         """
-        base_query = """
-            SELECT organisation_name, town_city, county, type_and_rating, route
-            FROM sponsors
+        Cancels the ingest and waits for running workers, so an import is
+        rolled back rather than cut in half.
         """
-        filters = []
-        params = []
-
-        city = self.view.city_input.text().strip()
-        if city:
-            if len(city) == 1:
-                filters.append("LOWER(town_city) LIKE ?")
-                params.append(f"{city.lower()}%")
-            else:
-                filters.append("LOWER(town_city) LIKE ?")
-                params.append(f"%{city.lower()}%")
-
-        org = self.view.org_input.text().strip()
-        if org:
-            if len(org) == 1:
-                filters.append("LOWER(organisation_name) LIKE ?")
-                params.append(f"{org.lower()}%")
-            else:
-                filters.append("LOWER(organisation_name) LIKE ?")
-                params.append(f"%{org.lower()}%")
-
-        if filters:
-            base_query += " WHERE " + " AND ".join(filters)
-
-        count_query = "SELECT COUNT(*) FROM sponsors"
-        count_params = params.copy()
-        if filters:
-            count_query += " WHERE " + " AND ".join(filters)
-
-        offset = self.current_page * self.page_size
-        base_query += " LIMIT ? OFFSET ?"
-        params.extend([self.page_size, offset])
-
-        return base_query, params, count_query, count_params
+        if self.ingest_thread is not None and self.ingest_thread.isRunning():
+            self.ingest_worker.cancel()
+        self.search_timer.stop()
+        self.search.close()
+        for thread in (self.ingest_thread, self.release_checker.thread):
+            if thread is not None and thread.isRunning():
+                logger.info("Waiting for background work to finish...")
+                thread.wait()
+        super().closeEvent(event)
 
     def resizeEvent(self, event):
         """
@@ -187,7 +201,7 @@ class TSAController(QMainWindow):
         """
         super().resizeEvent(event)
         self.adjust_main_col_widths()
-        self.adjust_applications_col_widths()
+        self.applications.adjust_col_widths()
 
     def configure_table(self):
         """
@@ -201,171 +215,104 @@ class TSAController(QMainWindow):
             self.view.sponsor_table.viewport().width()
         )
 
-    def adjust_applications_col_widths(self):
-        self.view.applications_table_view.adjust_applications_column_widths(
-            self.view.applications_table.viewport().width()
-        )
-
     def apply_filter(self):
-        self.current_page = 0
+        # Pages keep the applied filter until it is applied again
+        self.search_timer.stop()
+        if self.search.search(self.typed_filter(), again=True):
+            self.load_data_page()
+
+    def sort_changed(self, section, order):
+        """Sorts the whole table by the clicked column, from the first page."""
+        self.search.pager.reset(
+            SponsorSort(DISPLAY_COLUMNS[section], order == Qt.SortOrder.DescendingOrder)
+        )
         self.load_data_page()
 
+    def typed_filter(self):
+        return SponsorFilter.from_inputs(
+            self.view.org_input.text(),
+            self.view.city_input.text(),
+            fuzzy=self.view.fuzzy_checkbox.isChecked(),
+            facets=self.view.selected_facets(),
+            applied=self.view.applied_combo.currentData(),
+        )
+
+    def start_search(self):
+        """Filters by the typed inputs, the table updates once the search is done."""
+        if self.search.search(self.typed_filter()):
+            self.load_data_page()
+
     def load_data_page(self):
         """
         Loads sponsor data for the current page and populates the table.
 
         Also highlights applied organisations
         """
-        offset = self.current_page * self.page_size
-        query, params, count_query, count_params = self.build_query()
-        total_results = self.get_total_results(count_query, count_params)
-        rows = self.fetch_rows(query, params)
-        self.fill_sponsor_table(rows)
-        self.highlight_applied_rows()
-        self.set_navigation_info(total_results)
-        self.set_vertical_headers(len(rows), offset)
-
-    def get_total_results(self, count_query, count_params):
-        count_cursor = self.conn.cursor()
-        count_cursor.execute(count_query, count_params)
-        return count_cursor.fetchone()[0]
-
-    def fetch_rows(self, query, params):
-        cursor = self.conn.cursor()
-        cursor.execute(query, params)
-        return cursor.fetchall()
-
-    def fill_sponsor_table(self, rows):
-        self.view.sponsor_table.setRowCount(len(rows))
-        self.view.sponsor_table.setColumnCount(5)
-        self.view.sponsor_table.setHorizontalHeaderLabels(
-            ["Organisation", "City", "County", "Type & Rating", "Route"]
+        table_view = self.view.sponsor_table_view
+        sort = self.search.pager.sort
+        table_view.show_sort(
+            (
+                DISPLAY_COLUMNS.index(sort.column)
+                if sort.column in DISPLAY_COLUMNS
+                else -1
+            ),
+            (
+                Qt.SortOrder.DescendingOrder
+                if sort.descending
+                else Qt.SortOrder.AscendingOrder
+            ),
         )
-        for row_idx, row_data in enumerate(rows):
-            for col_idx, value in enumerate(row_data):
-                item = QTableWidgetItem(str(value))
-                if len(str(value)) > 16:
-                    item.setToolTip(str(value))
-                self.view.sponsor_table.setItem(row_idx, col_idx, item)
-
-    def set_navigation_info(self, total_results):
-        page_info = f"Page {self.current_page + 1}"
-        result_info = f"{total_results} results"
+        if not self.data_manager.has_sponsors():
+            # First launch, the ingest worker has not created the table yet
+            table_view.fill_sponsor_rows([], 0)
+            self.set_navigation_info(0)
+            return
+        page = self.search.page()
+        if page is None:
+            return  # Ranked on the search worker, loaded again when found
+        rows, total_results, estimated = page
+        table_view.fill_sponsor_rows(rows, self.search.pager.offset)
+        table_view.highlight_applied_rows(self.applications.application_pairs)
+        self.set_navigation_info(total_results, estimated)
+        self.search.refresh_facet_counts()
+        city_names = self.search.new_city_names()
+        if city_names is not None:
+            self.view.set_city_names(city_names)
+
+    def city_chosen(self, name):
+        """Filters by a suggested city, exactly"""
+        self.view.city_input.setText(f'"{name}"')
+        self.apply_filter()
+
+    def set_navigation_info(self, total_results, estimated=False):
+        page_info = f"Page {self.search.pager.page + 1}"
+        result_info = f"{'≈' if estimated else ''}{total_results} results"
         logger.debug("Page info: %s, Result info: %s", page_info, result_info)
         self.navigation_manager.set_page_info(page_info)
         self.navigation_manager.set_result_info(result_info)
 
-    def set_vertical_headers(self, num_rows, offset):
-        for row_idx in range(num_rows):
-            item = self.view.sponsor_table.verticalHeaderItem(row_idx)
-            if item is None:
-                item = QTableWidgetItem()
-                self.view.sponsor_table.setVerticalHeaderItem(row_idx, item)
-            item.setText(str(offset + row_idx + 1))
-
-    def highlight_applied_rows(self):
-        for row_idx in range(self.view.sponsor_table.rowCount()):
-            org_item = self.view.sponsor_table.item(row_idx, 0)
-            city_item = self.view.sponsor_table.item(row_idx, 1)
-            if not org_item or not city_item:
-                continue
-            org = org_item.text()
-            city = city_item.text()
-            if (org, city) in self.application_pairs:  # Applied
-                color = "#2A4520" if row_idx % 2 == 0 else "#49693C"
-                for col in range(self.view.sponsor_table.columnCount()):
-                    item = self.view.sponsor_table.item(row_idx, col)
-                    if item:
-                        item.setBackground(QColor(color))
-            else:  # Default
-                for col in range(self.view.sponsor_table.columnCount()):
-                    item = self.view.sponsor_table.item(row_idx, col)
-                    if item:
-                        item.setBackground(QBrush())
-
     def load_next_page(self):
-        self.current_page += 1
-        self.load_data_page()
+        if self.search.pager.next():
+            self.load_data_page()
 
     def load_prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
+        if self.search.pager.prev():
             self.load_data_page()
 
     def show_logs_viewer(self):
         self.logs_viewer = LogsViewer()
         self.logs_viewer.show()
 
-    def open_applications_view(self, row, col):
-        self.set_current_organisation(row, col)
-        self.show_applications_view()
-        applications = self.data_manager.get_applications(
-            self.current_organisation_name, self.current_city
-        )
-        self.fill_applications_table(applications)
-        self.setup_applications_signals()
-        setup_applications_shortcuts(
-            self.view,
-            self.app_back_button_clicked,
-            self.edit_application,
-            self.add_application,
-            self.delete_application,
-        )
-        # setup_enter_action(self.view.applications_table, self.edit_application)
-
-    def set_current_organisation(self, row, col):
-        org_item = self.view.sponsor_table.item(row, 0)
-        city_item = self.view.sponsor_table.item(row, 1)
-        if org_item and city_item:
-            self.current_organisation_name = org_item.text()
-            self.current_city = city_item.text()
-            self.current_org_row = row
-            self.current_org_col = col
-        else:
-            self.current_organisation_name = None
-            self.current_city = None
-
-    def fill_applications_table(self, applications):
-        table = self.view.applications_table_view.table
-        table.setRowCount(len(applications))
-        for row_idx, app_row in enumerate(applications):
-            for col_idx, value in enumerate(app_row):
-                item = QTableWidgetItem(str(value))
-                if col_idx == 6 and str(value).strip():
-                    item.setToolTip(str(value))
-                table.setItem(row_idx, col_idx, item)
-
-    def setup_applications_signals(self):
-        try:
-            self.view.back_button.clicked.disconnect()
-            self.view.edit_button.clicked.disconnect()
-            self.view.add_new_button.clicked.disconnect()
-            self.view.delete_button.clicked.disconnect()
-            self.view.applications_table_view.table.cellDoubleClicked.disconnect()
-        except TypeError:
-            pass
-        self.view.back_button.clicked.connect(self.app_back_button_clicked)
-        self.view.add_new_button.clicked.connect(self.add_application)
-        self.view.edit_button.clicked.connect(self.edit_application)
-        self.view.delete_button.clicked.connect(self.delete_application)
-        self.view.applications_table_view.table.cellDoubleClicked.connect(
-            self.edit_application
-        )
-
-    def show_applications_view(self):
-        self.view.applications_table_view.setup_applications_table()
-        self.view.stacked_widget.setCurrentIndex(1)
-        self.adjust_applications_col_widths()
-
     def show_sponsor_table(self):
-        """Shows main table screen"""
-        # self.current_organisation_name = None
-        # self.current_city = None
+        """Shows main table screen, back from the applications screen"""
         self.configure_table()
-        self.highlight_applied_rows()
-
-    def app_back_button_clicked(self):
-        self.show_sponsor_table()
+        if self.search.sponsor_filter.applied is not None:
+            # Applications may have changed which sponsors the filter keeps
+            self.load_data_page()
+        else:
+            self.view.sponsor_table_view.highlight_applied_rows(
+                self.applications.application_pairs
+            )
         self.adjust_main_col_widths()
         setup_main_shortcuts(
             self.view,
@@ -375,108 +322,28 @@ class TSAController(QMainWindow):
             self.view.sponsor_table.setFocus,
         )
 
-    def add_application(self):
-        """
-        Opens a dialog to add a new application for the selected organisation.
-        """
-        org = self.current_organisation_name
-        city = self.current_city
-
-        dialog = ApplicationFormView(org, city)
-        if dialog.exec():
-            data = dialog.get_form_data()
-            self.data_manager.add_application(org, city, **data)
-            self.application_pairs.add((org, city))
-            self.open_applications_view(self.current_org_row, self.current_org_col)
-
-    def edit_application(self):
-        """Opens a dialog to edit the selected application entry."""
-        selected_row = self.view.applications_table_view.table.currentRow()
-        if selected_row < 0:
-            return  # No Selection No Action
-        table = self.view.applications_table_view.table
-
-        application_id = get_cell_text(table, selected_row, 0)
-        org = get_cell_text(table, selected_row, 1)
-        city = get_cell_text(table, selected_row, 2)
-        role = get_cell_text(table, selected_row, 3)
-        date = get_cell_text(table, selected_row, 4)
-        contact = get_cell_text(table, selected_row, 5)
-        note = get_cell_text(table, selected_row, 6)
-
-        dialog = ApplicationFormView(org, city, role, date, contact, note)
-        if dialog.exec():
-            data = dialog.get_form_data()
-            self.data_manager.update_application(application_id, org, city, **data)
-            self.open_applications_view(self.current_org_row, self.current_org_col)
-
-    def delete_application(self):
-        """
-        Deletes the selected application entry.
-        """
-        table = self.view.applications_table_view.table
-        selected_row = table.currentRow()
-        if selected_row < 0:
-            return  # No Selection No Action
-        id_item = table.item(selected_row, 0)
-        if id_item is None:
-            return  # No ID found, do nothing
-        application_id = id_item.text()
-        org = table.item(selected_row, 1).text()
-        city = table.item(selected_row, 2).text()
-        role = table.item(selected_row, 3).text()
-
-        if confirm_delete(self):
-            self.data_manager.delete_application(application_id, org, role)
-            if not self.data_manager.get_applications(org, city):
-                self.application_pairs.discard((org, city))
-            # Table update
-            self.open_applications_view(self.current_org_row, self.current_org_col)
-
-    def check_for_release(self):
-        """
-        Checks for the latest release on GitHub
-        and shows popup to view release notes and download button.
-        """
-        latest = fetch_latest_release()
-        if not latest:
-            # API might not be reachable silenced
-            return
-        latest_version = latest["tag"].lstrip("v")
-        current_version = VERSION.lstrip("v")
-
-        def version_tuple(version):
-            return tuple(map(int, version.split(".")))
-
-        if version_tuple(latest_version) > version_tuple(current_version):
-            changelog = latest.get("changelog", "")
-            asset = latest.get("asset", "")
-            download_url = asset if asset else latest["html_url"]
-
-            UpdateView.show_update_popup(self, latest_version, download_url, changelog)
-
     # Settings
     def show_settings_ui(self):
         """Opens the settings UI window for log preferences."""
         print("[DEBUG] show_settings_ui triggered")
-        current_log_level = self.settings.get_log_level()
-        rotation_limit = self.settings.get_log_rotation_limit()
-        current_update_check = self.settings.get_check_for_release()
-
         self.settings_ui = SettingsUI(
-            current_log_level, rotation_limit, current_update_check
+            {
+                "log_level": self.settings.get_log_level(),
+                "log_rotation_limit": self.settings.get_log_rotation_limit(),
+                "check_for_release": self.settings.get_check_for_release(),
+                "estimate_counts": self.settings.get_estimate_counts(),
+                "filter_engine": self.settings.get_filter_engine(),
+            }
         )
         self.settings_ui.settings_saved.connect(self.apply_settings)
         self.settings_ui.show()
 
-    def apply_settings(self, log_level: str, rotation_limit: int, update_check: bool):
-        """Handles saving settings from the UI."""
-        self.settings.set_log_level(log_level)
-        self.settings.set_log_rotation_limit(rotation_limit)
-        self.settings.set_check_for_release(update_check)
-        logger.info(
-            "Settings updated: level=%s, rotation=%s, release_check=%s",
-            log_level,
-            rotation_limit,
-            update_check,
-        )
+    def apply_settings(self, values: dict):
+        """Handles saving settings from the UI, values keyed as in the file."""
+        self.settings.set_log_level(values["log_level"])
+        self.settings.set_log_rotation_limit(values["log_rotation_limit"])
+        self.settings.set_check_for_release(values["check_for_release"])
+        self.settings.set_estimate_counts(values["estimate_counts"])
+        self.settings.set_filter_engine(values["filter_engine"])
+        logger.info("Settings updated: %s", values)
+        self.search.load_columnar_index()
@@ -0,0 +1,72 @@
+"""
+Release check of the main window.
+
+Asks GitHub for the latest release on a worker thread, at most once per
+configured interval, and offers the download when it is newer than VERSION.
+"""
+
+import time
+from PyQt6.QtCore import QObject
+from config import VERSION
+from views.update_view import UpdateView
+from controllers.workers import ReleaseCheckWorker, start_worker
+
+
+class ReleaseChecker(QObject):
+    def __init__(self, window, settings):
+        super().__init__(window)
+        self.window = window
+        self.settings = settings
+        self.thread = None
+        self.worker = None
+
+    def check(self, force=False):
+        """
+        Checks for the latest release on GitHub on a worker thread.
+        Unless forced, GitHub is asked at most once per configured interval
+        and the cached release is used in between.
+        """
+        cache = self.settings.get_release_cache()
+        interval = self.settings.get_release_check_interval_hours() * 60 * 60
+        if not force and time.time() - cache.get("checked_at", 0) < interval:
+            self.show_release(cache.get("release"))
+            return
+        if self.thread is not None:
+            return
+        self.worker = ReleaseCheckWorker(cache.get("etag"))
+        self.worker.finished.connect(self.release_checked)
+        self.thread = start_worker(self.window, self.worker, stopped=self._stopped)
+
+    def _stopped(self):
+        """The thread and worker are deleted once the thread stops"""
+        self.thread = None
+        self.worker = None
+
+    def release_checked(self, release, etag):
+        """Caches the release check result, None release means not modified."""
+        cache = self.settings.get_release_cache()
+        if release is None:
+            release = cache.get("release")
+        self.settings.set_release_cache(
+            {"etag": etag, "checked_at": time.time(), "release": release}
+        )
+        self.show_release(release)
+
+    def show_release(self, latest):
+        """Shows popup to view release notes and download button if it is newer."""
+        if not latest:
+            return
+        latest_version = latest["tag"].lstrip("v")
+        current_version = VERSION.lstrip("v")
+
+        def version_tuple(version):
+            return tuple(map(int, version.split(".")))
+
+        if version_tuple(latest_version) > version_tuple(current_version):
+            changelog = latest.get("changelog", "")
+            asset = latest.get("asset", "")
+            download_url = asset if asset else latest["html_url"]
+
+            UpdateView.show_update_popup(
+                self.window, latest_version, download_url, changelog
+            )
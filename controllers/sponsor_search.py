@@ -0,0 +1,522 @@
+"""
+Sponsor table search of the main window.
+
+Applies sponsor filters page by page and runs the work behind them: searches,
+result counts, facet counts, page prefetches and the columnar index, with
+their caches. Background results are delivered via signals and shown by the
+main window.
+"""
+
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal
+from models.page_cache import PageCache
+from models.fuzzy_search import FuzzySearch
+from models.sponsor_query import (
+    CountCache,
+    KeysetPager,
+    RELEVANCE,
+    SponsorFilter,
+    SponsorQueryBuilder,
+    SponsorSort,
+    count_facets,
+)
+from controllers.workers import (
+    ColumnarIndexWorker,
+    CountWorker,
+    FacetCountWorker,
+    PrefetchWorker,
+    SearchWorker,
+    start_query_worker,
+    start_worker,
+)
+
+
+logger = logging.getLogger()
+
+
+class SponsorSearch(QObject):
+    """
+    The applied sponsor filter, its pager and the work answering them.
+
+    Signals:
+        found(): the latest search is applied, its first page is cached.
+        failed(str): status message of a failed search or index load.
+        counted(object): exact result count of the applied filter.
+        facets_counted(object, object): (counts, facets), facet value counts
+            of the applied filter as count_facets, None if the table has no
+            facet columns, and the filter's applied facets.
+    """
+
+    # (seq, request) for the long-lived workers, see _supersede
+    search_requested = pyqtSignal(int, object)
+    count_requested = pyqtSignal(int, object)
+    facet_count_requested = pyqtSignal(int, object)
+    prefetch_requested = pyqtSignal(int, object)
+    found = pyqtSignal()
+    failed = pyqtSignal(str)
+    counted = pyqtSignal(object)
+    facets_counted = pyqtSignal(object, object)
+
+    def __init__(self, parent, data_manager, settings, page_size):
+        super().__init__(parent)
+        self.data_manager = data_manager
+        self.settings = settings
+        # Serve the existing sponsors table, the ingest runs in the background
+        self.conn = self.data_manager.open_database()
+        self.query_builder = SponsorQueryBuilder(self.conn)
+        self.fuzzy_search = FuzzySearch(self.query_builder)
+        self.pager = KeysetPager(page_size)
+        self.sponsor_filter = SponsorFilter()
+        # Bumped when the applications change, cached applied filter results go stale
+        self.applications_version = 0
+        self.count_cache = CountCache()
+        # Key of the latest count asked of the count worker, not asked twice
+        self.counting_key = None
+        self.page_cache = PageCache()
+        # Ranked ids of recent organisation searches, pages are sliced from them
+        self.rank_cache = CountCache(max_entries=8)
+        self.facet_counts_key = None
+        # Facet value combinations per filter scope, see refresh_facet_counts
+        self.facet_cache = CountCache(max_entries=16)
+        self.city_names_generation = None
+        # Key of the latest scope asked of the facet worker, not asked twice
+        self.grouping_key = None
+        self.index_thread = None
+        self.index_worker = None
+        self.columnar_index = None
+        # Generation the index failed to load for, not retried until the next
+        self.index_failed_generation = None
+        # One long-lived thread per kind of query, a new request makes the
+        # queued or running one of its kind stale
+        self.request_seq = 0
+        self.pending_search = None
+        self.search_worker = SearchWorker(self.data_manager)
+        self.count_worker = CountWorker(self.data_manager)
+        self.facet_worker = FacetCountWorker(self.data_manager)
+        self.prefetch_worker = PrefetchWorker(self.data_manager)
+        # Moved before their slots are connected, so the slots run on the threads
+        self.query_threads = [
+            start_query_worker(self, worker)
+            for worker in (
+                self.search_worker,
+                self.count_worker,
+                self.facet_worker,
+                self.prefetch_worker,
+            )
+        ]
+        self.search_requested.connect(self.search_worker.search)
+        self.search_worker.found.connect(self.search_found)
+        self.search_worker.failed.connect(self.search_failed)
+        self.count_requested.connect(self.count_worker.count)
+        self.count_worker.finished.connect(self.count_finished)
+        self.facet_count_requested.connect(self.facet_worker.group)
+        self.facet_worker.finished.connect(self.facet_count_finished)
+        self.prefetch_requested.connect(self.prefetch_worker.prefetch)
+        self.prefetch_worker.fetched.connect(self.page_prefetched)
+
+    def close(self):
+        """Drops queued work, aborts running queries and waits for the workers"""
+        self.pending_search = None
+        for worker in (
+            self.search_worker,
+            self.count_worker,
+            self.facet_worker,
+            self.prefetch_worker,
+        ):
+            self._supersede(worker)
+        for thread in self.query_threads:
+            thread.quit()
+        for thread in (self.index_thread, *self.query_threads):
+            if thread is not None and thread.isRunning():
+                logger.info("Waiting for background work to finish...")
+                thread.wait()
+
+    def data_changed(self):
+        """The sponsors table was replaced by an import"""
+        self.query_builder.refresh()
+        self.load_columnar_index()
+
+    def applications_changed(self):
+        self.applications_version += 1
+
+    def apply(self, sponsor_filter, sort):
+        """Applies the filter from the first page in sort order"""
+        self.cancel()
+        self.pager.reset(sort)
+        self.sponsor_filter = sponsor_filter
+
+    def filter_sort(self, sponsor_filter):
+        """
+        Sort for a filter about to be applied. A new organisation search is
+        ranked by relevance until a header is clicked, then keeps that sort.
+        Searches the columnar index serves keep name order, it does not rank.
+        """
+        if not sponsor_filter.organisation:
+            return (
+                SponsorSort()
+                if self.pager.sort.column == RELEVANCE
+                else self.pager.sort
+            )
+        if sponsor_filter.organisation != self.sponsor_filter.organisation:
+            if self.columnar_serves(sponsor_filter):
+                return SponsorSort()
+            return SponsorSort(RELEVANCE)
+        return self.pager.sort
+
+    def cancel(self):
+        """Makes any queued or running search stale, its result is dropped."""
+        self.pending_search = None
+        self._supersede(self.search_worker)
+
+    def _supersede(self, worker):
+        """
+        Makes the worker's queued or running request stale.
+
+        Returns:
+            int: seq of the worker's next request
+        """
+        self.request_seq += 1
+        worker.supersede(self.request_seq)
+        return self.request_seq
+
+    def search(self, sponsor_filter, *, again=False):
+        """
+        Filters on the search worker, found is emitted when the first page is
+        ready. Filters the columnar index, fuzzy search or the caches can
+        answer are applied at once instead. The applied filter is searched
+        again, from its first page, only if again is set.
+
+        Returns:
+            bool: True if the filter was applied at once
+        """
+        self.cancel()
+        if sponsor_filter == self.sponsor_filter and not again:
+            return False
+        sort = self.filter_sort(sponsor_filter)
+        if self._served_at_once(sponsor_filter, sort):
+            self.apply(sponsor_filter, sort)
+            return True
+        if sort.column == RELEVANCE:
+            # Ranked ids come back, the pages are sliced from them
+            query, params = self.query_builder.rank_query(sponsor_filter)
+            count_query, count_params = None, []
+        else:
+            query, params, count_query, count_params = self.query_builder.build(
+                sponsor_filter, None, self.pager.limit, sort
+            )
+        count_cached = (
+            self.count_cache.get(self._cache_generation(), sponsor_filter.cache_key)
+            is not None
+        )
+        if count_cached or self.settings.get_estimate_counts():
+            count_query = None
+        seq = self._supersede(self.search_worker)
+        self.pending_search = (seq, sponsor_filter, sort)
+        self.search_requested.emit(seq, (query, params, count_query, count_params))
+        return False
+
+    def _served_at_once(self, sponsor_filter, sort):
+        """
+        Whether the filter is answered without the search worker: from the
+        cached first page and count or ranked ids, by fuzzy search or by the
+        columnar index.
+        """
+        if not self.data_manager.has_sponsors():
+            return True
+        generation = self._cache_generation()
+        key = sponsor_filter.cache_key
+        if (generation, key, sort, None) in self.page_cache and (
+            self.count_cache.get(generation, key) is not None
+        ):
+            return True
+        if (
+            sort.column == RELEVANCE
+            and self.rank_cache.get(generation, key) is not None
+        ):
+            return True
+        return self.fuzzy_search.supports(sponsor_filter) or self.columnar_serves(
+            sponsor_filter, sort
+        )
+
+    def search_found(self, seq, rows, count):
+        """Applies the latest search with its first page, older results are dropped."""
+        if self.pending_search is None or seq != self.pending_search[0]:
+            return
+        _, sponsor_filter, sort = self.pending_search
+        self.apply(sponsor_filter, sort)
+        if sort.column == RELEVANCE:
+            ranked = self.query_builder.ranked_ids(self.sponsor_filter, rows)
+            self.rank_cache.put(*self._count_key(), ranked)
+            count = len(ranked)
+        else:
+            self.page_cache.put(self._page_key(None), rows)
+        if count is not None:
+            self.count_cache.put(*self._count_key(), count)
+        self.found.emit()
+
+    def search_failed(self, seq, message):
+        """The filter applied before the failed search is kept."""
+        if self.pending_search is None or seq != self.pending_search[0]:
+            return
+        self.pending_search = None
+        self.failed.emit(f"❌ Search failed: {message}")
+
+    def page(self):
+        """
+        Rows and result count of the current page, from the columnar index
+        when that engine is selected and loaded, otherwise from SQLite.
+        Fuzzy filters show their best matches on a single page.
+        Relevance pages are sliced from cached ranked ids; without them, as
+        after an import, the filter is ranked again on the search worker.
+
+        Returns:
+            tuple: (rows, total_results, estimated), None until found is
+                emitted if the filter is being ranked
+        """
+        if self.fuzzy_search.supports(self.sponsor_filter):
+            rows = self.fuzzy_search.search(self.sponsor_filter, self.pager.page_size)
+            return self.pager.record(rows), len(rows), False
+        if self.columnar_serves(self.sponsor_filter, self.pager.sort):
+            rows, total_results = self.columnar_index.page(
+                self.sponsor_filter, self.pager.after, self.pager.limit
+            )
+            return self.pager.record(rows), total_results, False
+        ranked = None
+        if self.pager.sort.column == RELEVANCE:
+            ranked = self.rank_cache.get(*self._count_key())
+            if ranked is None:
+                if self.pending_search is None:
+                    self.search(self.sponsor_filter, again=True)
+                return None
+        query, params, count_query, count_params = self._build_query(ranked)
+        rows = self.pager.record(self._fetch_page(query, params))
+        total_results, estimated = self._count_results(
+            count_query, count_params, len(rows)
+        )
+        self._prefetch_pages()
+        return rows, total_results, estimated
+
+    def _build_query(self, ranked):
+        """
+        Constructs the SQL query and parameters for the applied filter,
+        relevance pages are sliced from its ranked ids.
+
+        Returns:
+            - base_query (str): SELECT query seeking to the current page
+            - params (list): parameters for base_query
+            - count_query (str): query for total result count
+            - count_params (list): parameters for count_query
+        """
+        return self.query_builder.build(
+            self.sponsor_filter,
+            self.pager.after,
+            self.pager.limit,
+            self.pager.sort,
+            ranked=ranked,
+        )
+
+    def columnar_serves(self, sponsor_filter, sort=SponsorSort()):
+        """True if the loaded columnar index answers the filter in sort order"""
+        index = self.columnar_index
+        return (
+            index is not None
+            and index.generation == self.query_builder.generation
+            and index.supports(sponsor_filter, sort)
+        )
+
+    def load_columnar_index(self):
+        """
+        Loads the sponsors table into a columnar index on a worker when the
+        columnar filter engine is selected, again after each import.
+        SQLite serves the table until the index is loaded, and for a
+        generation it failed to load, until the engine is selected again.
+        """
+        if self.settings.get_filter_engine() != "columnar":
+            self.columnar_index = None
+            self.index_failed_generation = None
+            return
+        generation = self.query_builder.generation
+        index = self.columnar_index
+        if index is not None and index.generation == generation:
+            return
+        if generation == self.index_failed_generation:
+            return
+        if self.index_thread is not None:
+            return  # Checked again when the running load finishes
+        if not self.data_manager.has_sponsors():
+            return
+        self.index_worker = ColumnarIndexWorker(self.data_manager, generation)
+        self.index_worker.finished.connect(self.columnar_index_loaded)
+        self.index_worker.failed.connect(
+            lambda message: self.columnar_index_failed(generation, message)
+        )
+        self.index_thread = start_worker(
+            self, self.index_worker, stopped=self._index_stopped
+        )
+        # Loads again if the engine or the data changed meanwhile
+        self.index_thread.finished.connect(self.load_columnar_index)
+
+    def _index_stopped(self):
+        """The index thread and worker are deleted once the thread stops"""
+        self.index_thread = None
+        self.index_worker = None
+
+    def columnar_index_loaded(self, index):
+        if self.settings.get_filter_engine() != "columnar":
+            return
+        logger.info("Columnar index loaded: %s rows", len(index))
+        self.columnar_index = index
+
+    def columnar_index_failed(self, generation, message):
+        self.index_failed_generation = generation
+        self.failed.emit(
+            f"❌ Columnar index not loaded, filtering with SQLite: {message}"
+        )
+
+    def _cache_generation(self):
+        """Cached pages and counts are dropped when this changes"""
+        return self.query_builder.generation, self.applications_version
+
+    def _count_key(self):
+        return self._cache_generation(), self.sponsor_filter.cache_key
+
+    def _count_results(self, count_query, count_params, page_rows):
+        """
+        Result count of the applied filter. Counts are cached per filter and
+        import generation, so paging within a filter never recounts.
+        With estimated counts enabled an uncached count is estimated and the
+        exact count is left to a worker, which emits counted.
+
+        Returns:
+            tuple: (count, estimated)
+        """
+        key = self._count_key()
+        total = self.count_cache.get(*key)
+        if total is None and not self.pager.has_next:
+            # The last page is loaded, the count follows from its offset
+            total = self.pager.offset + page_rows
+            self.count_cache.put(*key, total)
+        if total is not None:
+            logger.debug("Result count cache hit: %s", key)
+            return total, False
+        if self.settings.get_estimate_counts():
+            self._start_count(key, count_query, count_params)
+            return self.query_builder.estimate_count(self.sponsor_filter), True
+        total = self._fetch_rows(count_query, count_params)[0][0]
+        self.count_cache.put(*key, total)
+        return total, False
+
+    def _start_count(self, key, count_query, count_params):
+        """Counts on the count worker, a count for another filter is cancelled."""
+        if key == self.counting_key:
+            return  # Paging while the same count runs
+        self.counting_key = key
+        seq = self._supersede(self.count_worker)
+        self.count_requested.emit(seq, (key, count_query, count_params))
+
+    def count_finished(self, key, total):
+        if key == self.counting_key:
+            self.counting_key = None
+        if key[0] != self._cache_generation():
+            return  # Counted before the latest import or application change
+        self.count_cache.put(*key, total)
+        if key == self._count_key():
+            self.counted.emit(total)
+
+    def _page_key(self, after):
+        return (
+            self._cache_generation(),
+            self.sponsor_filter.cache_key,
+            self.pager.sort,
+            after,
+        )
+
+    def _fetch_page(self, query, params):
+        """Rows of the current page, from the page cache when possible."""
+        key = self._page_key(self.pager.after)
+        rows = self.page_cache.get(key)
+        if rows is None:
+            rows = self._fetch_rows(query, params)
+            self.page_cache.put(key, rows)
+        return rows
+
+    def _prefetch_pages(self):
+        """
+        Fetches the previous and next pages on a worker so paging is served
+        from the page cache. An earlier prefetch still running is cancelled.
+        """
+        if self.pager.sort.column == RELEVANCE:
+            return  # Sliced from the ranked ids, as quick as a cache hit
+        pages = []
+        for after in self.pager.neighbours():
+            key = self._page_key(after)
+            if key not in self.page_cache:
+                query, params, _, _ = self.query_builder.build(
+                    self.sponsor_filter, after, self.pager.limit, self.pager.sort
+                )
+                pages.append((key, query, params))
+        if not pages:
+            return
+        self.prefetch_requested.emit(self._supersede(self.prefetch_worker), pages)
+
+    def page_prefetched(self, key, rows):
+        self.page_cache.put(key, rows)
+
+    def _fetch_rows(self, query, params):
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def new_city_names(self):
+        """Names of the canonical cities, None if unchanged since last asked"""
+        generation = self.query_builder.generation
+        if generation == self.city_names_generation:
+            return None
+        self.city_names_generation = generation
+        return self.query_builder.city_names()
+
+    def refresh_facet_counts(self):
+        """
+        Counts the facet values of the applied filter's rows, emitted with
+        facets_counted. Without text or applied filters the counts kept by
+        the import answer at once; other rows are grouped on a worker.
+        """
+        if not self.query_builder.has_facets:
+            self.facets_counted.emit(None, ())
+            return
+        scope = self.query_builder.facet_scope(self.sponsor_filter)
+        key = (self._cache_generation(), scope.cache_key)
+        if (key, self.sponsor_filter.facets) == self.facet_counts_key:
+            return
+        combinations = self.facet_cache.get(*key)
+        if combinations is None:
+            query, params = self.query_builder.facet_combinations(scope)
+            if scope != SponsorFilter():
+                self._start_facet_count(key, query, params)
+                return
+            combinations = self._fetch_rows(query, params)
+            self.facet_cache.put(*key, combinations)
+        self._emit_facet_counts(key, combinations)
+
+    def _emit_facet_counts(self, key, combinations):
+        self.facet_counts_key = (key, self.sponsor_filter.facets)
+        facets = self.sponsor_filter.facets
+        self.facets_counted.emit(count_facets(combinations, facets), facets)
+
+    def _start_facet_count(self, key, query, params):
+        """Groups on the facet worker, grouping for another scope is cancelled."""
+        if key == self.grouping_key:
+            return  # Paging while the same scope is grouped
+        self.grouping_key = key
+        seq = self._supersede(self.facet_worker)
+        self.facet_count_requested.emit(seq, (key, query, params))
+
+    def facet_count_finished(self, key, combinations):
+        if key == self.grouping_key:
+            self.grouping_key = None
+        if key[0] != self._cache_generation():
+            return  # Grouped before the latest import or application change
+        self.facet_cache.put(*key, combinations)
+        scope = self.query_builder.facet_scope(self.sponsor_filter)
+        if key == (self._cache_generation(), scope.cache_key):
+            self._emit_facet_counts(key, combinations)
@@ -0,0 +1,313 @@
+"""
+Background workers used by the controller.
+
+Long running jobs are moved to a QThread so the main window can be shown and
+used while they run. Results are delivered back to the GUI thread via signals.
+"""
+
+import sqlite3
+import logging
+from PyQt6.QtCore import QObject, Qt, QThread, pyqtSignal
+from models.sponsor_model import IngestCancelled
+from utils.update_checker import fetch_latest_release
+
+
+logger = logging.getLogger()
+
+# SQLite VM steps between two checks whether a running query went stale
+SEARCH_PROGRESS_STEPS = 1000
+
+
+def start_worker(parent, worker, stopped=None):
+    """
+    Runs worker.run on a new QThread owned by parent.
+    The thread stops when the worker emits finished or failed, then the
+    thread and worker are deleted. stopped() is called on the GUI thread
+    right before the thread is deleted, to drop references to them.
+
+    Returns:
+        QThread: the started thread
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.started.connect(worker.run)
+    # quit() is thread-safe; queued, it would wait for the GUI thread, which
+    # blocks in closeEvent waiting for this thread to finish
+    worker.finished.connect(thread.quit, Qt.ConnectionType.DirectConnection)
+    worker.failed.connect(thread.quit, Qt.ConnectionType.DirectConnection)
+    thread.finished.connect(worker.deleteLater)
+
+    def delete_thread():
+        if stopped is not None:
+            stopped()
+        thread.deleteLater()
+
+    # Queued, runs after the caller keeps the thread even if it stopped already
+    thread.finished.connect(delete_thread)
+    thread.start()
+    return thread
+
+
+class IngestWorker(QObject):
+    """
+    Runs the sponsor ingest pipeline (download -> transform -> SQLite).
+    cancel() stops it between download or import chunks, the import is
+    rolled back.
+
+    Signals:
+        progress(str): Human readable step of the ingest.
+        finished(bool): Emitted when done, True if the sponsors table changed.
+        failed(str): Emitted with the error message if the ingest failed or
+            was cancelled.
+    """
+
+    progress = pyqtSignal(str)
+    finished = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, data_manager):
+        super().__init__()
+        self.data_manager = data_manager
+        self.cancelled = False
+
+    def cancel(self):
+        """Asks the running ingest to stop, safe to call from any thread"""
+        self.cancelled = True
+
+    def is_cancelled(self):
+        return self.cancelled
+
+    def run(self):
+        try:
+            changed = self.data_manager.prepare_database(
+                self.progress.emit, self.is_cancelled
+            )
+        except IngestCancelled as err:
+            logger.info("Sponsor ingest cancelled")
+            self.failed.emit(str(err))
+            return
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            logger.error("❌ Sponsor ingest failed: %s", err)
+            self.failed.emit(str(err))
+            return
+        self.finished.emit(changed)
+
+
+class ReleaseCheckWorker(QObject):
+    """
+    Asks GitHub for the latest release.
+
+    Signals:
+        finished(object, object): (release, etag), release is None if not modified.
+        failed(str): Emitted with the error message if GitHub is not reachable.
+    """
+
+    finished = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, etag=None):
+        super().__init__()
+        self.etag = etag
+
+    def run(self):
+        try:
+            release, etag = fetch_latest_release(self.etag)
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            # API might not be reachable, silenced
+            self.failed.emit(str(err))
+            return
+        self.finished.emit(release, etag)
+
+
+class ColumnarIndexWorker(QObject):
+    """
+    Loads the sponsors table into a ColumnarIndex on its own connection.
+
+    Signals:
+        finished(object): the loaded ColumnarIndex.
+        failed(str): Emitted with the error message if loading failed.
+    """
+
+    finished = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, data_manager, generation):
+        super().__init__()
+        self.data_manager = data_manager
+        self.generation = generation
+
+    def run(self):
+        try:
+            from models.columnar_index import ColumnarIndex  # Imports numpy
+
+            conn = self.data_manager.connect_database()
+            try:
+                index = ColumnarIndex.load(conn, self.generation)
+            finally:
+                conn.close()
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            logger.warning("Columnar index not loaded: %s", err)
+            self.failed.emit(str(err))
+            return
+        self.finished.emit(index)
+
+
+class QueryWorker(QObject):
+    """
+    Runs one kind of query on a long-lived thread with its own connection,
+    see start_query_worker. Only the latest request is worth finishing:
+    queued stale requests are skipped and a running one is aborted by the
+    connection's progress handler.
+    """
+
+    def __init__(self, data_manager):
+        super().__init__()
+        self.data_manager = data_manager
+        self.conn = None
+        self.latest = 0
+        self.running = None
+
+    def supersede(self, seq):
+        """Marks seq as the latest request, safe to call from any thread"""
+        self.latest = seq
+
+    def is_stale(self):
+        return self.running != self.latest
+
+    def connection(self):
+        if self.conn is None:
+            self.conn = self.data_manager.connect_database()
+            self.conn.set_progress_handler(self.is_stale, SEARCH_PROGRESS_STEPS)
+        return self.conn
+
+    def fetch(self, seq, query, params):
+        """
+        Rows of query for request seq, None if the request went stale or
+        failed.
+        """
+        if seq != self.latest:
+            return None
+        self.running = seq
+        try:
+            return self.connection().execute(query, params).fetchall()
+        except sqlite3.Error as err:
+            if seq != self.latest:
+                logger.debug("%s %s cancelled by a newer one", type(self).__name__, seq)
+            else:
+                logger.warning("%s failed: %s", type(self).__name__, err)
+            return None
+        finally:
+            self.running = None
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+def start_query_worker(parent, worker):
+    """
+    Moves worker to a new QThread owned by parent, for the life of parent.
+    The worker's connection is closed when the thread quits.
+
+    Returns:
+        QThread: the started thread
+    """
+    thread = QThread(parent)
+    worker.moveToThread(thread)
+    thread.finished.connect(worker.close)
+    thread.start()
+    return thread
+
+
+class CountWorker(QueryWorker):
+    """
+    Counts the results of filters, see QueryWorker.
+
+    Signals:
+        finished(object, object): (key, count), key as given with the request.
+    """
+
+    finished = pyqtSignal(object, object)
+
+    def count(self, seq, request):
+        """request: (key, count_query, count_params)"""
+        key, count_query, count_params = request
+        rows = self.fetch(seq, count_query, count_params)
+        if rows is not None:
+            self.finished.emit(key, rows[0][0])
+
+
+class FacetCountWorker(QueryWorker):
+    """
+    Groups filters' rows by their facet values, see QueryWorker.
+
+    Signals:
+        finished(object, object): (key, combinations), key as given with the
+            request, combinations as SponsorQueryBuilder.facet_combinations.
+    """
+
+    finished = pyqtSignal(object, object)
+
+    def group(self, seq, request):
+        """request: (key, query, params)"""
+        key, query, params = request
+        combinations = self.fetch(seq, query, params)
+        if combinations is not None:
+            self.finished.emit(key, combinations)
+
+
+class PrefetchWorker(QueryWorker):
+    """
+    Fetches pages ahead of time, see QueryWorker.
+
+    Signals:
+        fetched(object, object): (key, rows) for each page fetched.
+    """
+
+    fetched = pyqtSignal(object, object)
+
+    def prefetch(self, seq, pages):
+        """pages: list of (key, query, params), stops once seq goes stale"""
+        for key, query, params in pages:
+            rows = self.fetch(seq, query, params)
+            if rows is None:
+                return
+            self.fetched.emit(key, rows)
+
+
+class SearchWorker(QueryWorker):
+    """
+    Runs sponsor table searches, see QueryWorker.
+
+    Signals:
+        found(int, object, object): (seq, rows, count), count None if not asked.
+        failed(int, str): (seq, error message) if the latest search failed.
+    """
+
+    found = pyqtSignal(int, object, object)
+    failed = pyqtSignal(int, str)
+
+    def search(self, seq, request):
+        """request: (query, params, count_query, count_params)"""
+        if seq != self.latest:
+            return
+        query, params, count_query, count_params = request
+        self.running = seq
+        try:
+            conn = self.connection()
+            rows = conn.execute(query, params).fetchall()
+            count = None
+            if count_query is not None:
+                count = conn.execute(count_query, count_params).fetchone()[0]
+        except sqlite3.Error as err:
+            if seq != self.latest:
+                logger.debug("Search %s cancelled by a newer one", seq)
+                return
+            logger.error("❌ Search failed: %s", err)
+            self.failed.emit(seq, str(err))
+            return
+        finally:
+            self.running = None
+        if seq == self.latest:
+            self.found.emit(seq, rows, count)
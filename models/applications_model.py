@@ -23,6 +23,11 @@ class ApplicationsModel:
                 )
                 """
             )
+            # Sponsors are filtered by whether they have an application
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_applications_org_city "
+                "ON applications(organisation_name, city)"
+            )
             conn.commit()
 
     def add_application(self, organisation_name, city, *, role, date, contact, note):
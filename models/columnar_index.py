@@ -0,0 +1,198 @@
+"""
+columnar_index.py
+
+In-memory columnar copy of the displayed sponsor columns, filtered with
+vectorised NumPy string operations instead of SQL. Low-cardinality columns
+are dictionary encoded: filters run over their distinct values and are
+expanded to rows through the codes. Returns the same rows, in the same
+order, as SponsorQueryBuilder for the same filter.
+
+This module is part of the 'Model' layer in the MVC architecture.
+"""
+
+import bisect
+import string
+import numpy as np
+from models.query_language import is_query
+from models.sponsor_query import DISPLAY_COLUMNS, SORT_KEY, SponsorSort
+from models.transform_model import city_key, normalise_text
+
+# numpy 2 adds StringDType, pylint's numpy brain does not know it yet
+STRING = np.dtypes.StringDType()  # pylint: disable=no-member
+# Columns stored as codes into their distinct values
+DICTIONARY_COLUMNS = ("town_city", "county", "type_and_rating", "route")
+# SQLite's LOWER() and LIKE only fold ASCII letters
+ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+# Inputs with LIKE wildcards are left to SQL, they are matched literally here
+LIKE_WILDCARDS = ("%", "_")
+
+
+def like_lower(value):
+    """Lowercases ASCII letters only, as LOWER() does"""
+    return value.lower() if value.isascii() else value.translate(ASCII_LOWER)
+
+
+class StringColumn:
+    """
+    Column values with the two lowercase forms filters compare against:
+    search (as LOWER(col) LIKE sees it) and norm, as normalise makes it
+    (normalise_text for the *_norm columns, city_key for cities).
+    """
+
+    def __init__(self, values, normalise=normalise_text):
+        self.normalise = normalise
+        self.values = np.array(values, dtype=STRING)
+        self.search = np.array([like_lower(value) for value in values], dtype=STRING)
+        self.norm = np.array([normalise(value) for value in values], dtype=STRING)
+
+    def text_mask(self, text):
+        """Single character prefix or substring match, as SponsorQueryBuilder"""
+        if len(text) == 1:
+            return np.strings.startswith(self.norm, self.normalise(text))
+        return np.strings.find(self.search, text.lower()) >= 0
+
+    def exact_mask(self, text):
+        return self.norm == self.normalise(text)
+
+    def value_mask(self, value):
+        return self.values == value
+
+    def decode(self, positions):
+        return self.values[positions].tolist()
+
+
+class DictionaryColumn(StringColumn):
+    """Distinct values of a column and a code per row pointing into them"""
+
+    def __init__(self, values, normalise=normalise_text):
+        code_of = {}
+        codes = [code_of.setdefault(value, len(code_of)) for value in values]
+        super().__init__(list(code_of), normalise)
+        self.codes = np.array(codes, dtype=np.min_scalar_type(len(code_of)))
+
+    def text_mask(self, text):
+        return super().text_mask(text)[self.codes]
+
+    def exact_mask(self, text):
+        return super().exact_mask(text)[self.codes]
+
+    def value_mask(self, value):
+        return super().value_mask(value)[self.codes]
+
+    def decode(self, positions):
+        return self.values[self.codes[positions]].tolist()
+
+
+class CityColumn(DictionaryColumn):
+    """Town/city spellings, prefixes match their canonical cities"""
+
+    def __init__(self, values):
+        super().__init__(values, city_key)
+
+    def text_mask(self, text):
+        """
+        A single character matches the cities with a key or a spelling
+        starting with it, as SponsorQueryBuilder.city_prefix_filter
+        """
+        if len(text) != 1:
+            return super().text_mask(text)
+        key = city_key(text)
+        if not key:
+            return np.zeros(len(self.codes), dtype=bool)
+        spelled = np.strings.startswith(self.norm, key) | np.strings.startswith(
+            self.search, text.lower()
+        )
+        return np.isin(self.norm, self.norm[spelled])[self.codes]
+
+
+class ColumnarIndex:
+    """
+    The displayed sponsor columns of one import generation, in SORT_KEY order.
+    Build it with load(); a new import needs a new index.
+    """
+
+    def __init__(self, ids, columns, generation):
+        self.ids = ids
+        self.columns = columns
+        self.generation = generation
+
+    @classmethod
+    def load(cls, conn, generation):
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT id, {', '.join(DISPLAY_COLUMNS)} FROM sponsors "
+            f"ORDER BY {', '.join(SORT_KEY)}"
+        )
+        rows = cursor.fetchall()
+        ids = np.array([row[0] for row in rows], dtype=np.int64)
+        columns = {}
+        for i, name in enumerate(DISPLAY_COLUMNS, start=1):
+            values = [row[i] for row in rows]
+            if name == "town_city":
+                columns[name] = CityColumn(values)
+            elif name in DICTIONARY_COLUMNS:
+                columns[name] = DictionaryColumn(values)
+            else:
+                columns[name] = StringColumn(values)
+        return cls(ids, columns, generation)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @staticmethod
+    def supports(sponsor_filter, sort=SponsorSort()):
+        """
+        False for header sorts, fuzzy and applied filters, organisation
+        queries and inputs with LIKE wildcards, which are left to SQL
+        """
+        return (
+            sort == SponsorSort()
+            and not sponsor_filter.fuzzy
+            and sponsor_filter.applied is None
+            and not is_query(sponsor_filter.organisation)
+            and not any(
+                wildcard in text
+                for text in (sponsor_filter.organisation, sponsor_filter.city)
+                for wildcard in LIKE_WILDCARDS
+            )
+        )
+
+    def matches(self, sponsor_filter):
+        """Positions of the matching rows, in SORT_KEY order"""
+        mask = np.ones(len(self), dtype=bool)
+        city = self.columns["town_city"]
+        if sponsor_filter.city and sponsor_filter.exact_city:
+            mask &= city.exact_mask(sponsor_filter.city)
+        elif sponsor_filter.city:
+            mask &= city.text_mask(sponsor_filter.city)
+        if sponsor_filter.organisation:
+            mask &= self.columns["organisation_name"].text_mask(
+                sponsor_filter.organisation
+            )
+        for column, value in sponsor_filter.facets:
+            mask &= self.columns[column].value_mask(value)
+        return np.flatnonzero(mask)
+
+    def seek(self, after):
+        """Position of the first row sorting after the (organisation_name, id) key"""
+        if after is None:
+            return 0
+        name, row_id = after
+        # np.searchsorted mis-orders StringDType arrays, bisect compares str items
+        names = self.columns["organisation_name"].values
+        low = bisect.bisect_left(names, name)
+        high = bisect.bisect_right(names, name, lo=low)
+        return low + np.searchsorted(self.ids[low:high], row_id, side="right")
+
+    def page(self, sponsor_filter, after, limit):
+        """
+        Returns:
+            - rows (list): up to limit rows after the sort key `after`,
+              DISPLAY_COLUMNS followed by the id like the SQL page
+            - total (int): number of matching rows
+        """
+        positions = self.matches(sponsor_filter)
+        start = np.searchsorted(positions, self.seek(after), side="left")
+        page = positions[start : start + limit]
+        columns = [self.columns[name].decode(page) for name in DISPLAY_COLUMNS]
+        return list(zip(*columns, self.ids[page].tolist())), len(positions)
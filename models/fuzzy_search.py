@@ -0,0 +1,165 @@
+"""
+fuzzy_search.py
+
+Fuzzy organisation name search. The trigram index created on import
+shortlists names sharing the rarer trigrams of the typed words, ranked by
+bm25; the shortlist is then scored by token similarity, so "Acme Helthcare
+Limited" still finds "ACME Healthcare Ltd.".
+
+This module is part of the 'Model' layer in the MVC architecture.
+"""
+
+import re
+from dataclasses import replace
+from functools import lru_cache
+from models.sponsor_query import DISPLAY_COLUMNS
+from models.transform_model import NAME_GRAMS_TABLE
+
+# Names shortlisted from the trigram index, scored in Python
+FUZZY_CANDIDATES = 200
+# Trigrams in more of the names than this share barely narrow the shortlist
+FUZZY_COMMON_SHARE = 0.05
+# Rarest trigrams looked up when all typed trigrams are common
+FUZZY_MIN_GRAMS = 3
+# Names scoring lower are not shown
+FUZZY_MIN_SCORE = 0.5
+# Spellings of the same word in the register, compared as one
+NAME_ALIASES = {
+    "limited": "ltd",
+    "company": "co",
+    "corporation": "corp",
+    "incorporated": "inc",
+    "&": "and",
+}
+WORD = re.compile(r"\w+|&")
+
+
+def name_tokens(text):
+    """Lowercase words of a name, punctuation dropped and aliases folded"""
+    return [NAME_ALIASES.get(word, word) for word in WORD.findall(text.lower())]
+
+
+@lru_cache(maxsize=4096)
+def bigrams(word):
+    """Character pairs of a word, its ends included. Names share most words."""
+    padded = f" {word} "
+    return frozenset(padded[i : i + 2] for i in range(len(padded) - 1))
+
+
+def dice(first, second):
+    """Share of bigrams two words have in common, 1 for the same word"""
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+class NameScorer:
+    """
+    Scores names between 0 and 1 for a query: how well each query word
+    matches its closest name word, averaged with how alike the whole names
+    are, so shorter names matching every word rank first.
+    """
+
+    def __init__(self, text):
+        words = name_tokens(text)
+        self.words = [bigrams(word) for word in words]
+        self.whole = bigrams(" ".join(words))
+
+    def score(self, name):
+        tokens = name_tokens(name)
+        if not self.words or not tokens:
+            return 0.0
+        token_bigrams = [bigrams(token) for token in tokens]
+        words = sum(
+            max(dice(word, token) for token in token_bigrams) for word in self.words
+        ) / len(self.words)
+        return (words + dice(self.whole, bigrams(" ".join(tokens)))) / 2
+
+
+class FuzzySearch:
+    """
+    Ranked fuzzy matches of the organisation filter, using the indexes of a
+    SponsorQueryBuilder's connection. The other filters still apply as usual.
+    """
+
+    def __init__(self, query_builder):
+        self.query_builder = query_builder
+
+    @staticmethod
+    def grams(text):
+        """Trigrams of each typed word, as the trigram tokenizer indexes them"""
+        return sorted(
+            {
+                word[i : i + 3]
+                for word in WORD.findall(text.lower())
+                for i in range(len(word) - 2)
+            }
+        )
+
+    def supports(self, sponsor_filter):
+        """True for fuzzy filters with a word of three characters or more"""
+        return (
+            sponsor_filter.fuzzy
+            and self.query_builder.has_trigram
+            and self.query_builder.has_name_grams
+            and bool(self.grams(sponsor_filter.organisation))
+        )
+
+    def gram_counts(self, grams):
+        """Number of organisation names each trigram appears in"""
+        cursor = self.query_builder.conn.cursor()
+        cursor.execute(
+            f"SELECT gram, names FROM {NAME_GRAMS_TABLE} "
+            f"WHERE gram IN ({', '.join('?' * len(grams))})",
+            grams,
+        )
+        return dict(cursor.fetchall())
+
+    def shortlist_match(self, text):
+        """
+        FTS5 query shortlisting names for the typed text: any of its trigrams
+        in at most FUZZY_COMMON_SHARE of the names. If all are common, names
+        with all of the FUZZY_MIN_GRAMS rarest, as ranking every name with any
+        common trigram takes too long. Trigrams in no name cannot match and
+        are left out.
+
+        Returns:
+            str: the MATCH expression, None if no trigram is in any name
+        """
+        counts = self.gram_counts(self.grams(text))
+        if not counts:
+            return None
+        cursor = self.query_builder.conn.cursor()
+        cursor.execute("SELECT COUNT(*) FROM sponsors")
+        common = cursor.fetchone()[0] * FUZZY_COMMON_SHARE
+        found = sorted(counts, key=counts.get)
+        rare = [gram for gram in found if counts[gram] <= common]
+        grams, operator = (rare, " OR ") if rare else (found[:FUZZY_MIN_GRAMS], " AND ")
+        terms = operator.join(f'"{gram}"' for gram in grams)
+        return f"{{organisation_name}}: ({terms})"
+
+    def search(self, sponsor_filter, limit):
+        """
+        Returns:
+            list: up to limit rows, DISPLAY_COLUMNS followed by the id, best
+            match first
+        """
+        match = self.shortlist_match(sponsor_filter.organisation)
+        if match is None:
+            return []
+        other_filters = replace(sponsor_filter, organisation="", fuzzy=False)
+        # Only the shortlisted rows are checked, a scan beats the city's index
+        predicate, params = self.query_builder.predicate(other_filters, scan=True)
+        where = f" WHERE {predicate}" if predicate else ""
+        cursor = self.query_builder.conn.cursor()
+        cursor.execute(
+            "WITH candidates(candidate_id, candidate_rank) AS ("
+            "SELECT rowid, rank FROM sponsors_trigram WHERE sponsors_trigram MATCH ?) "
+            f"SELECT {', '.join(DISPLAY_COLUMNS)}, id FROM candidates "
+            f"JOIN sponsors ON id = candidate_id{where} "
+            "ORDER BY candidate_rank LIMIT ?",
+            [match, *params, FUZZY_CANDIDATES],
+        )
+        scorer = NameScorer(sponsor_filter.organisation)
+        scored = [(scorer.score(row[0]), row) for row in cursor]
+        scored = [item for item in scored if item[0] >= FUZZY_MIN_SCORE]
+        scored.sort(key=lambda item: (-item[0], item[1][0], item[1][-1]))
+        return [row for _, row in scored[:limit]]
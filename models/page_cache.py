@@ -0,0 +1,79 @@
+"""
+page_cache.py
+
+In-process LRU cache of fetched sponsor table pages, so paging back and
+forth and prefetched pages are served from memory instead of SQLite.
+
+This module is part of the 'Model' layer in the MVC architecture.
+"""
+
+import sys
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger()
+
+# Memory the cached pages may take, least recently used pages are evicted first
+PAGE_CACHE_BYTES = 8 * 1024 * 1024
+
+
+def rows_size(rows):
+    """Approximate memory taken by a list of row tuples, in bytes"""
+    return sys.getsizeof(rows) + sum(
+        sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row) for row in rows
+    )
+
+
+class PageCache:
+    """
+    Pages of rows keyed by (generation, filter, sort, cursor).
+    Counts hits and misses and logs them at DEBUG level.
+    """
+
+    def __init__(self, max_bytes=PAGE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.pages = OrderedDict()
+
+    def __contains__(self, key):
+        return key in self.pages
+
+    def __len__(self):
+        return len(self.pages)
+
+    def get(self, key):
+        """Returns the cached rows of a page, or None"""
+        entry = self.pages.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.pages.move_to_end(key)
+        logger.debug(
+            "Page cache %s: %s hits, %s misses, %s pages, %s KiB",
+            "miss" if entry is None else "hit",
+            self.hits,
+            self.misses,
+            len(self.pages),
+            self.size // 1024,
+        )
+        return None if entry is None else entry[0]
+
+    def put(self, key, rows):
+        """Caches the rows of a page, evicting least recently used pages"""
+        size = rows_size(rows)
+        if size > self.max_bytes:
+            return
+        if key in self.pages:
+            self.size -= self.pages.pop(key)[1]
+        self.pages[key] = (rows, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self.pages.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self):
+        self.pages.clear()
+        self.size = 0
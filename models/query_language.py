@@ -0,0 +1,286 @@
+"""
+query_language.py
+
+Query language of the organisation filter:
+
+    care OR nursing NOT agency    words are ANDed unless joined by OR,
+                                  NOT leaves out names with the next word
+    "north london"                exact phrase
+    tech*                         words starting with tech
+    (care OR nursing) leeds       grouping
+
+Operators are upper case, so "Smith and Sons" is still plain text, and so
+are names with brackets or quotes but no operator, like "Acme (UK) Ltd":
+only an operator, a prefix or a quoted phrase on its own makes a query (see
+is_query). Input with unbalanced quotes or brackets, or an operator missing
+an operand, is matched as plain text too. Queries match whole words and are
+compiled to an FTS5 MATCH expression on the sponsors_fts word index.
+Compiled plans are cached by the normalised query string.
+
+This module is part of the 'Model' layer in the MVC architecture.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+OPERATORS = ("AND", "OR", "NOT")
+# Quoted phrase (closing quote optional), bracket or bare word
+TOKEN = re.compile(r'"([^"]*)"?(\*?)|([()])|([^\s()"]+)')
+# Plans kept for recently typed queries
+QUERY_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class Term:
+    """Word or phrase, prefix if it ended with *"""
+
+    text: str
+    prefix: bool = False
+
+
+@dataclass(frozen=True)
+class Not:
+    part: object
+
+
+@dataclass(frozen=True)
+class And:
+    parts: tuple
+
+
+@dataclass(frozen=True)
+class Or:
+    parts: tuple
+
+
+def tokenize(text):
+    """
+    Operators, brackets, and (is_phrase, text) word tokens of a query.
+    Brackets closing nothing are dropped, unclosed ones closed at the end.
+    """
+    tokens = []
+    depth = 0
+    for match in TOKEN.finditer(text):
+        phrase, phrase_star, bracket, word = match.groups()
+        if bracket == "(":
+            depth += 1
+        elif bracket == ")":
+            if depth == 0:
+                continue
+            depth -= 1
+        if bracket:
+            tokens.append(bracket)
+        elif word in OPERATORS:
+            tokens.append(word)
+        elif phrase is not None:
+            tokens.append((True, " ".join(phrase.lower().split()) + phrase_star))
+        else:
+            tokens.append((False, word.lower()))
+    return tokens + [")"] * depth
+
+
+def parses_strictly(text):
+    """
+    True if text is a query as typed, without the lenient fixes of
+    tokenize: quotes and brackets balanced, operators with their operands.
+    """
+    if text.count('"') % 2:
+        return False
+    depth = 0
+    # Whether the last token ends an operand, an operator still needs one
+    after_operand = needs_operand = False
+    for match in TOKEN.finditer(text):
+        _, _, bracket, word = match.groups()
+        if bracket == ")" or word in ("AND", "OR"):
+            if not after_operand:
+                return False
+            if bracket:
+                if depth == 0:
+                    return False
+                depth -= 1
+            after_operand, needs_operand = bracket == ")", word is not None
+        elif bracket == "(" or word == "NOT":
+            depth += bracket == "("
+            after_operand, needs_operand = False, True
+        else:
+            after_operand, needs_operand = True, False
+    return depth == 0 and not needs_operand
+
+
+def is_query(text):
+    """
+    True if text uses the query language rather than being plain text: it
+    parses strictly and has an operator, a prefix word or only quoted
+    phrases. Brackets and phrases among plain words are part of a name.
+    """
+    if not parses_strictly(text):
+        return False
+    tokens = tokenize(text)
+    words = [token for token in tokens if not isinstance(token, str)]
+    return (
+        any(token in OPERATORS for token in tokens)
+        or any(text.endswith("*") for _, text in words)
+        or bool(words)
+        and all(is_phrase for is_phrase, _ in words)
+    )
+
+
+def normalise_query(text):
+    """Query as one string, the same for inputs differing in case or spacing"""
+    return " ".join(
+        token if isinstance(token, str) else f'"{token[1]}"' if token[0] else token[1]
+        for token in tokenize(text)
+    )
+
+
+class QueryParser:
+    """
+    Recursive descent parser of the query tokens. As in web search, NOT
+    binds tightest and words are ANDed last, so "care OR nursing NOT agency"
+    is (care OR nursing) AND NOT agency:
+
+        query   = any (["AND"] any)*
+        any     = negated ("OR" negated)*
+        negated = "NOT" negated | "(" query ")" | term
+
+    Operators missing an operand are dropped.
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def take(self):
+        token = self.peek()
+        self.position += 1
+        return token
+
+    def parse(self):
+        """The query's tree, None if it has no words to match"""
+        return self.query()
+
+    def query(self):
+        parts = []
+        while self.peek() not in (None, ")"):
+            if self.peek() == "AND":
+                self.take()
+                continue
+            parts.append(self.any())
+        return combine(And, parts)
+
+    def any(self):
+        parts = [self.negated()]
+        while self.peek() == "OR":
+            self.take()
+            parts.append(self.negated())
+        return combine(Or, parts)
+
+    def negated(self):
+        token = self.peek()
+        if token in (None, ")"):
+            return None
+        self.take()
+        if token in ("AND", "OR"):
+            return None
+        if token == "NOT":
+            part = self.negated()
+            return None if part is None else Not(part)
+        if token == "(":
+            part = self.query()
+            self.take()
+            return part
+        _, text = token
+        prefix = text.endswith("*")
+        text = text.rstrip("*")
+        # Punctuation is not indexed, a term without letters or digits matches nothing
+        return Term(text, prefix) if re.search(r"\w", text) else None
+
+
+def combine(operator, parts):
+    """operator node of the parts left, the part itself if only one is"""
+    parts = tuple(part for part in parts if part is not None)
+    if len(parts) > 1:
+        return operator(parts)
+    return parts[0] if parts else None
+
+
+def to_match(node):
+    """
+    FTS5 MATCH expression of a tree. FTS5 has no NOT on its own, only
+    "a NOT b", so this returns (expression, negated) where negated means
+    the node matches the names the expression does not.
+    """
+    if isinstance(node, Term):
+        return f'"{node.text}"{"*" if node.prefix else ""}', False
+    if isinstance(node, Not):
+        expression, negated = to_match(node.part)
+        return expression, not negated
+    compiled = [to_match(part) for part in node.parts]
+    plain = [f"({expression})" for expression, negated in compiled if not negated]
+    excluded = [f"({expression})" for expression, negated in compiled if negated]
+    if isinstance(node, Or) and excluded:
+        # a OR NOT b is NOT (b NOT a)
+        return all_but(excluded, plain), True
+    if isinstance(node, Or):
+        return " OR ".join(plain), False
+    if not plain:
+        # NOT a AND NOT b is NOT (a OR b)
+        return " OR ".join(excluded), True
+    return all_but(plain, excluded), False
+
+
+def all_but(included, excluded):
+    """FTS5 expression of names with all included and none of excluded"""
+    return " AND ".join(included) + "".join(f" NOT {part}" for part in excluded)
+
+
+def to_like(node, column):
+    """
+    LIKE predicate and params of a tree, for databases without sponsors_fts.
+    Words match anywhere in the value there, not only whole words.
+    """
+    if isinstance(node, Term):
+        return f"LOWER({column}) LIKE ?", [f"%{node.text}%"]
+    if isinstance(node, Not):
+        predicate, params = to_like(node.part, column)
+        return f"NOT ({predicate})", params
+    operator = " AND " if isinstance(node, And) else " OR "
+    compiled = [to_like(part, column) for part in node.parts]
+    return (
+        operator.join(f"({predicate})" for predicate, _ in compiled),
+        [param for _, params in compiled for param in params],
+    )
+
+
+@dataclass(frozen=True)
+class QueryPlan:
+    """
+    A compiled query: names matching the FTS5 expression match (or not
+    matching it, if negated) satisfy the query. tree is the parsed query.
+    """
+
+    match: str
+    negated: bool
+    tree: object
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def compile_query(normalised):
+    """
+    Plan of a normalise_query() string, None if it has no words to match.
+    Cached, so typing more of a query only compiles the new input.
+    """
+    tree = QueryParser(tokenize(normalised)).parse()
+    if tree is None:
+        return None
+    match, negated = to_match(tree)
+    return QueryPlan(match, negated, tree)
+
+
+def query_plan(text):
+    """Plan of a typed query, see compile_query()"""
+    return compile_query(normalise_query(text))
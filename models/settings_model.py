@@ -74,6 +74,41 @@ class SettingsManager:
         """
         return self.settings.get("log_level", DEFAULT_SETTINGS["log_level"])
 
+    def get_release_check_interval_hours(self):
+        """
+        Get the minimum number of hours between two GitHub release checks.
+        """
+        return self.settings.get(
+            "release_check_interval_hours",
+            DEFAULT_SETTINGS["release_check_interval_hours"],
+        )
+
+    def get_release_cache(self):
+        """
+        Get the cached result of the last release check.
+        """
+        return self.settings.get("release_cache", DEFAULT_SETTINGS["release_cache"])
+
+    def get_ingest_chunk_size(self):
+        """
+        Get the number of csv rows read and inserted per chunk on import.
+        """
+        return self.settings.get(
+            "ingest_chunk_size", DEFAULT_SETTINGS["ingest_chunk_size"]
+        )
+
+    def get_estimate_counts(self):
+        """
+        Get if result counts are estimated first and counted in the background.
+        """
+        return self.settings.get("estimate_counts", DEFAULT_SETTINGS["estimate_counts"])
+
+    def get_filter_engine(self):
+        """
+        Get the engine the sponsor table is filtered with.
+        """
+        return self.settings.get("filter_engine", DEFAULT_SETTINGS["filter_engine"])
+
     def set_check_for_release(self, auto_check):
         """
         Update auto check for release choice and update
@@ -88,6 +123,34 @@ class SettingsManager:
         self.settings["log_rotation_limit"] = limit
         self.save_settings()
 
+    def set_release_cache(self, cache):
+        """
+        Update the cached release check result and save it.
+        """
+        self.settings["release_cache"] = cache
+        self.save_settings()
+
+    def set_ingest_chunk_size(self, chunk_size):
+        """
+        Update the import chunk size and save it.
+        """
+        self.settings["ingest_chunk_size"] = chunk_size
+        self.save_settings()
+
+    def set_estimate_counts(self, estimate):
+        """
+        Update the estimated result counts choice and save it.
+        """
+        self.settings["estimate_counts"] = estimate
+        self.save_settings()
+
+    def set_filter_engine(self, engine):
+        """
+        Update the sponsor table filter engine and save it.
+        """
+        self.settings["filter_engine"] = engine
+        self.save_settings()
+
     def set_log_level(self, level):
         """
         Update the log level and save it.
@@ -9,24 +9,73 @@ This module is part of the 'Model' layer in the MVC architecture.
 """
 
 import os
+import json
+import time
 import logging
 from datetime import datetime
-import requests
-from bs4 import BeautifulSoup
+from html.parser import HTMLParser
+from urllib.parse import urljoin
 from config import CSV_PATH, DATA_DIR
 
 # from sponsor.settings_manager import SettingsManager
 
+CSV_LINK_MARKER = "Worker_and_Temporary_Worker.csv"
+LINK_TTL_SECONDS = 24 * 60 * 60
+# (connect, read) timeouts of the gov.uk requests in seconds, short as a
+# closing app waits for a stalled request before it can cancel the ingest
+REQUEST_TIMEOUT = (3, 5)
+
 
 class CSVLinkNotFoundError(Exception):
     """Raised when the latest sponsor CSV link could not be found."""
 
 
+class IngestCancelled(Exception):
+    """Raised when a download or import is cancelled, e.g. the app is closing."""
+
+
+class CSVLinkParser(HTMLParser):
+    """Incremental parser that only looks at <a href> tags for the sponsor csv link."""
+
+    def __init__(self):
+        super().__init__()
+        self.link = None
+
+    def handle_starttag(self, tag, attrs):
+        if self.link is not None or tag != "a":
+            return
+        for name, value in attrs:
+            if name == "href" and value and CSV_LINK_MARKER in value:
+                self.link = value
+                return
+
+
+def find_csv_link(chunks):
+    """
+    Feeds html text chunks to CSVLinkParser and stops at the first match,
+    the rest of the page is never read.
+
+    Returns:
+        str | None: href of the sponsor csv
+    """
+    parser = CSVLinkParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.link is not None:
+            return parser.link
+    parser.close()
+    return parser.link
+
+
 class CSVManager:
-    def __init__(self, csv_dir=DATA_DIR, csv_file=CSV_PATH):
+    def __init__(self, csv_dir=DATA_DIR, csv_file=CSV_PATH, link_ttl=LINK_TTL_SECONDS):
         """Manages sponsor CSV file download and freshness. Accepts optional custom paths."""
         self.csv_dir = csv_dir
         self.csv_file = csv_file
+        self.link_ttl = link_ttl
+        self.part_file = csv_file + ".part"
+        # ETag/Last-Modified and asset url of the downloaded (or partial) csv
+        self.meta_file = os.path.join(csv_dir, "download_meta.json")
         self.uk_sponsors_url = (
             "https://www.gov.uk/government/publications/"
             "register-of-licensed-sponsors-workers"
@@ -49,41 +98,137 @@ class CSVManager:
         return diff_months >= months
 
     def get_latest_csv_link(self):
-        response = requests.get(self.uk_sponsors_url, timeout=10)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, "html.parser")
-        for link in soup.find_all("a", href=True):
-            href = link["href"]
-            if "Worker_and_Temporary_Worker.csv" in href:
-                return (
-                    href
-                    if href.startswith("https://")
-                    else "https://assets.publishing.service.gov.uk" + href
+        """
+        Resolves the csv url from the publication page.
+        The resolved url is cached in the download metadata for link_ttl seconds.
+        """
+        meta = self.load_download_meta()
+        cached = meta.get("link")
+        if cached and time.time() - cached["resolved_at"] < self.link_ttl:
+            return cached["url"]
+
+        import requests  # Only needed when the csv is outdated
+
+        response = requests.get(
+            self.uk_sponsors_url, stream=True, timeout=REQUEST_TIMEOUT
+        )
+        with response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            href = find_csv_link(
+                response.iter_content(chunk_size=16384, decode_unicode=True)
+            )
+        if href is None:
+            raise CSVLinkNotFoundError("Latest .csv file not found")
+
+        url = urljoin("https://assets.publishing.service.gov.uk", href)
+        meta["link"] = {"url": url, "resolved_at": time.time()}
+        self.save_download_meta(meta)
+        return url
+
+    def load_download_meta(self):
+        if not os.path.exists(self.meta_file):
+            return {}
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as err:
+            self.logger.warning("Download metadata not loaded: %s", err)
+            return {}
+
+    def save_download_meta(self, meta):
+        with open(self.meta_file, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=4)
+
+    def build_request_headers(self, url, meta):
+        """
+        Resumes a partial download with a Range request, otherwise asks for the
+        file only if it changed since the stored ETag/Last-Modified.
+        """
+        headers = {}
+        part = meta.get("part", {})
+        if os.path.exists(self.part_file) and part.get("url") == url:
+            validator = part.get("etag") or part.get("last_modified")
+            if validator:
+                headers["Range"] = f"bytes={os.path.getsize(self.part_file)}-"
+                headers["If-Range"] = validator
+        elif os.path.exists(self.csv_file) and meta.get("url") == url:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        return headers
+
+    def download_csv(self, cancelled=None):
+        """
+        Download latest .csv file. cancelled is checked between chunks; when
+        it returns True the download stops, leaving the .part file to resume.
+
+        Returns:
+            bool: True if a new file was downloaded
+        """
+        if not self.is_csv_outdated():
+            self.logger.info("✅ .csv file is up to date...")
+            return False
+
+        import requests
+
+        self.logger.info(".csv file is outdated, updating...")
+        latest_csv_url = self.get_latest_csv_link()
+        meta = self.load_download_meta()
+        headers = self.build_request_headers(latest_csv_url, meta)
+        try:
+            response = requests.get(
+                latest_csv_url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT
+            )
+            if response.status_code == 416:
+                # Partial file no longer matches the server, download it all again
+                response.close()
+                os.remove(self.part_file)
+                self.logger.info("Partial .csv file is stale, downloading it again")
+                response = requests.get(
+                    latest_csv_url, stream=True, timeout=REQUEST_TIMEOUT
                 )
+            if response.status_code == 304:
+                # Not republished, restart the freshness period of the local file
+                os.utime(self.csv_file)
+                self.logger.info("✅ .csv file not modified on the server")
+                return False
+            response.raise_for_status()
+
+            validators = {
+                "url": latest_csv_url,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            resumed = response.status_code == 206
+            meta["part"] = validators
+            self.save_download_meta(meta)
+
+            with response, open(self.part_file, "ab" if resumed else "wb") as file:
+                for chunk in response.iter_content(chunk_size=8192):
+                    if cancelled and cancelled():
+                        raise IngestCancelled("Download cancelled")
+                    file.write(chunk)
+            os.replace(self.part_file, self.csv_file)
+            meta.pop("part")
+            meta.update(validators)
+            self.save_download_meta(meta)
+            self.logger.info(
+                "✅ Latest .csv file downloaded%s: %s",
+                " (resumed)" if resumed else "",
+                self.csv_file,
+            )
+            return True
 
-        raise CSVLinkNotFoundError("Latest .csv file not found")
-
-    def download_csv(self):
-        """Download latest .csv file"""
-        if self.is_csv_outdated():
-            self.logger.info(".csv file is outdated, updating...")
-            latest_csv_url = self.get_latest_csv_link()
-            try:
-                response = requests.get(latest_csv_url, stream=True, timeout=10)
-                response.raise_for_status()
-
-                with open(self.csv_file, "wb") as file:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        file.write(chunk)
-                self.logger.info("✅ Latest .csv file downloaded: %s", self.csv_file)
-
-            except requests.exceptions.HTTPError as http_err:
-                self.logger.error("❌ HTTP Error: %s", http_err)
-                raise
-
-            except Exception as err:
-                self.logger.error("❌ An unexpected error occurred: %s", err)
-                raise
-        else:
-            self.logger.info("✅ .csv file is up to date...")
+        except IngestCancelled:
+            self.logger.info("Download cancelled, it resumes next time")
+            raise
+
+        except requests.exceptions.HTTPError as http_err:
+            self.logger.error("❌ HTTP Error: %s", http_err)
+            raise
+
+        except Exception as err:
+            self.logger.error("❌ An unexpected error occurred: %s", err)
+            raise
@@ -0,0 +1,721 @@
+"""
+sponsor_query.py
+
+Builds the SQL used to filter and page through the sponsors table.
+Filters are routed through the search indexes created on import
+(see TransformDB) and fall back to LIKE scans when a database has none.
+
+This module is part of the 'Model' layer in the MVC architecture.
+"""
+
+import json
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from models.query_language import is_query, normalise_query, query_plan, to_like
+from models.transform_model import (
+    CITIES_TABLE,
+    FACET_COLUMNS,
+    FACETS_TABLE,
+    GENERATION_KEY,
+    NAME_GRAMS_TABLE,
+    NORMALISED_COLUMNS,
+    SORT_COLUMNS,
+    city_key,
+    normalise_text,
+)
+
+DISPLAY_COLUMNS = (
+    "organisation_name",
+    "town_city",
+    "county",
+    "type_and_rating",
+    "route",
+)
+# Shortest input the trigram index can look up, shorter input is scanned
+TRIGRAM_MIN_LENGTH = 3
+# Pages are ordered by this key, unique thanks to the id tie-breaker
+SORT_KEY = ("organisation_name", "id")
+# Sort of an organisation search by match quality, best first. Ranked rows
+# carry their tier of match and bm25 score after the displayed columns; page
+# rows their position in the ranked ids and a 0 score, see ranked_page.
+RELEVANCE = "relevance"
+RANK_COLUMNS = ("relevance", "score")
+# Count estimates look at this many id windows of this many ids, spread evenly
+ESTIMATE_WINDOWS = 20
+ESTIMATE_WINDOW_IDS = 250
+# Ids of the sponsors with an application. CROSS JOIN keeps SQLite from
+# scanning sponsors, each application is an index seek into them instead.
+APPLIED_IDS = (
+    "SELECT sponsors.id FROM applications CROSS JOIN sponsors "
+    "ON sponsors.organisation_name = applications.organisation_name "
+    "AND sponsors.town_city = applications.city"
+)
+
+
+@dataclass(frozen=True)
+class SponsorFilter:
+    """
+    Filter inputs of the sponsor table, whitespace stripped.
+    A city typed in double quotes ("Bath") matches that city only, under
+    any of its spellings (see city_key).
+    An organisation using the query language (see query_language) matches
+    whole words.
+    A fuzzy organisation is ranked by similarity, see FuzzySearch.
+    facets are (column, value) pairs of FACET_COLUMNS matched exactly.
+    applied keeps sponsors with (True) or without (False) an application,
+    None keeps both.
+    """
+
+    organisation: str = ""
+    city: str = ""
+    exact_city: bool = False
+    fuzzy: bool = False
+    facets: tuple = ()
+    applied: bool | None = None
+
+    def __post_init__(self):
+        for column, _ in self.facets:
+            if column not in FACET_COLUMNS:
+                raise ValueError(f"{column} is not a facet column")
+
+    @classmethod
+    def from_inputs(cls, organisation, city, *, fuzzy=False, facets=(), applied=None):
+        city = city.strip()
+        exact_city = len(city) > 2 and city[0] == city[-1] == '"'
+        if exact_city:
+            city = city[1:-1].strip()
+        return cls(
+            organisation=organisation.strip(),
+            city=city,
+            exact_city=exact_city,
+            fuzzy=fuzzy,
+            facets=tuple(
+                sorted(facets, key=lambda facet: FACET_COLUMNS.index(facet[0]))
+            ),
+            applied=applied,
+        )
+
+    @property
+    def cache_key(self):
+        """Filters differing only in case match the same rows and share this key"""
+        organisation = self.organisation
+        return (
+            (
+                normalise_query(organisation)
+                if is_query(organisation)
+                else organisation.lower()
+            ),
+            self.city.lower(),
+            self.exact_city,
+            self.fuzzy,
+            self.facets,
+            self.applied,
+        )
+
+
+@dataclass(frozen=True)
+class SponsorSort:
+    """
+    Order of the sponsor table: a display column, ties broken by SORT_KEY.
+    Every column of the key runs in the same direction, so the key's index
+    serves both directions. RELEVANCE ranks the organisation filter's
+    matches, see SponsorQueryBuilder.ranked_rows.
+    """
+
+    column: str = "organisation_name"
+    descending: bool = False
+
+    def __post_init__(self):
+        if self.column not in ("organisation_name", *SORT_COLUMNS, RELEVANCE):
+            raise ValueError(f"Cannot sort sponsors by {self.column}")
+
+    @property
+    def key(self):
+        """Columns rows are ordered by, unique thanks to the id"""
+        if self.column == SORT_KEY[0]:
+            return SORT_KEY
+        if self.column == RELEVANCE:
+            return (*RANK_COLUMNS, *SORT_KEY)
+        return (self.column, *SORT_KEY)
+
+    @property
+    def columns(self):
+        """Columns of the page rows, followed by the id"""
+        if self.column == RELEVANCE:
+            return (*DISPLAY_COLUMNS, *RANK_COLUMNS)
+        return DISPLAY_COLUMNS
+
+    def bookmark(self, row):
+        """Sort key of a page row"""
+        return tuple(
+            row[-1] if column == "id" else row[self.columns.index(column)]
+            for column in self.key
+        )
+
+
+def prefix_range(prefix):
+    """Bounds of the values starting with prefix, for an index range scan"""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+class SponsorQueryBuilder:
+    """
+    Turns a SponsorFilter and page into SQL for the given connection.
+    Call refresh() after an import as the available indexes may change.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.has_fts = False
+        self.has_trigram = False
+        self.has_norm = False
+        self.has_name_grams = False
+        self.has_facets = False
+        self.has_applications = False
+        self.has_cities = False
+        self.generation = 0
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads which search indexes exist in the database"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT name FROM sqlite_master "
+            "WHERE name IN "
+            "('sponsors_fts', 'sponsors_trigram', 'import_meta', 'applications', "
+            "?, ?, ?)",
+            (NAME_GRAMS_TABLE, FACETS_TABLE, CITIES_TABLE),
+        )
+        names = {row[0] for row in cursor.fetchall()}
+        self.generation = 0
+        if "import_meta" in names:
+            cursor.execute(
+                "SELECT value FROM import_meta WHERE key = ?", (GENERATION_KEY,)
+            )
+            row = cursor.fetchone()
+            self.generation = int(row[0]) if row else 0
+        self.has_fts = "sponsors_fts" in names
+        self.has_trigram = "sponsors_trigram" in names
+        self.has_name_grams = NAME_GRAMS_TABLE in names
+        self.has_facets = FACETS_TABLE in names
+        self.has_applications = "applications" in names
+        cursor.execute("PRAGMA table_info(sponsors)")
+        columns = {row[1] for row in cursor.fetchall()}
+        self.has_norm = set(NORMALISED_COLUMNS.values()) <= columns
+        self.has_cities = CITIES_TABLE in names and "city_id" in columns
+
+    def text_filter(self, column, text, scan=False):
+        """
+        Predicate and params for one text filter.
+
+        A single character is a prefix match on the whole value, a range scan
+        of the normalised column's index; for cities, of the city keys and
+        spellings, whose ids are then looked up. Longer input is a substring match
+        anywhere in the value. From three characters on the candidates come
+        from the trigram index; it folds case beyond ASCII, so the LIKE is kept
+        on the candidates to return exactly the scan's rows. scan skips the
+        trigram index, for callers that only look at a few rows.
+        """
+        if len(text) == 1:
+            if column == "town_city" and self.has_cities:
+                return self.city_prefix_filter(text)
+            if self.has_norm and column in NORMALISED_COLUMNS:
+                norm = NORMALISED_COLUMNS[column]
+                return f"{norm} >= ? AND {norm} < ?", [*prefix_range(text.lower())]
+            return f"LOWER({column}) LIKE ?", [f"{text.lower()}%"]
+
+        like = f"LOWER({column}) LIKE ?"
+        pattern = f"%{text.lower()}%"
+        if scan or not self.has_trigram or len(text) < TRIGRAM_MIN_LENGTH:
+            return like, [pattern]
+        return (
+            f"id IN (SELECT rowid FROM sponsors_trigram WHERE {column} LIKE ?) "
+            f"AND {like}",
+            [pattern, pattern],
+        )
+
+    def city_prefix_filter(self, prefix):
+        """
+        Predicate and params matching the cities whose key or one of whose
+        spellings starts with prefix, so "g" finds London by "Greater London".
+        Their ids are looked up first, so the planner knows how few there are.
+        A prefix without a key, like "." or "'", matches nothing.
+        """
+        key = city_key(prefix)
+        if not key:
+            return "0", []
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT id FROM {CITIES_TABLE} WHERE key >= ? AND key < ?
+            UNION
+            SELECT {CITIES_TABLE}.id FROM {CITIES_TABLE}, json_each(aliases)
+            WHERE LOWER(json_each.value) >= ? AND LOWER(json_each.value) < ?
+            """,
+            [*prefix_range(key), *prefix_range(prefix.lower())],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+        if not ids:
+            return "0", []
+        return f"city_id IN ({', '.join('?' * len(ids))})", ids
+
+    def query_filter(self, column, text, scan=False):
+        """
+        Predicate and params for a text filter that may use the query
+        language. Queries are looked up in sponsors_fts, compiled to LIKE
+        when the database has no word index; a query without words filters
+        nothing.
+        """
+        if not is_query(text):
+            return self.text_filter(column, text, scan)
+        plan = query_plan(text)
+        if plan is None:
+            return "", []
+        if not self.has_fts:
+            return to_like(plan.tree, column)
+        return (
+            f"id {'NOT IN' if plan.negated else 'IN'} "
+            "(SELECT rowid FROM sponsors_fts WHERE sponsors_fts MATCH ?)",
+            [f"{{{column}}}: ({plan.match})"],
+        )
+
+    def exact_filter(self, column, text):
+        """
+        Predicate and params matching the whole value, case-insensitively.
+        A city matches its canonical city, an integer probe of city_id.
+        """
+        if column == "town_city" and self.has_cities:
+            return (
+                f"city_id = (SELECT id FROM {CITIES_TABLE} WHERE key = ?)",
+                [city_key(text)],
+            )
+        if self.has_norm and column in NORMALISED_COLUMNS:
+            return f"{NORMALISED_COLUMNS[column]} = ?", [normalise_text(text)]
+        return f"LOWER({column}) = ?", [text.lower()]
+
+    def applied_filter(self, applied):
+        """
+        Predicates keeping the sponsors with or without an application. The
+        applied ids are collected once through the applications index and
+        looked up by id, instead of probing the applications per sponsor.
+        """
+        if not self.has_applications:
+            return [] if not applied else ["0"]
+        return [f"id {'' if applied else 'NOT '}IN ({APPLIED_IDS})"]
+
+    def predicate(self, sponsor_filter, scan=False):
+        """
+        Returns:
+            - predicate (str): the filters joined with AND, empty if none
+            - params (list): parameters for the predicate
+        """
+
+        def text_filter(column, text):
+            return self.text_filter(column, text, scan)
+
+        def query_filter(column, text):
+            return self.query_filter(column, text, scan)
+
+        filters = []
+        params = []
+        city_filter = self.exact_filter if sponsor_filter.exact_city else text_filter
+        for column, text, column_filter in (
+            ("town_city", sponsor_filter.city, city_filter),
+            ("organisation_name", sponsor_filter.organisation, query_filter),
+        ):
+            if text:
+                predicate, predicate_params = column_filter(column, text)
+                if predicate:
+                    filters.append(predicate)
+                    params.extend(predicate_params)
+        for column, value in sponsor_filter.facets:
+            filters.append(f"{column} = ?")
+            params.append(value)
+        if sponsor_filter.applied is not None:
+            filters.extend(self.applied_filter(sponsor_filter.applied))
+        return " AND ".join(filters), params
+
+    def where(self, sponsor_filter):
+        """
+        Returns:
+            - where (str): WHERE clause, empty if nothing is filtered
+            - params (list): parameters for the clause
+        """
+        predicate, params = self.predicate(sponsor_filter)
+        return (f" WHERE {predicate}" if predicate else ""), params
+
+    def build(self, sponsor_filter, after, limit, sort=SponsorSort(), *, ranked=None):
+        """
+        Constructs the SQL query and parameters for one page in sort order.
+        The page is found by seeking past the sort key `after` (None for the
+        first page) in the sort key index, so every page costs the same.
+        Relevance pages are sliced from the filter's ranked ids, ranked
+        (see ranked_ids) if given, ranked here otherwise.
+
+        Returns:
+            - base_query (str): SELECT query with a keyset seek and LIMIT,
+              rows are sort.columns followed by the id
+            - params (list): parameters for base_query
+            - count_query (str): query for total result count
+            - count_params (list): parameters for count_query
+        """
+        if sort.column == RELEVANCE:
+            if ranked is None:
+                ranked = self.ranked_ids(sponsor_filter)
+            return (*self.ranked_page(ranked, after, limit), "SELECT ?", [len(ranked)])
+        count_query, count_params = self.count(sponsor_filter)
+        source = "sponsors"
+        where, params = self.where(sponsor_filter)
+
+        sort_key = ", ".join(sort.key)
+        if after is not None:
+            past = "<" if sort.descending else ">"
+            seek = f"({sort_key}) {past} ({', '.join('?' * len(sort.key))})"
+            where = f"{where} AND {seek}" if where else f" WHERE {seek}"
+            params.extend(after)
+        direction = " DESC" if sort.descending else ""
+        order_by = ", ".join(f"{column}{direction}" for column in sort.key)
+        base_query = (
+            f"SELECT {', '.join(sort.columns)}, id FROM {source}{where} "
+            f"ORDER BY {order_by} LIMIT ?"
+        )
+        params.append(limit)
+        return base_query, params, count_query, count_params
+
+    def match_tier(self, text):
+        """
+        SQL expression and params ranking how a name matches the typed text:
+        0 the whole name, 1 its start, 2 the start of a later word, 3 elsewhere
+        """
+        name = (
+            NORMALISED_COLUMNS["organisation_name"]
+            if self.has_norm
+            else "LOWER(organisation_name)"
+        )
+        value = normalise_text(text)
+        return (
+            f"CASE WHEN {name} = ? THEN 0 WHEN {name} >= ? AND {name} < ? THEN 1 "
+            f"WHEN ' ' || {name} LIKE ? THEN 2 ELSE 3 END",
+            [value, *prefix_range(value), f"% {value}%"],
+        )
+
+    def ranked_rows(self, sponsor_filter):
+        """
+        Subquery of the filter's rows with their relevance columns: the tier
+        of the organisation match (see match_tier, 0 for queries) and the
+        match's bm25 rank from the FTS5 index serving it, 0 without one.
+        Looking the organisation up in that index also yields the candidates,
+        so ranking costs no extra lookup.
+
+        Returns:
+            - source (str): the subquery, rows are DISPLAY_COLUMNS, the
+              RANK_COLUMNS and the id
+            - params (list): parameters for the subquery
+        """
+        text = sponsor_filter.organisation
+        tier, params = "0", []
+        index = None
+        if is_query(text):
+            plan = query_plan(text)
+            if self.has_fts and plan is not None and not plan.negated:
+                index = "sponsors_fts", f"{{organisation_name}}: ({plan.match})"
+                sponsor_filter = replace(sponsor_filter, organisation="")
+        elif text:
+            tier, params = self.match_tier(text)
+            if (
+                self.has_trigram
+                and len(text) >= TRIGRAM_MIN_LENGTH
+                and not any(wildcard in text for wildcard in "%_")
+            ):
+                # The quoted text matches the names containing it, as LIKE
+                phrase = text.replace('"', '""')
+                index = "sponsors_trigram", f'{{organisation_name}}: "{phrase}"'
+        source, score = "sponsors", "0"
+        if index is not None:
+            table, match = index
+            source = (
+                f"(SELECT rowid AS match_id, rank AS match_rank FROM {table} "
+                f"WHERE {table} MATCH ?) JOIN sponsors ON id = match_id"
+            )
+            score = "match_rank"
+            params.append(match)
+        # The index lookup found the candidates, the rest is checked on them
+        predicate, predicate_params = self.predicate(
+            sponsor_filter, scan=index is not None
+        )
+        where = f" WHERE {predicate}" if predicate else ""
+        return (
+            f"(SELECT {', '.join(DISPLAY_COLUMNS)}, {tier} AS relevance, "
+            f"{score} AS score, id FROM {source}{where})",
+            params + predicate_params,
+        )
+
+    def rank_query(self, sponsor_filter):
+        """Query and params of the filter's RANK_COLUMNS and ids, best first"""
+        source, params = self.ranked_rows(sponsor_filter)
+        key = ", ".join(SponsorSort(RELEVANCE).key)
+        return (
+            f"SELECT {', '.join(RANK_COLUMNS)}, id FROM {source} ORDER BY {key}",
+            params,
+        )
+
+    def ranked_ids(self, sponsor_filter, rows=None):
+        """
+        The filter's ids, best match first, from rank_query rows if given.
+        Ranking scores every match, so callers keep these for the next pages.
+
+        Returns:
+            array: ids in relevance order
+        """
+        if rows is None:
+            cursor = self.conn.cursor()
+            cursor.execute(*self.rank_query(sponsor_filter))
+            rows = cursor
+        return array("q", (row[-1] for row in rows))
+
+    @staticmethod
+    def ranked_page(ranked, after, limit):
+        """
+        Query and params of the relevance page after the bookmark `after`,
+        looked up by id from the ranked ids. Rows carry their position in
+        ranked as relevance, which bookmarks where the next page starts, so
+        a page costs its own rows only.
+        """
+        start = 0 if after is None else after[0] + 1
+        return (
+            f"SELECT {', '.join(DISPLAY_COLUMNS)}, ? + ranked.key AS relevance, "
+            "0 AS score, sponsors.id FROM json_each(?) AS ranked "
+            "CROSS JOIN sponsors ON sponsors.id = ranked.value ORDER BY ranked.key",
+            [start, json.dumps(ranked[start : start + limit].tolist())],
+        )
+
+    def count(self, sponsor_filter):
+        """
+        Query and params counting the filter's rows. Without other filters,
+        sponsors without an application are counted as all sponsors less the
+        applied ones: checking NOT IN for every sponsor costs far more.
+        """
+        if (
+            sponsor_filter.applied is False
+            and self.has_applications
+            and sponsor_filter == SponsorFilter(applied=False)
+        ):
+            return (
+                "SELECT (SELECT COUNT(*) FROM sponsors) - "
+                f"(SELECT COUNT(*) FROM sponsors WHERE id IN ({APPLIED_IDS}))",
+                [],
+            )
+        where, params = self.where(sponsor_filter)
+        return f"SELECT COUNT(*) FROM sponsors{where}", params
+
+    def city_names(self):
+        """
+        Returns:
+            list: names of the canonical cities, most sponsors first. Empty
+            if the database has no city table.
+        """
+        if not self.has_cities:
+            return []
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT name FROM {CITIES_TABLE} ORDER BY sponsors DESC, name")
+        return [row[0] for row in cursor.fetchall()]
+
+    @staticmethod
+    def facet_scope(sponsor_filter):
+        """
+        The filter facet counts are taken under: without its facets, which
+        count_facets applies, and without a fuzzy organisation search, whose
+        best matches are not a result set to count.
+        """
+        scope = replace(sponsor_filter, facets=())
+        if scope.fuzzy:
+            scope = replace(scope, organisation="", fuzzy=False)
+        return scope
+
+    def facet_combinations(self, scope):
+        """
+        Query and params of the sponsors per combination of FACET_COLUMNS
+        values among the rows of a facet_scope() filter. The counts kept by
+        the import answer an unfiltered scope; otherwise the rows the text
+        and applied filters find are grouped.
+        """
+        columns = ", ".join(FACET_COLUMNS)
+        if scope == SponsorFilter():
+            return f"SELECT {columns}, sponsors FROM {FACETS_TABLE}", []
+        where, params = self.where(scope)
+        return (
+            f"SELECT {columns}, COUNT(*) FROM sponsors{where} GROUP BY {columns}",
+            params,
+        )
+
+    def facet_counts(self, sponsor_filter):
+        """
+        Sponsors per value of each facet column among the filter's rows.
+        Each facet is counted under the other facets' selections, so its own
+        values stay selectable.
+
+        Returns:
+            dict: column -> list of (value, count), by value. Empty if the
+            database has no facet counts.
+        """
+        if not self.has_facets:
+            return {}
+        cursor = self.conn.cursor()
+        cursor.execute(*self.facet_combinations(self.facet_scope(sponsor_filter)))
+        return count_facets(cursor.fetchall(), sponsor_filter.facets)
+
+    def estimate_count(self, sponsor_filter):
+        """
+        Estimates the result count from ESTIMATE_WINDOWS id ranges spread over
+        the table, scaled up to the whole id range. Costs the same for any
+        filter; small tables are counted exactly.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT MIN(id), MAX(id) FROM sponsors")
+        low, high = cursor.fetchone()
+        if low is None:
+            return 0
+        predicate, params = self.predicate(sponsor_filter, scan=True)
+        span = high - low + 1
+        if span <= ESTIMATE_WINDOWS * ESTIMATE_WINDOW_IDS:
+            windows = [(low, high)]
+        else:
+            step = span // ESTIMATE_WINDOWS
+            windows = [
+                (start, start + ESTIMATE_WINDOW_IDS - 1)
+                for start in range(low, low + step * ESTIMATE_WINDOWS, step)
+            ]
+        where = "id BETWEEN ? AND ?" + (f" AND {predicate}" if predicate else "")
+        sampled = 0
+        matched = 0
+        for start, end in windows:
+            cursor.execute(
+                f"SELECT COUNT(*) FROM sponsors WHERE {where}", [start, end, *params]
+            )
+            matched += cursor.fetchone()[0]
+            sampled += end - start + 1
+        return round(matched * span / sampled)
+
+
+def count_facets(combinations, facets):
+    """
+    Sponsors per value of each facet column, from (*FACET_COLUMNS, sponsors)
+    combinations. Each facet is counted under the other facets' selections.
+
+    Returns:
+        dict: column -> list of (value, count), by value
+    """
+    selected = dict(facets)
+    counts = {}
+    for i, column in enumerate(FACET_COLUMNS):
+        others = [
+            (j, selected[other])
+            for j, other in enumerate(FACET_COLUMNS)
+            if other != column and other in selected
+        ]
+        totals = {}
+        for combination in combinations:
+            if all(combination[j] == value for j, value in others):
+                value = combination[i]
+                totals[value] = totals.get(value, 0) + combination[-1]
+        counts[column] = sorted(totals.items())
+    return counts
+
+
+class CountCache:
+    """
+    Result counts per filter cache key, least recently used dropped first.
+    All counts are dropped when the import generation changes.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self.generation = None
+        self.counts = OrderedDict()
+
+    def get(self, generation, key):
+        if generation != self.generation or key not in self.counts:
+            return None
+        self.counts.move_to_end(key)
+        return self.counts[key]
+
+    def put(self, generation, key, count):
+        if generation != self.generation:
+            self.generation = generation
+            self.counts.clear()
+        self.counts[key] = count
+        self.counts.move_to_end(key)
+        while len(self.counts) > self.max_entries:
+            self.counts.popitem(last=False)
+
+
+class KeysetPager:
+    """
+    Page position for keyset pagination. Keeps the sort key each visited
+    page starts after, so going back re-seeks from a bookmark too.
+    """
+
+    def __init__(self, page_size, sort=SponsorSort()):
+        self.page_size = page_size
+        self.sort = sort
+        self.page = 0
+        self.bookmarks = [None]
+        self.has_next = False
+
+    def reset(self, sort=None):
+        """Back to the first page, in a new sort order if given"""
+        if sort is not None:
+            self.sort = sort
+        self.page = 0
+        self.bookmarks = [None]
+        self.has_next = False
+
+    @property
+    def after(self):
+        """Sort key the current page starts after"""
+        return self.bookmarks[self.page]
+
+    @property
+    def limit(self):
+        """One row more than a page, to tell whether there is a next page"""
+        return self.page_size + 1
+
+    @property
+    def offset(self):
+        return self.page * self.page_size
+
+    def record(self, rows):
+        """
+        Takes the rows fetched for the current page, bookmarks where the next
+        page starts and returns the rows to display, DISPLAY_COLUMNS only.
+        """
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        del self.bookmarks[self.page + 1 :]
+        if self.has_next:
+            self.bookmarks.append(self.sort.bookmark(rows[-1]))
+        return [row[: len(DISPLAY_COLUMNS)] for row in rows]
+
+    def neighbours(self):
+        """Sort keys the previous and next pages start after, where known"""
+        afters = []
+        if self.page > 0:
+            afters.append(self.bookmarks[self.page - 1])
+        if self.has_next:
+            afters.append(self.bookmarks[self.page + 1])
+        return afters
+
+    def next(self):
+        """Moves to the next page, returns False on the last page"""
+        if not self.has_next:
+            return False
+        self.page += 1
+        return True
+
+    def prev(self):
+        """Moves to the previous page, returns False on the first page"""
+        if self.page == 0:
+            return False
+        self.page -= 1
+        return True
@@ -4,13 +4,122 @@ and saves it into a SQLite database while preserving certain fields such as 'app
 """
 
 import os
+import re
+import csv
+import itertools
+import json
+import hashlib
 import sqlite3
 import logging
-import pandas as pd
-from config import CSV_PATH, DB_PATH
+from datetime import date
+from config import CSV_PATH, DB_PATH, DEFAULT_SETTINGS
+from models.sponsor_model import IngestCancelled
 
 # from sponsor.settings_manager import SettingsManager
 
+FINGERPRINT_KEY = "csv_fingerprint"
+# Counter in import_meta, bumped whenever an import changes the sponsors table
+GENERATION_KEY = "generation"
+# Bump when the sponsors table layout changes so unchanged csv files are re-imported
+SCHEMA_VERSION = 9
+# Indexed lowercase copies of the filtered columns: source -> normalised column
+NORMALISED_COLUMNS = {
+    "organisation_name": "organisation_name_norm",
+}
+# Columns the sponsor table can be sorted by besides organisation_name, each
+# indexed with organisation_name as tie-breaker
+SORT_COLUMNS = ("town_city", "county", "type_and_rating", "route")
+# Columns the sponsor table can be narrowed down by value, with the number of
+# sponsors per combination of their values kept in FACETS_TABLE
+FACET_COLUMNS = ("county", "type_and_rating", "route")
+FACETS_TABLE = "sponsor_facets"
+# Canonical cities: the spellings of town_city sharing a city_key, their
+# sponsor count and the most common spelling as name. Sponsors point to
+# their city by city_id.
+CITIES_TABLE = "sponsor_cities"
+# Spellings of a city that share no key with it otherwise
+CITY_ALIASES = {
+    "greater london": "london",
+    "greater manchester": "manchester",
+}
+# Postcode district (and sector) after a city name, as in "London EC1A 1"
+POSTCODE_DISTRICT = re.compile(r" [a-z]{1,2}\d[a-z\d]?(?: \d[a-z]{0,2})?$")
+# Columns added to sponsors on import, on top of the csv columns
+DERIVED_COLUMNS = ("row_hash", *NORMALISED_COLUMNS.values(), "city_id")
+# Page cache used while importing, in KiB
+IMPORT_CACHE_KIB = 64 * 1024
+# "native" uses the stdlib csv module, "pandas" needs pandas/numpy installed
+ENGINES = ("native", "pandas")
+# pandas.read_csv options of the pandas engine: every cell a string, empty
+# cells "" rather than NaN and "NA" kept as text, as the native engine reads them
+PANDAS_CSV_OPTIONS = {"encoding": "utf-8", "dtype": str, "keep_default_na": False}
+# FTS5 indexes kept in sync with sponsors: name -> (columns, tokenizer).
+# sponsors_fts serves word queries, sponsors_trigram substring (LIKE) filters.
+SEARCH_INDEXES = {
+    "sponsors_fts": (
+        ("organisation_name", "town_city", "county", "route"),
+        "unicode61",
+    ),
+    "sponsors_trigram": (("organisation_name", "town_city"), "trigram"),
+}
+# Number of organisation names each trigram of sponsors_trigram appears in,
+# lets fuzzy search skip common trigrams without reading their postings
+NAME_GRAMS_TABLE = "sponsor_name_grams"
+
+
+def normalise_column(name):
+    """Turns a raw csv header into the column name used in SQLite"""
+    return name.strip().replace(" ", "_").replace("/", "_").replace("&", "and").lower()
+
+
+def normalise_text(value):
+    """Lowercases a value and collapses its whitespace, as stored in *_norm columns"""
+    return " ".join(value.lower().split())
+
+
+def city_key(value):
+    """
+    Canonical key of a town/city spelling: lowercase words without dots,
+    apostrophes or a trailing postcode district, then resolved through
+    CITY_ALIASES. "LONDON.", "London SW1" and "Greater London" are "london".
+    """
+    key = re.sub(r"[.'’]", "", value.lower())
+    key = " ".join(re.sub(r"[^\w\s]", " ", key).split())
+    key = POSTCODE_DISTRICT.sub("", key)
+    return CITY_ALIASES.get(key, key)
+
+
+def raise_if_cancelled(cancelled):
+    """Raises IngestCancelled if the cancelled callback, if any, returns True"""
+    if cancelled and cancelled():
+        raise IngestCancelled("Import cancelled")
+
+
+def row_digest(row):
+    """Content hash of a csv row, used to detect added and removed rows"""
+    return hashlib.blake2b("\x1f".join(row).encode(), digest_size=12).hexdigest()
+
+
+class SponsorTable:
+    """
+    Cleaned csv produced by the native engine.
+    Offers the parts of the DataFrame interface used by TransformDB.
+    """
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def empty(self):
+        return not self.rows
+
+    def head(self, n=5):
+        return [self.columns, *self.rows[:n]]
+
 
 class TransformDB:
     """
@@ -19,75 +128,697 @@ class TransformDB:
     Preserves the 'applied' status of organizations if previously stored.
     """
 
-    def __init__(self, csv_path=CSV_PATH, db_path=DB_PATH):
+    def __init__(
+        self,
+        csv_path=CSV_PATH,
+        db_path=DB_PATH,
+        chunk_size=DEFAULT_SETTINGS["ingest_chunk_size"],
+        engine="native",
+    ):
         """Initial definitions"""
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown ingest engine: {engine}")
         self.csv_path = csv_path
         self.db_path = db_path
+        self.chunk_size = chunk_size
+        self.engine = engine
         # log_level = SettingsManager().get_log_level()
         self.logger = logging.getLogger()
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
 
     def clean_and_transform_csv(self):
-        """Cleans the csv and transforms to dataframe"""
+        """
+        Cleans the csv and transforms to dataframe,
+        or to a SponsorTable with the native engine.
+        """
         self.logger.info("📌 %s is transforming...", self.csv_path)
+        if self.engine == "native":
+            columns, chunks = self._read_native_chunks(self.chunk_size)
+            table = SponsorTable(columns, list(itertools.chain.from_iterable(chunks)))
+            self.logger.info("✅ %s is transformed.", self.csv_path)
+            return table
+
+        df = self._read_pandas_csv()
+        df.columns = [normalise_column(col) for col in df.columns]
+        df = df.fillna("")
+
+        self.logger.info("✅ %s is transformed.", self.csv_path)
+        return df
+
+    def read_csv_chunks(self, chunk_size=None):
+        """
+        Streams the csv in fixed-size chunks instead of loading it at once.
+
+        Returns:
+            - columns (list): normalised column names
+            - chunks (generator): lists of row tuples, at most chunk_size long
+        """
+        chunk_size = chunk_size or self.chunk_size
+        if self.engine == "native":
+            return self._read_native_chunks(chunk_size)
+
+        reader = self._read_pandas_csv(chunksize=chunk_size)
+        first = next(reader)
+        columns = [normalise_column(col) for col in first.columns]
+
+        def chunks():
+            with reader:
+                for chunk in itertools.chain([first], reader):
+                    yield list(chunk.fillna("").itertuples(index=False, name=None))
+
+        return columns, chunks()
+
+    def _read_pandas_csv(self, **options):
+        """pandas.read_csv of the csv with PANDAS_CSV_OPTIONS and options"""
+        import pandas as pd  # Imported on use, it is the heaviest dependency
 
         try:
-            df = pd.read_csv(self.csv_path, encoding="utf-8")
+            return pd.read_csv(self.csv_path, **PANDAS_CSV_OPTIONS, **options)
         except FileNotFoundError:
             self.logger.error("CSV file not found at %s", self.csv_path)
             raise
 
-        df.columns = (
-            df.columns.str.strip()
-            .str.replace(" ", "_")
-            .str.replace("/", "_")
-            .str.replace("&", "and")
-            .str.lower()
-        )
-        df = df.fillna("")
+    def _read_native_chunks(self, chunk_size):
+        """
+        read_csv_chunks with the csv module, following the pandas conventions:
+        BOM stripped, blank lines skipped and missing trailing cells set to "".
+        """
+        try:
+            f = open(self.csv_path, "r", encoding="utf-8-sig", newline="")
+        except FileNotFoundError:
+            self.logger.error("CSV file not found at %s", self.csv_path)
+            raise
 
-        self.logger.info("✅ %s is transformed.", self.csv_path)
-        return df
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            f.close()
+            raise ValueError("No columns to parse from file")
+        columns = [normalise_column(col) for col in header]
+        width = len(columns)
+
+        def chunks():
+            with f:
+                rows = []
+                for row in reader:
+                    if not row:
+                        continue
+                    if len(row) > width:
+                        raise ValueError(
+                            f"Expected {width} fields in line {reader.line_num}, "
+                            f"saw {len(row)}"
+                        )
+                    rows.append(tuple(row) + ("",) * (width - len(row)))
+                    if len(rows) == chunk_size:
+                        yield rows
+                        rows = []
+                if rows:
+                    yield rows
+
+        return columns, chunks()
 
     def save_as_sqlite(self, df, db_path=None):
-        """Save DataFrame to SQLite"""
-        db_path = db_path or self.db_path
+        """Save DataFrame (or SponsorTable) to SQLite"""
+        if isinstance(df, SponsorTable):
+            chunks = (
+                df.rows[i : i + self.chunk_size]
+                for i in range(0, len(df), self.chunk_size)
+            )
+            self._store(db_path or self.db_path, list(df.columns), chunks)
+            return
+        df = df.astype(str)
+        chunks = (
+            list(df.iloc[i : i + self.chunk_size].itertuples(index=False, name=None))
+            for i in range(0, len(df), self.chunk_size)
+        )
+        self._store(db_path or self.db_path, list(df.columns), chunks)
+
+    def stream_to_sqlite(self, db_path=None, progress=None, cancelled=None):
+        """Save the csv to SQLite chunk by chunk, memory stays bounded by chunk_size"""
+        self.logger.info(
+            "📌 %s is streaming to SQLite (%s engine)...", self.csv_path, self.engine
+        )
+        columns, chunks = self.read_csv_chunks()
+        self._store(
+            db_path or self.db_path,
+            columns,
+            chunks,
+            progress=progress,
+            cancelled=cancelled,
+        )
+
+    def _store(self, db_path, columns, chunks, *, progress=None, cancelled=None):
+        """
+        Stages the given chunks and applies them to the sponsors table.
+
+        If the table already has the same layout only the delta is applied, in a
+        single transaction: rows whose hash disappeared are deleted and only new
+        hashes are inserted. Otherwise (first import or csv schema change) the
+        rows are loaded into a shadow table which then replaces sponsors
+        atomically. Either way readers never see an empty or half-filled table.
+        A cancelled import rolls back, leaving the table as is: cancelled is
+        checked between staged chunks (see _stage_rows) and search index builds,
+        up to the swap or the delta's last change to sponsors.
+        """
         with sqlite3.connect(db_path) as conn:
             cursor = conn.cursor()
+            cursor.execute(f"PRAGMA cache_size=-{IMPORT_CACHE_KIB}")
+            self._create_changes_table(cursor)
+            row_count = self._stage_rows(
+                cursor, columns, chunks, progress=progress, cancelled=cancelled
+            )
+
+            cursor.execute("PRAGMA table_info(sponsors)")
+            existing = [col[1] for col in cursor.fetchall()]
+            if existing == ["id", *columns, *DERIVED_COLUMNS] and self._get_meta(
+                cursor, "schema_version"
+            ) == str(SCHEMA_VERSION):
+                raise_if_cancelled(cancelled)
+                added, removed = self._apply_delta(cursor, columns)
+                raise_if_cancelled(cancelled)
+            else:
+                if existing:
+                    self.logger.info("Sponsors schema changed, rebuilding the table")
+                added = self._swap_in_shadow(conn, columns, cancelled=cancelled)
+                removed = 0
+                self._count_facets(cursor, columns)
+            if added or removed:
+                generation = int(self._get_meta(cursor, GENERATION_KEY) or 0) + 1
+                self._set_meta(cursor, GENERATION_KEY, str(generation))
+            if added or removed or not self._has_table(cursor, NAME_GRAMS_TABLE):
+                self._count_name_grams(cursor)
+            if added or removed or not self._has_table(cursor, CITIES_TABLE):
+                self._count_cities(cursor, columns)
+            # Fresh statistics let the planner choose between the filter and
+            # sort key indexes
+            cursor.execute("ANALYZE sponsors")
+        self.logger.info(
+            "✅ %s rows saved to %s (%s added, %s removed)",
+            row_count,
+            db_path,
+            added,
+            removed,
+        )
+
+    def _swap_in_shadow(self, conn, columns, *, cancelled=None):
+        """
+        Bulk loads the staged rows into sponsors_shadow, then drops the old
+        sponsors table, indexes the shadow and renames it in one transaction.
+        The bulk load runs with synchronous=OFF as only the shadow is written.
+        Cancelling before the rename leaves the shadow tables, the next
+        import drops them.
+
+        Returns:
+            int: number of rows loaded
+        """
+        cursor = conn.cursor()
+        column_names = ", ".join([*columns, *NORMALISED_COLUMNS.values()])
+        conn.commit()  # The safety level can only change outside a transaction
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.execute("DROP TABLE IF EXISTS sponsors_shadow")
+        self._create_sponsors_table(cursor, "sponsors_shadow", columns)
+        city_id = self._add_cities(cursor, columns)
+        cursor.execute(
+            f"""
+            INSERT INTO sponsors_shadow ({column_names}, row_hash, city_id)
+            SELECT {column_names}, row_hash, {city_id}
+            FROM temp.sponsors_incoming ORDER BY seq
+            """
+        )
+        loaded = cursor.rowcount
+        cursor.execute("DROP TABLE temp.sponsors_incoming")
+        search_indexes = self._build_search_tables(
+            cursor, "sponsors_shadow", columns, cancelled=cancelled
+        )
+        conn.commit()
+        cursor.execute("PRAGMA synchronous=FULL")
+
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DROP TABLE IF EXISTS sponsors")
+        for name in SEARCH_INDEXES:
+            cursor.execute(f"DROP TABLE IF EXISTS {name}")
+        self._create_sponsors_indexes(cursor, "sponsors_shadow", columns)
+        cursor.execute("ALTER TABLE sponsors_shadow RENAME TO sponsors")
+        for name in search_indexes:
+            cursor.execute(f"ALTER TABLE {name}_shadow RENAME TO {name}")
+        self._set_meta(cursor, "schema_version", str(SCHEMA_VERSION))
+        conn.commit()
+        return loaded
 
-            # Check if table exists and fetch previous applied data
-            # cursor.execute(
-            #     "SELECT name FROM sqlite_master WHERE type='table' AND name='sponsors'"
-            # )
-            # if cursor.fetchone():
-            #     cursor.execute("SELECT organisation_name, applied FROM sponsors")
-            #     applied_data = dict(cursor.fetchall())
-            # else:
-            #     applied_data = {}
-
-            # Add 'applied' column to DataFrame based on existing data
-            # if "organisation_name" not in df.columns:
-            #     raise ValueError("'organisation_name' column is missing from the CSV.")
-            # df["applied"] = df["organisation_name"].apply(
-            #     lambda name: applied_data.get(name, 0)
-            # )
-
-            # Build column creation SQL (excluding 'applied')
-            column_names = ", ".join([f"{col} TEXT" for col in df.columns])
+    @staticmethod
+    def _build_search_tables(cursor, source_table, columns, *, cancelled=None):
+        """
+        Builds the FTS5 search indexes from the shadow table. Each is created
+        as <name>_shadow with sponsors as its external content table and
+        renamed together with the shadow table. Raises IngestCancelled before
+        each build once cancelled returns True.
+
+        Returns:
+            list: names of the indexes built, those whose columns are in the csv
+        """
+        built = []
+        for name, (index_columns, tokenizer) in SEARCH_INDEXES.items():
+            raise_if_cancelled(cancelled)
+            cursor.execute(f"DROP TABLE IF EXISTS {name}_shadow")
+            if not set(index_columns) <= set(columns):
+                continue
+            index_column_names = ", ".join(index_columns)
             cursor.execute(
                 f"""
-                CREATE TABLE IF NOT EXISTS sponsors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    {column_names}
+                CREATE VIRTUAL TABLE {name}_shadow USING fts5(
+                    {index_column_names}, tokenize='{tokenizer}',
+                    content='sponsors', content_rowid='id'
                 )
+                """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO {name}_shadow (rowid, {index_column_names})
+                SELECT id, {index_column_names} FROM {source_table}
+                """
+            )
+            built.append(name)
+        return built
+
+    def _count_facets(self, cursor, columns):
+        """Counts the sponsors per combination of FACET_COLUMNS values"""
+        cursor.execute(f"DROP TABLE IF EXISTS {FACETS_TABLE}")
+        if not set(FACET_COLUMNS) <= set(columns):
+            return
+        facet_names = ", ".join(FACET_COLUMNS)
+        cursor.execute(
+            f"""
+            CREATE TABLE {FACETS_TABLE} (
+                {facet_names}, sponsors INTEGER NOT NULL,
+                PRIMARY KEY ({facet_names})
+            ) WITHOUT ROWID
             """
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {FACETS_TABLE} ({facet_names}, sponsors)
+            SELECT {facet_names}, COUNT(*) FROM sponsors GROUP BY {facet_names}
+            """
+        )
+
+    def _update_facets(self, cursor, source, row_filter, sign):
+        """Adds (sign 1) or subtracts (sign -1) the filtered rows' facet counts"""
+        facet_names = ", ".join(FACET_COLUMNS)
+        cursor.execute(
+            f"""
+            INSERT INTO {FACETS_TABLE} ({facet_names}, sponsors)
+            SELECT {facet_names}, ? * COUNT(*) FROM {source}
+            WHERE {row_filter} GROUP BY {facet_names}
+            ON CONFLICT ({facet_names})
+            DO UPDATE SET sponsors = sponsors + excluded.sponsors
+            """,
+            (sign,),
+        )
+
+    def _add_cities(self, cursor, columns):
+        """
+        Adds the city keys of the staged rows missing from CITIES_TABLE, so
+        the ids of known cities stay the same across imports.
+
+        Returns:
+            str: SQL expression of a staged row's city_id
+        """
+        if "town_city" not in columns:
+            return "NULL"
+        cursor.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {CITIES_TABLE} (
+                id INTEGER PRIMARY KEY,
+                key TEXT NOT NULL UNIQUE,
+                name TEXT NOT NULL DEFAULT '',
+                aliases TEXT NOT NULL DEFAULT '[]',
+                sponsors INTEGER NOT NULL DEFAULT 0
             )
-            # applied INTEGER DEFAULT 0
+            """
+        )
+        cursor.execute(
+            f"INSERT OR IGNORE INTO {CITIES_TABLE} (key) "
+            "SELECT DISTINCT city_key FROM temp.sponsors_incoming"
+        )
+        return f"(SELECT id FROM {CITIES_TABLE} WHERE key = city_key)"
+
+    def _count_cities(self, cursor, columns):
+        """
+        Recounts the sponsors of each city, with its spellings as aliases,
+        most common first, and the most common one as its name. Ties go to
+        the spelling sorting first. Cities left without sponsors are deleted.
+        """
+        if "town_city" not in columns:
+            cursor.execute(f"DROP TABLE IF EXISTS {CITIES_TABLE}")
+            return
+        cursor.execute(
+            f"DELETE FROM {CITIES_TABLE} WHERE id NOT IN (SELECT city_id FROM sponsors)"
+        )
+        cursor.execute(
+            f"""
+            UPDATE {CITIES_TABLE}
+            SET name = counted.name, aliases = counted.aliases,
+                sponsors = counted.sponsors
+            FROM (
+                SELECT city_id, town_city AS name,
+                       ROW_NUMBER() OVER spellings AS spelling_rank,
+                       SUM(spelling_sponsors) OVER spellings AS sponsors,
+                       json_group_array(town_city) OVER spellings AS aliases
+                FROM (
+                    SELECT city_id, town_city, COUNT(*) AS spelling_sponsors
+                    FROM sponsors GROUP BY city_id, town_city
+                )
+                WINDOW spellings AS (
+                    PARTITION BY city_id ORDER BY spelling_sponsors DESC, town_city
+                    ROWS BETWEEN UNBOUNDED PRECEDING AND UNBOUNDED FOLLOWING
+                )
+            ) AS counted
+            WHERE id = counted.city_id AND counted.spelling_rank = 1
+            """
+        )
+
+    def _count_name_grams(self, cursor):
+        """Recounts NAME_GRAMS_TABLE from the trigram index's vocabulary"""
+        cursor.execute(f"DROP TABLE IF EXISTS {NAME_GRAMS_TABLE}")
+        if not self._has_table(cursor, "sponsors_trigram"):
+            return
+        cursor.execute(
+            f"CREATE TABLE {NAME_GRAMS_TABLE} "
+            "(gram TEXT PRIMARY KEY, names INTEGER NOT NULL) WITHOUT ROWID"
+        )
+        cursor.execute(
+            "CREATE VIRTUAL TABLE temp.sponsors_trigram_vocab "
+            "USING fts5vocab(main, sponsors_trigram, 'col')"
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {NAME_GRAMS_TABLE} (gram, names)
+            SELECT term, doc FROM temp.sponsors_trigram_vocab
+            WHERE col = 'organisation_name'
+            """
+        )
+        cursor.execute("DROP TABLE temp.sponsors_trigram_vocab")
+
+    @staticmethod
+    def _has_table(cursor, name):
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,))
+        return cursor.fetchone() is not None
+
+    @staticmethod
+    def _create_sponsors_table(cursor, table, columns):
+        column_names = ", ".join([f"{col} TEXT" for col in columns])
+        cursor.execute(
+            f"""
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                {column_names},
+                row_hash TEXT NOT NULL,
+                {", ".join(f"{col} TEXT" for col in NORMALISED_COLUMNS.values())},
+                city_id INTEGER
+            )
+            """
+        )
+
+    @staticmethod
+    def _create_sponsors_indexes(cursor, table, columns):
+        """
+        Index names are kept stable so they survive the rename of the shadow
+        table, hence the old sponsors table has to be dropped first.
+        """
+        cursor.execute(f"CREATE INDEX idx_sponsors_row_hash ON {table}(row_hash)")
+        # Serves the (organisation_name, id) page order, id being the rowid
+        cursor.execute(
+            f"CREATE INDEX idx_sponsors_organisation_name ON {table}(organisation_name)"
+        )
+        cursor.execute(
+            f"CREATE INDEX idx_sponsors_organisation_name_norm "
+            f"ON {table}(organisation_name_norm)"
+        )
+        # Exact city filters read their pages in sort key order from the index
+        cursor.execute(
+            f"CREATE INDEX idx_sponsors_city_id ON {table}(city_id, organisation_name)"
+        )
+        # Serve the (column, organisation_name, id) orders of header sorts
+        for column in SORT_COLUMNS:
+            if column not in columns:
+                continue
+            cursor.execute(
+                f"CREATE INDEX idx_sponsors_{column}_sort "
+                f"ON {table}({column}, organisation_name)"
+            )
+
+    def _stage_rows(self, cursor, columns, chunks, *, progress=None, cancelled=None):
+        """
+        Loads the incoming rows with their hashes, normalised columns and city
+        key into a temp table. Identical rows get an occurrence number so
+        duplicates are kept. Raises IngestCancelled between chunks once
+        cancelled returns True.
+        """
+        sources = [
+            columns.index(col) if col in columns else None for col in NORMALISED_COLUMNS
+        ]
+        city = columns.index("town_city") if "town_city" in columns else None
+        columns = [*columns, *NORMALISED_COLUMNS.values(), "city_key"]
+        column_names = ", ".join(columns)
+        cursor.execute("DROP TABLE IF EXISTS temp.sponsors_staging")
+        cursor.execute("DROP TABLE IF EXISTS temp.sponsors_incoming")
+        cursor.execute(
+            f"CREATE TEMP TABLE sponsors_staging "
+            f"(seq INTEGER PRIMARY KEY, digest TEXT, {column_names})"
+        )
+        insert_sql = (
+            f"INSERT INTO sponsors_staging (digest, {column_names}) "
+            f"VALUES (?, {', '.join('?' * len(columns))})"
+        )
+
+        def staged(row):
+            norms = (normalise_text(row[i]) if i is not None else "" for i in sources)
+            key = city_key(row[city]) if city is not None else ""
+            return (row_digest(row), *row, *norms, key)
+
+        row_count = 0
+        for rows in chunks:
+            raise_if_cancelled(cancelled)
+            cursor.executemany(insert_sql, map(staged, rows))
+            row_count += len(rows)
+            if progress:
+                progress(f"Importing sponsor register... {row_count} rows")
+
+        cursor.execute(
+            f"""
+            CREATE TEMP TABLE sponsors_incoming AS
+            SELECT digest || '-' || ROW_NUMBER() OVER (
+                       PARTITION BY digest ORDER BY seq
+                   ) AS row_hash,
+                   seq, {column_names}
+            FROM sponsors_staging
+            """
+        )
+        cursor.execute("DROP TABLE temp.sponsors_staging")
+        cursor.execute(
+            "CREATE INDEX temp.idx_incoming_row_hash ON sponsors_incoming(row_hash)"
+        )
+        return row_count
+
+    def _apply_delta(self, cursor, columns):
+        """
+        Deletes vanished rows and inserts new ones, recording both in
+        sponsor_changes stamped with today's date. Facet counts are updated
+        by the same rows instead of being recounted.
+
+        Returns:
+            tuple: (added, removed) row counts
+        """
+        column_names = ", ".join([*columns, *NORMALISED_COLUMNS.values()])
+        row_json = "json_object(" + ", ".join(f"'{c}', {c}" for c in columns) + ")"
+        import_date = date.today().isoformat()
+
+        removed_filter = "row_hash NOT IN (SELECT row_hash FROM temp.sponsors_incoming)"
+        cursor.execute(
+            f"""
+            INSERT INTO sponsor_changes (import_date, change, row_hash, row_data)
+            SELECT ?, 'removed', row_hash, {row_json}
+            FROM main.sponsors WHERE {removed_filter}
+            """,
+            (import_date,),
+        )
+        search_indexes = {
+            name: ", ".join(index_columns)
+            for name, (index_columns, _) in SEARCH_INDEXES.items()
+            if self._has_table(cursor, name)
+        }
+        for name, index_column_names in search_indexes.items():
+            cursor.execute(
+                f"""
+                INSERT INTO {name} ({name}, rowid, {index_column_names})
+                SELECT 'delete', id, {index_column_names}
+                FROM main.sponsors WHERE {removed_filter}
+                """
+            )
+        has_facets = self._has_table(cursor, FACETS_TABLE)
+        if has_facets:
+            self._update_facets(cursor, "main.sponsors", removed_filter, -1)
+        cursor.execute(f"DELETE FROM main.sponsors WHERE {removed_filter}")
+        removed = cursor.rowcount
+
+        added_filter = "row_hash NOT IN (SELECT row_hash FROM main.sponsors)"
+        if has_facets:
+            self._update_facets(cursor, "temp.sponsors_incoming", added_filter, 1)
+            cursor.execute(f"DELETE FROM {FACETS_TABLE} WHERE sponsors = 0")
+        cursor.execute(
+            f"""
+            INSERT INTO sponsor_changes (import_date, change, row_hash, row_data)
+            SELECT ?, 'added', row_hash, {row_json}
+            FROM temp.sponsors_incoming WHERE {added_filter}
+            """,
+            (import_date,),
+        )
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM main.sponsors")
+        last_id = cursor.fetchone()[0]
+        city_id = self._add_cities(cursor, columns)
+        cursor.execute(
+            f"""
+            INSERT INTO main.sponsors ({column_names}, row_hash, city_id)
+            SELECT {column_names}, row_hash, {city_id}
+            FROM temp.sponsors_incoming WHERE {added_filter}
+            ORDER BY seq
+            """
+        )
+        added = cursor.rowcount
+        for name, index_column_names in search_indexes.items():
+            cursor.execute(
+                f"""
+                INSERT INTO {name} (rowid, {index_column_names})
+                SELECT id, {index_column_names} FROM main.sponsors WHERE id > ?
+                """,
+                (last_id,),
+            )
+        cursor.execute("DROP TABLE temp.sponsors_incoming")
+        return added, removed
+
+    @staticmethod
+    def _create_changes_table(cursor):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sponsor_changes (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                import_date TEXT NOT NULL,
+                change TEXT NOT NULL,
+                row_hash TEXT NOT NULL,
+                row_data TEXT NOT NULL
+            )
+            """
+        )
+
+    def csv_fingerprint(self):
+        """Size, mtime, content hash and column schema of the csv file"""
+        stat = os.stat(self.csv_path)
+        sha256 = hashlib.sha256()
+        with open(self.csv_path, "rb") as f:
+            for block in iter(lambda: f.read(1024 * 1024), b""):
+                sha256.update(block)
+        with open(self.csv_path, "r", encoding="utf-8-sig", newline="") as f:
+            header = next(csv.reader(f), [])
+        return {
+            "size": stat.st_size,
+            "mtime": stat.st_mtime_ns,
+            "sha256": sha256.hexdigest(),
+            "columns": [normalise_column(col) for col in header],
+            "schema": SCHEMA_VERSION,
+        }
+
+    def get_stored_fingerprint(self):
+        """
+        Returns the fingerprint of the last imported csv,
+        or None if nothing has been imported into the sponsors table yet.
+        """
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._create_meta_table(cursor)
+            cursor.execute(
+                """
+                SELECT value FROM import_meta
+                WHERE key = ? AND EXISTS (
+                    SELECT 1 FROM sqlite_master WHERE type='table' AND name='sponsors'
+                )
+                """,
+                (FINGERPRINT_KEY,),
+            )
+            row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    def record_fingerprint(self, fingerprint):
+        """Stores the fingerprint of the imported csv"""
+        with sqlite3.connect(self.db_path) as conn:
+            cursor = conn.cursor()
+            self._create_meta_table(cursor)
+            cursor.execute(
+                "INSERT OR REPLACE INTO import_meta (key, value) VALUES (?, ?)",
+                (FINGERPRINT_KEY, json.dumps(fingerprint)),
+            )
+
+    def is_import_current(self):
+        """
+        Checks whether the csv is already imported.
+        Size and mtime are compared first, the file is only hashed if they differ
+        (e.g. the same file has been downloaded again).
+        """
+        stored = self.get_stored_fingerprint()
+        if stored is None or stored.get("schema") != SCHEMA_VERSION:
+            return False
+        stat = os.stat(self.csv_path)
+        if stored["size"] == stat.st_size and stored["mtime"] == stat.st_mtime_ns:
+            return True
+
+        current = self.csv_fingerprint()
+        if (
+            current["sha256"] == stored["sha256"]
+            and current["columns"] == stored["columns"]
+        ):
+            # Same content with a new mtime, remember it to skip hashing next time
+            self.record_fingerprint(current)
+            return True
+        return False
 
-            # Clear old data and insert new
-            cursor.execute("DELETE FROM sponsors")
-            df.to_sql("sponsors", conn, if_exists="append", index=False)
-        self.logger.info("✅ Data saved to %s", db_path)
+    def import_csv(self, force=False, progress=None, cancelled=None):
+        """
+        Streams the csv into SQLite unless it is unchanged since the last import.
+        cancelled is checked while staging and indexing rows, see _store.
+
+        Returns:
+            bool: True if the sponsors table was rewritten
+        """
+        if not force and self.is_import_current():
+            self.logger.info("✅ %s is unchanged, import skipped.", self.csv_path)
+            return False
+        fingerprint = self.csv_fingerprint()
+        self.stream_to_sqlite(progress=progress, cancelled=cancelled)
+        self.record_fingerprint(fingerprint)
+        return True
+
+    def _get_meta(self, cursor, key):
+        self._create_meta_table(cursor)
+        cursor.execute("SELECT value FROM import_meta WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, cursor, key, value):
+        self._create_meta_table(cursor)
+        cursor.execute(
+            "INSERT OR REPLACE INTO import_meta (key, value) VALUES (?, ?)",
+            (key, value),
+        )
+
+    @staticmethod
+    def _create_meta_table(cursor):
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS import_meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            )
+            """
+        )
 
 
 if __name__ == "__main__":
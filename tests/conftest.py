@@ -0,0 +1,61 @@
+"""
+Sponsor registers shared by the tests.
+
+register imports the test module's ROWS, or the rows a test passes by
+indirect parametrisation, into a new database. import_register does the same
+for rows built by a test or a module scoped fixture.
+"""
+
+import os
+import sqlite3
+import pytest
+from models.transform_model import TransformDB
+
+HEADER = "Organisation Name,Town/City,County,Type & Rating,Route\n"
+
+
+def write_csv(path, rows, header=HEADER):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(header + "\n".join(rows) + "\n")
+
+
+def register_db(directory, rows, *, header=HEADER, **options):
+    """TransformDB of a sponsors csv of rows written to directory, not imported"""
+    csv_path = os.path.join(directory, "sponsors.csv")
+    write_csv(csv_path, rows, header)
+    return TransformDB(
+        csv_path=csv_path, db_path=os.path.join(directory, "test.db"), **options
+    )
+
+
+@pytest.fixture(name="import_register", scope="session")
+def make_import_register(tmp_path_factory):
+    """
+    Imports rows into a register in a new temporary directory, returns its
+    TransformDB and an open connection, closed at the end of the session.
+    """
+    conns = []
+
+    def import_register(rows):
+        transform_db = register_db(tmp_path_factory.mktemp("register"), rows)
+        transform_db.import_csv()
+        conns.append(sqlite3.connect(transform_db.db_path))
+        return transform_db, conns[-1]
+
+    yield import_register
+    for conn in conns:
+        conn.close()
+
+
+@pytest.fixture(name="register")
+def make_register(request, tmp_path):
+    """
+    Imported sponsor register of the module's ROWS, or of request.param,
+    and an open connection to it
+    """
+    rows = getattr(request, "param", None) or request.module.ROWS
+    transform_db = register_db(tmp_path, rows)
+    transform_db.import_csv()
+    conn = sqlite3.connect(transform_db.db_path)
+    yield transform_db, conn
+    conn.close()
@@ -0,0 +1,86 @@
+import pytest
+from conftest import write_csv
+from models.fuzzy_search import FuzzySearch, NameScorer
+from models.sponsor_query import SponsorFilter, SponsorQueryBuilder
+from models.transform_model import NAME_GRAMS_TABLE
+
+ROWS = [
+    "Acme Healthcare Ltd.,London,,Worker (A rating),Skilled Worker",
+    "Acme Logistics Limited,Leeds,,Worker (A rating),Skilled Worker",
+    "Zenith Healthcare Ltd,Leeds,,Worker (A rating),Skilled Worker",
+    "Smith & Sons Company,Bath,,Worker (A rating),Skilled Worker",
+    # Filler making "ltd" a common trigram
+    *(f"Filler {i} Ltd,Bath,,Worker (A rating),Skilled Worker" for i in range(60)),
+]
+
+
+@pytest.fixture(name="fuzzy")
+def make_fuzzy(register):
+    """Fuzzy search of the imported register"""
+    _, conn = register
+    return FuzzySearch(SponsorQueryBuilder(conn))
+
+
+def names(fuzzy, organisation, city=""):
+    sponsor_filter = SponsorFilter.from_inputs(organisation, city, fuzzy=True)
+    return [row[0] for row in fuzzy.search(sponsor_filter, 10)]
+
+
+@pytest.mark.parametrize(
+    "organisation, expected",
+    [
+        ("acme helthcare limited", "Acme Healthcare Ltd."),
+        ("ACME logistics ltd", "Acme Logistics Limited"),
+        ("smith and sons co", "Smith & Sons Company"),
+        ("zenit", "Zenith Healthcare Ltd"),
+    ],
+)
+def test_best_match_first(fuzzy, organisation, expected):
+    assert names(fuzzy, organisation)[0] == expected
+
+
+def test_city_filter_applies(fuzzy):
+    assert names(fuzzy, "healthcare", "leeds") == ["Zenith Healthcare Ltd"]
+    assert not names(fuzzy, "healthcare", '"Bath"')
+
+
+def test_common_trigrams_shortlist_names_with_all(fuzzy):
+    assert " AND " in fuzzy.shortlist_match("filler ltd")
+    assert " OR " in fuzzy.shortlist_match("zenith ltd")
+    assert fuzzy.shortlist_match("qqq") is None
+
+
+def test_supports(register, fuzzy):
+    _, conn = register
+    assert fuzzy.supports(SponsorFilter(organisation="acme", fuzzy=True))
+    assert not fuzzy.supports(SponsorFilter(organisation="acme"))
+    assert not fuzzy.supports(SponsorFilter(organisation="ac", fuzzy=True))
+    conn.execute(f"DROP TABLE {NAME_GRAMS_TABLE}")
+    fuzzy.query_builder.refresh()
+    assert not fuzzy.supports(SponsorFilter(organisation="acme", fuzzy=True))
+
+
+def test_name_grams_follow_delta_import(register):
+    transform_db, conn = register
+
+    def names_with(gram):
+        row = conn.execute(
+            f"SELECT names FROM {NAME_GRAMS_TABLE} WHERE gram = ?", (gram,)
+        ).fetchone()
+        return row[0] if row else 0
+
+    assert names_with("ack") == 0
+    write_csv(
+        transform_db.csv_path,
+        [*ROWS[1:], "Zackary Health,Leeds,,Worker (A rating),Skilled Worker"],
+    )
+    transform_db.import_csv()
+    assert names_with("ack") == 1
+    assert names_with("acm") == 1  # Acme Healthcare Ltd. was removed
+
+
+def test_scores():
+    scorer = NameScorer("Acme Healthcare")
+    assert scorer.score("ACME healthcare") == 1.0
+    assert scorer.score("Acme Healthcare Ltd") > scorer.score("Acme Dental Ltd")
+    assert scorer.score("") == 0.0
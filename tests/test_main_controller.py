@@ -0,0 +1,180 @@
+import json
+import os
+import time
+import pytest
+from conftest import register_db
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# pylint: disable=wrong-import-position
+from PyQt6.QtCore import QEvent, QThread
+from PyQt6.QtWidgets import QApplication
+from controllers import action_handlers, data_controller, main_controller
+from controllers.main_controller import TSAController
+from models.applications_model import ApplicationsModel
+from models.columnar_index import ColumnarIndex
+from models.sponsor_query import RELEVANCE, SponsorSort
+
+ROWS = [
+    f"{name} {i},{city},,Worker (A rating),Skilled Worker"
+    for i in range(40)
+    for name, city in (
+        ("Acme Care Ltd", "London"),
+        ("Care Homes", "Leeds"),
+        ("North Nursing", "Bath"),
+    )
+]
+
+
+def wait_for(condition, timeout=5):
+    """Runs the event loop until condition() holds"""
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "❌ Timed out waiting for the controller"
+        QApplication.processEvents()
+        time.sleep(0.01)
+
+
+@pytest.fixture(name="start_controller")
+def make_start_controller(tmp_path, monkeypatch):
+    """
+    Starts TSAController on an imported register in tmp_path, with the
+    given settings. The ingest and release check are not started.
+    """
+    app = QApplication.instance() or QApplication([])
+    transform_db = register_db(tmp_path, ROWS)
+    transform_db.import_csv()
+    db_path = transform_db.db_path
+    settings_path = tmp_path / "settings.json"
+    monkeypatch.setattr(data_controller, "DB_PATH", db_path)
+    monkeypatch.setattr(
+        data_controller, "ApplicationsModel", lambda: ApplicationsModel(db_path)
+    )
+    monkeypatch.setattr(main_controller, "SETTINGS_PATH", str(settings_path))
+    monkeypatch.setattr(TSAController, "start_ingest", lambda self: None)
+    # Shortcuts of an earlier test's window, deleted with it
+    monkeypatch.setattr(action_handlers, "shortcut_list", [])
+    controllers = []
+
+    def start(**settings):
+        settings_path.write_text(
+            json.dumps({"check_for_release": False, **settings}), encoding="utf-8"
+        )
+        controller = TSAController()
+        controllers.append(controller)
+        return controller
+
+    yield start
+    for controller in controllers:
+        controller.close()
+    app.processEvents()
+
+
+def test_failed_search_keeps_applied_filter(start_controller):
+    controller = start_controller()
+    applied = controller.search.sponsor_filter
+    # New organisation searches are ranked, the ranking query fails
+    controller.search.query_builder.rank_query = lambda *args: (
+        "SELECT * FROM missing",
+        [],
+    )
+    controller.view.org_input.setText("nursing")
+    controller.start_search()
+    wait_for(lambda: controller.search.pending_search is None)
+    assert controller.search.sponsor_filter == applied
+    assert controller.statusBar().currentMessage().startswith("❌ Search failed")
+
+
+def test_facet_counts_follow_applied_filter(start_controller):
+    controller = start_controller()
+    route = controller.view.facet_combos["route"]
+    assert route.itemText(1) == "Skilled Worker (120)"
+    controller.view.org_input.setText("nursing")
+    controller.apply_filter()
+    wait_for(lambda: route.itemText(1) == "Skilled Worker (40)")
+
+
+def test_columnar_engine_serves_organisation_search(start_controller):
+    controller = start_controller(filter_engine="columnar")
+    wait_for(lambda: controller.search.columnar_index is not None)
+    controller.view.org_input.setText("care")
+    controller.apply_filter()
+    assert (
+        controller.search.pager.sort == SponsorSort()
+    ), "❌ Search ranked, not columnar"
+    assert controller.search.columnar_serves(
+        controller.search.sponsor_filter, controller.search.pager.sort
+    )
+    assert controller.view.sponsor_table.rowCount() == 50
+
+
+def test_ranked_pages_rank_once(start_controller):
+    controller = start_controller()
+    builder = controller.search.query_builder
+    rank_query = builder.rank_query
+    calls = []
+    builder.rank_query = lambda *args: calls.append(args) or rank_query(*args)
+    controller.view.org_input.setText("care")
+    controller.start_search()
+    wait_for(lambda: controller.search.pending_search is None)
+    table = controller.view.sponsor_table
+    assert controller.search.pager.sort == SponsorSort(RELEVANCE)
+    assert table.item(0, 0).text().startswith("Care Homes"), "❌ Not ranked"
+    controller.load_next_page()
+    assert table.rowCount() == 30
+    assert len(calls) == 1, "❌ Next page ranked the search again"
+
+
+def test_failed_columnar_index_not_reloaded(start_controller, monkeypatch):
+    loads = []
+
+    def failing_load(conn, generation):
+        loads.append(generation)
+        raise MemoryError("no room for the index")
+
+    monkeypatch.setattr(ColumnarIndex, "load", failing_load)
+    controller = start_controller(filter_engine="columnar")
+    wait_for(lambda: controller.search.index_failed_generation is not None)
+    deadline = time.monotonic() + 0.5
+    while time.monotonic() < deadline:
+        QApplication.processEvents()
+    assert len(loads) == 1, "❌ Failed index load was retried"
+    assert controller.search.columnar_index is None
+    assert "Columnar index not loaded" in controller.statusBar().currentMessage()
+
+
+def test_typing_reuses_worker_threads(start_controller):
+    controller = start_controller(estimate_counts=True)
+    requested = []
+    controller.search.count_requested.connect(lambda *request: requested.append(1))
+    threads = len(controller.findChildren(QThread))
+    for name in ("L", "Lo", "Le", "L"):
+        controller.view.city_input.setText(name)
+        controller.apply_filter()
+    wait_for(lambda: controller.search.pending_search is None)
+    wait_for(lambda: controller.search.counting_key is None)
+    assert requested, "❌ No count was left to the worker"
+    assert len(controller.findChildren(QThread)) == threads
+
+
+def test_finished_worker_thread_deleted(start_controller):
+    controller = start_controller(filter_engine="columnar")
+    wait_for(lambda: controller.search.columnar_index is not None)
+    wait_for(lambda: controller.search.index_thread is None)
+    QApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+    assert len(controller.findChildren(QThread)) == len(controller.search.query_threads)
+
+
+def test_ranked_again_on_search_worker(start_controller):
+    controller = start_controller()
+    controller.view.org_input.setText("care")
+    controller.apply_filter()
+    assert controller.search.pending_search is not None, "❌ Ranked on the GUI thread"
+    wait_for(lambda: controller.search.pending_search is None)
+    assert controller.search.pager.sort == SponsorSort(RELEVANCE)
+    # Application changes drop the ranked ids, the page waits for the worker
+    controller.search.applications_changed()
+    controller.load_data_page()
+    assert controller.search.pending_search is not None, "❌ Ranked on the GUI thread"
+    wait_for(lambda: controller.search.pending_search is None)
+    assert controller.view.sponsor_table.item(0, 0).text().startswith("Care Homes")
@@ -0,0 +1,35 @@
+from models.page_cache import PageCache, rows_size
+
+ROWS = [("Acme Care Ltd", "London", "", "Worker (A rating)", "Skilled Worker", 1)]
+
+
+def test_hits_and_misses():
+    cache = PageCache()
+    assert cache.get("page 1") is None
+    cache.put("page 1", ROWS)
+    assert cache.get("page 1") == ROWS
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_least_recently_used_page_evicted():
+    cache = PageCache(max_bytes=rows_size(ROWS) * 2)
+    cache.put("page 1", ROWS)
+    cache.put("page 2", ROWS)
+    cache.get("page 1")
+    cache.put("page 3", ROWS)
+    assert "page 1" in cache and "page 3" in cache
+    assert "page 2" not in cache, "❌ Least recently used page kept"
+    assert cache.size <= cache.max_bytes
+
+
+def test_page_over_the_cap_not_cached():
+    cache = PageCache(max_bytes=rows_size(ROWS) - 1)
+    cache.put("page 1", ROWS)
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_replaced_page_keeps_size():
+    cache = PageCache()
+    cache.put("page 1", ROWS)
+    cache.put("page 1", ROWS)
+    assert cache.size == rows_size(ROWS)
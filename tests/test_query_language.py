@@ -0,0 +1,78 @@
+import pytest
+from models.query_language import (
+    And,
+    Not,
+    Or,
+    Term,
+    compile_query,
+    is_query,
+    normalise_query,
+    query_plan,
+)
+
+
+@pytest.mark.parametrize(
+    "text, tree",
+    [
+        (
+            "care OR nursing NOT agency",
+            And((Or((Term("care"), Term("nursing"))), Not(Term("agency")))),
+        ),
+        ('"North  London" tech*', And((Term("north london"), Term("tech", True)))),
+        ("a (b OR c", And((Term("a"), Or((Term("b"), Term("c")))))),
+        ("OR a AND", Term("a")),
+        ("NOT & )", None),
+    ],
+)
+def test_parse(text, tree):
+    plan = query_plan(text)
+    assert (plan and plan.tree) == tree
+
+
+@pytest.mark.parametrize(
+    "text, match, negated",
+    [
+        ("care OR nursing", '("care") OR ("nursing")', False),
+        ("care NOT agency", '("care") NOT ("agency")', False),
+        ("NOT care NOT agency", '("care") OR ("agency")', True),
+        ("care OR NOT agency", '("agency") NOT ("care")', True),
+        ('"north lon"*', '"north lon"*', False),
+    ],
+)
+def test_compile_to_fts(text, match, negated):
+    plan = query_plan(text)
+    assert (plan.match, plan.negated) == (match, negated)
+
+
+def test_plain_text_is_not_a_query():
+    assert not is_query("Smith and Sons Ltd.")
+    assert is_query("smith AND sons")
+    assert is_query('"smith"')
+    assert is_query("smi*")
+    assert is_query("(care OR nursing) leeds")
+    assert is_query('"north london" AND care')
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Acme (UK) Ltd",
+        'O\'Neil "Care" Ltd',
+        '"north lon',
+        "care OR",
+        "(care OR nursing",
+        "care) OR nursing",
+        "NOT",
+    ],
+)
+def test_names_and_broken_queries_are_plain_text(text):
+    assert not is_query(text)
+
+
+def test_plans_cached_by_normalised_query():
+    assert normalise_query("Care   OR (Nursing") == "care OR ( nursing )"
+    compile_query.cache_clear()
+    query_plan("care OR nursing")
+    query_plan("Care  OR  NURSING")
+    info = compile_query.cache_info()
+    assert (info.hits, info.misses) == (1, 1)
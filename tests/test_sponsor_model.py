@@ -1,7 +1,62 @@
 import os
 import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
-from models.sponsor_model import CSVManager
+from models.sponsor_model import CSVManager, IngestCancelled, find_csv_link
+
+CSV_HREF = "/media/2025-06-01_-_Worker_and_Temporary_Worker.csv"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the gov.uk publication page and asset host"""
+
+    CSV_BODY = b"Organisation Name,Town/City\nTest Company,London\n" * 50
+    ETAG = '"v1"'
+    base_url = ""
+    statuses = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.path == "/publication":
+            href = self.base_url + CSV_HREF
+            body = f'<html><body><a href="{href}">csv</a></body></html>'.encode()
+            return self.reply(200, body)
+        if self.path != CSV_HREF:
+            return self.reply(404, b"")
+        if self.headers.get("If-None-Match") == self.ETAG:
+            return self.reply(304, b"")
+        range_header = self.headers.get("Range")
+        if range_header and self.headers.get("If-Range") == self.ETAG:
+            start = int(range_header.split("=")[1].rstrip("-"))
+            if start >= len(self.CSV_BODY):
+                return self.reply(416, b"")
+            return self.reply(206, self.CSV_BODY[start:])
+        return self.reply(200, self.CSV_BODY)
+
+    def reply(self, status, body):
+        type(self).statuses.append(status)
+        self.send_response(status)
+        self.send_header("ETag", self.ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def csv_server(csv_manager):
+    """Serves the stand-in and points csv_manager at it"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    StandInHandler.base_url = f"http://127.0.0.1:{server.server_port}"
+    StandInHandler.statuses = []
+    csv_manager.uk_sponsors_url = StandInHandler.base_url + "/publication"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield StandInHandler
+    server.shutdown()
+    server.server_close()
 
 
 @pytest.fixture
@@ -48,7 +103,7 @@ def test_is_csv_outdated_when_recent_file(csv_manager):
     ), "❌ is_csv_outdated() should return False if the file is recent."
 
 
-def test_download_csv_creates_file(csv_manager):
+def test_download_csv_creates_file(csv_manager, csv_server):
     if os.path.exists(csv_manager.csv_file):
         os.remove(csv_manager.csv_file)
     csv_manager.download_csv()
@@ -58,6 +113,8 @@ def test_download_csv_creates_file(csv_manager):
     with open(csv_manager.csv_file, "r", encoding="utf-8") as f:
         content = f.read()
     assert len(content) > 0, "❌ download_csv() produced an empty file."
+    assert content.encode() == csv_server.CSV_BODY
+    assert not os.path.exists(csv_manager.part_file), "❌ .part file left behind"
 
     # def test_reload_csv(csv_manager):
     #     csv_manager.download_csv()
@@ -70,3 +127,76 @@ def test_download_csv_creates_file(csv_manager):
     #     )
 
     print("✅ CSV Download tests passed")
+
+
+def make_outdated(path):
+    old_time = os.path.getmtime(path) - 60 * 60 * 24 * 100
+    os.utime(path, (old_time, old_time))
+
+
+def test_download_csv_not_modified(csv_manager, csv_server):
+    assert csv_manager.download_csv() is True
+    make_outdated(csv_manager.csv_file)
+
+    assert csv_manager.download_csv() is False, "❌ Unchanged csv was downloaded"
+    assert csv_server.statuses[-1] == 304
+    assert csv_manager.is_csv_outdated() is False, "❌ 304 did not refresh mtime"
+
+
+def test_download_csv_resumes_part_file(csv_manager, csv_server):
+    url = csv_server.base_url + CSV_HREF
+    with open(csv_manager.part_file, "wb") as f:
+        f.write(csv_server.CSV_BODY[:10])
+    csv_manager.save_download_meta(
+        {"part": {"url": url, "etag": csv_server.ETAG, "last_modified": None}}
+    )
+
+    assert csv_manager.download_csv() is True
+    assert csv_server.statuses[-1] == 206, "❌ Download was not resumed"
+    with open(csv_manager.csv_file, "rb") as f:
+        assert f.read() == csv_server.CSV_BODY
+
+
+def test_download_csv_restarts_stale_part_file(csv_manager, csv_server):
+    url = csv_server.base_url + CSV_HREF
+    with open(csv_manager.part_file, "wb") as f:
+        f.write(csv_server.CSV_BODY + b"left over from an older file")
+    csv_manager.save_download_meta(
+        {"part": {"url": url, "etag": csv_server.ETAG, "last_modified": None}}
+    )
+
+    assert csv_manager.download_csv() is True
+    assert csv_server.statuses[-2:] == [416, 200], "❌ Download was not restarted"
+    with open(csv_manager.csv_file, "rb") as f:
+        assert f.read() == csv_server.CSV_BODY
+    assert not os.path.exists(csv_manager.part_file), "❌ .part file left behind"
+
+
+def test_download_csv_cancelled(csv_manager, csv_server):
+    with pytest.raises(IngestCancelled):
+        csv_manager.download_csv(cancelled=lambda: True)
+    assert not os.path.exists(csv_manager.csv_file), "❌ Cancelled download saved"
+    assert csv_manager.load_download_meta()["part"]["etag"] == csv_server.ETAG
+
+
+def test_find_csv_link_in_saved_page():
+    fixture = os.path.join(
+        os.path.dirname(__file__), "fixtures", "register_of_licensed_sponsors.html"
+    )
+    with open(fixture, "r", encoding="utf-8") as f:
+        html = f.read()
+    chunks = (html[i : i + 4096] for i in range(0, len(html), 4096))
+    link = find_csv_link(chunks)
+    assert link.endswith("2025-06-04_-_Worker_and_Temporary_Worker.csv")
+    assert find_csv_link(["<a href='/other.csv'>x</a>"]) is None
+
+
+def test_csv_link_is_cached(csv_manager, csv_server):
+    first = csv_manager.get_latest_csv_link()
+    second = csv_manager.get_latest_csv_link()
+    assert first == second == csv_server.base_url + CSV_HREF
+    assert len(csv_server.statuses) == 1, "❌ Cached link fetched the page again"
+
+    csv_manager.link_ttl = 0
+    csv_manager.get_latest_csv_link()
+    assert len(csv_server.statuses) == 2, "❌ Expired link was not resolved again"
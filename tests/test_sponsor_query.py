@@ -0,0 +1,520 @@
+import random
+import string
+import pytest
+from conftest import write_csv
+from models.applications_model import ApplicationsModel
+from models.sponsor_query import (
+    CountCache,
+    KeysetPager,
+    RELEVANCE,
+    SponsorFilter,
+    SponsorQueryBuilder,
+    SponsorSort,
+)
+from models.transform_model import SORT_COLUMNS
+
+ROWS = [
+    "Acme Care Ltd,London,Greater London,Worker (A rating),Skilled Worker",
+    "North London Nursing,London,,Worker (A rating),Skilled Worker",
+    "BioTechnica Ltd,Cambridge,Cambridgeshire,Worker (B rating),Skilled Worker",
+    "Leeds Tech Solutions,Leeds,West Yorkshire,Worker (A rating),Global Business Mobility",
+]
+
+
+def run(conn, sponsor_filter, after=None, limit=50):
+    builder = SponsorQueryBuilder(conn)
+    query, params, count_query, count_params = builder.build(
+        sponsor_filter, after, limit
+    )
+    rows = conn.execute(query, params).fetchall()
+    total = conn.execute(count_query, count_params).fetchone()[0]
+    return [row[0] for row in rows], total
+
+
+def query_plan(conn, query, params):
+    return " ".join(
+        row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)
+    )
+
+
+def test_filter_uses_trigram_index(register):
+    _, conn = register
+    builder = SponsorQueryBuilder(conn)
+    assert builder.has_fts, "❌ sponsors_fts was not built on import"
+    assert builder.has_trigram, "❌ sponsors_trigram was not built on import"
+
+    query, params, _, _ = builder.build(SponsorFilter(organisation="care"), None, 50)
+    plan = query_plan(conn, query, params)
+    assert "VIRTUAL TABLE INDEX" in plan, f"❌ Trigram index not used: {plan}"
+
+
+def test_substring_filters(register):
+    _, conn = register
+    assert run(conn, SponsorFilter(organisation="north lon")) == (
+        ["North London Nursing"],
+        1,
+    )
+    assert run(conn, SponsorFilter(city="lond", organisation="care")) == (
+        ["Acme Care Ltd"],
+        1,
+    )
+    assert run(conn, SponsorFilter(organisation="b"))[0] == ["BioTechnica Ltd"]
+    assert run(conn, SponsorFilter(organisation="TECH"))[0] == [
+        "BioTechnica Ltd",
+        "Leeds Tech Solutions",
+    ], "❌ Mid-word match lost"
+
+
+def test_fts_follows_delta_import(register):
+    transform_db, conn = register
+    write_csv(transform_db.csv_path, ROWS[1:] + ["Carewell Homes,Bath,,x,y"])
+    transform_db.import_csv()
+
+    names, total = run(conn, SponsorFilter(organisation="care"))
+    assert names == ["Carewell Homes"] and total == 1, "❌ FTS out of sync"
+
+
+def test_filters_without_search_indexes(register):
+    _, conn = register
+    conn.execute("DROP TABLE sponsors_trigram")
+    assert SponsorQueryBuilder(conn).has_trigram is False
+    assert run(conn, SponsorFilter(organisation="tech"))[1] == 2
+
+
+@pytest.mark.parametrize(
+    "organisation, expected",
+    [
+        ("care OR nursing NOT acme", ["North London Nursing"]),
+        ('"london nursing"', ["North London Nursing"]),
+        ("bio*", ["BioTechnica Ltd"]),
+        ("(tech OR care) Ltd", ["Acme Care Ltd"]),
+        ("NOT ltd", ["Leeds Tech Solutions", "North London Nursing"]),
+    ],
+)
+def test_organisation_queries(register, organisation, expected):
+    _, conn = register
+    sponsor_filter = SponsorFilter(organisation=organisation)
+    assert run(conn, sponsor_filter) == (expected, len(expected))
+    query, params, _, _ = SponsorQueryBuilder(conn).build(sponsor_filter, None, 50)
+    plan = query_plan(conn, query, params)
+    assert "sponsors_fts VIRTUAL TABLE" in plan, f"❌ Word index not used: {plan}"
+
+
+@pytest.mark.parametrize(
+    "register",
+    [ROWS + ["Acme (UK) Ltd,London,,Worker (A rating),Skilled Worker"]],
+    indirect=True,
+)
+def test_bracketed_name_matched_as_text(register):
+    _, conn = register
+    # Part of the name as typed, not whole words
+    assert run(conn, SponsorFilter(organisation="cme (UK) Lt")) == (
+        ["Acme (UK) Ltd"],
+        1,
+    )
+
+
+def test_organisation_queries_without_word_index(register):
+    _, conn = register
+    conn.execute("DROP TABLE sponsors_fts")
+    assert run(conn, SponsorFilter(organisation="care OR nursing NOT acme")) == (
+        ["North London Nursing"],
+        1,
+    )
+
+
+def test_query_cache_key():
+    def key(organisation):
+        return SponsorFilter(organisation=organisation).cache_key
+
+    assert key("Care  OR nursing") == key("care OR Nursing")
+    assert key("care OR nursing") != key("care or nursing")
+
+
+def test_trigram_matches_like_scan(import_register):
+    """The trigram path must return exactly the rows of the LIKE '%x%' scan"""
+    rng = random.Random(3)
+    words = ["Care", "tech", "BIO", "Nursing", "o'Neil", "St.", "Ltd", "Ümlaut"]
+    cities = ["London", "LONDON", "London.", "Greater London", "EC1A"]
+    rows = []
+    for i in range(5000):
+        name = " ".join(rng.choice(words) for _ in range(3)) + f" {i}"
+        rows.append(f"{name},{rng.choice(cities)},,Worker (A rating),Skilled Worker")
+    needles = ["car", "ECH", "bio n", "o'n", "ndon.", "ümla", "ltd 12", "st. c"]
+    for _ in range(40):
+        row = rng.choice(rows)
+        start = rng.randrange(len(row) - 8)
+        needles.append(row[start : start + rng.randint(3, 8)].strip())
+
+    _, conn = import_register(rows)
+    indexed = SponsorQueryBuilder(conn)
+    scan = SponsorQueryBuilder(conn)
+    scan.has_trigram = False
+    for needle in needles:
+        for sponsor_filter in (
+            SponsorFilter(organisation=needle),
+            SponsorFilter(city=needle),
+        ):
+            results = []
+            for builder in (indexed, scan):
+                query, params, _, _ = builder.build(sponsor_filter, None, 10**6)
+                results.append(sorted(conn.execute(query, params)))
+            assert results[0] == results[1], f"❌ Mismatch for {needle!r}"
+
+
+@pytest.fixture(name="large_register", scope="module")
+def make_large_register(import_register):
+    """Connection to a 6000-row register of random names and cities"""
+    rng = random.Random(14)
+
+    def word():
+        return "".join(rng.choice(string.ascii_lowercase) for _ in range(7)).title()
+
+    cities = [word() for _ in range(200)]
+    rows = [
+        f"{word()} {word()},{rng.choice(cities)},,Worker (A rating),Skilled Worker"
+        for _ in range(6000)
+    ]
+    rows += ["Duplicate Name Ltd,Leeds,,Worker (A rating),Skilled Worker"] * 120
+    _, conn = import_register(rows)
+    return conn
+
+
+@pytest.mark.parametrize(
+    "sponsor_filter, index",
+    [
+        (SponsorFilter(organisation="B"), "idx_sponsors_organisation_name_norm"),
+        (SponsorFilter(city="q"), "idx_sponsors_city_id"),
+        (SponsorFilter(city="LEEDS.", exact_city=True), "idx_sponsors_city_id"),
+    ],
+)
+def test_prefix_and_exact_filters_use_norm_index(large_register, sponsor_filter, index):
+    conn = large_register
+    builder = SponsorQueryBuilder(conn)
+    assert builder.has_norm, "❌ Normalised columns were not built on import"
+    assert builder.has_cities, "❌ City table was not built on import"
+    query, params, count_query, count_params = builder.build(sponsor_filter, None, 50)
+    for plan in (
+        query_plan(conn, query, params),
+        query_plan(conn, count_query, count_params),
+    ):
+        assert (
+            "SEARCH sponsors USING" in plan and index in plan
+        ), f"❌ {index} not used: {plan}"
+
+
+def test_exact_city_filter(register):
+    _, conn = register
+    sponsor_filter = SponsorFilter.from_inputs("", '  " leeds " ')
+    assert sponsor_filter == SponsorFilter(city="leeds", exact_city=True)
+    assert run(conn, sponsor_filter) == (["Leeds Tech Solutions"], 1)
+    assert run(conn, SponsorFilter(city="Lond", exact_city=True))[1] == 0
+    assert run(conn, SponsorFilter(city="l"))[1] == 3
+    # Spellings of a city match it, from anywhere in the register
+    assert run(conn, SponsorFilter(city="LEEDS.", exact_city=True))[1] == 1
+    assert run(conn, SponsorFilter(city="Greater London", exact_city=True))[1] == 2
+
+
+@pytest.mark.parametrize(
+    "register",
+    [
+        ROWS
+        + [
+            "Manc Ltd,Greater Manchester,,Worker (A rating),Skilled Worker",
+            "Manc Two,MANCHESTER.,,Worker (A rating),Skilled Worker",
+        ]
+    ],
+    indirect=True,
+)
+def test_city_prefix_matches_spellings(register):
+    _, conn = register
+    # "Greater Manchester" is a spelling of Manchester, keyed "manchester"
+    assert run(conn, SponsorFilter(city="g")) == (["Manc Ltd", "Manc Two"], 2)
+    assert run(conn, SponsorFilter(city="M")) == (["Manc Ltd", "Manc Two"], 2)
+    # Punctuation has no key, it matches no city
+    assert run(conn, SponsorFilter(city="."))[1] == 0
+
+
+def test_city_names(register):
+    _, conn = register
+    names = SponsorQueryBuilder(conn).city_names()
+    assert names[0] == "London" and set(names) == {"London", "Cambridge", "Leeds"}
+
+
+def test_facet_filters(register):
+    _, conn = register
+    b_rated = ("type_and_rating", "Worker (B rating)")
+    assert run(conn, SponsorFilter(facets=(b_rated,)))[0] == ["BioTechnica Ltd"]
+    london_a_rated = SponsorFilter(
+        city="london", facets=(("type_and_rating", "Worker (A rating)"),)
+    )
+    assert run(conn, london_a_rated)[1] == 2
+    assert run(conn, SponsorFilter(facets=(("county", ""),)))[0] == [
+        "North London Nursing"
+    ]
+    with pytest.raises(ValueError):
+        SponsorFilter(facets=(("organisation_name", "Acme Care Ltd"),))
+
+
+def test_facet_counts(register):
+    _, conn = register
+    a_rated = SponsorFilter(facets=(("type_and_rating", "Worker (A rating)"),))
+    counts = SponsorQueryBuilder(conn).facet_counts(a_rated)
+    assert counts["route"] == [("Global Business Mobility", 1), ("Skilled Worker", 2)]
+    assert counts["county"] == [("", 1), ("Greater London", 1), ("West Yorkshire", 1)]
+    # A facet is counted without its own selection, its other values stay listed
+    assert counts["type_and_rating"] == [
+        ("Worker (A rating)", 3),
+        ("Worker (B rating)", 1),
+    ]
+
+
+def test_facet_counts_follow_text_filters(register):
+    _, conn = register
+    builder = SponsorQueryBuilder(conn)
+    counts = builder.facet_counts(SponsorFilter(organisation="ltd"))
+    assert counts["county"] == [("Cambridgeshire", 1), ("Greater London", 1)]
+    b_rated = SponsorFilter(
+        organisation="ltd", facets=(("type_and_rating", "Worker (B rating)"),)
+    )
+    counts = builder.facet_counts(b_rated)
+    assert counts["county"] == [("Cambridgeshire", 1)]
+    assert counts["type_and_rating"] == [
+        ("Worker (A rating)", 1),
+        ("Worker (B rating)", 1),
+    ]
+    # Fuzzy matches are not counted, the other filters are
+    fuzzy = SponsorFilter(organisation="acme", city="leeds", fuzzy=True)
+    assert builder.facet_counts(fuzzy)["route"] == [("Global Business Mobility", 1)]
+
+
+def test_applied_filters(register):
+    transform_db, conn = register
+    assert run(conn, SponsorFilter(applied=True))[1] == 0
+    assert run(conn, SponsorFilter(applied=False))[1] == 4
+    applications = ApplicationsModel(db_path=transform_db.db_path)
+    for org, city in [("Acme Care Ltd", "London"), ("Acme Care Ltd", "Leeds")]:
+        applications.add_application(
+            org, city, role="Nurse", date="2024-07-01", contact="", note=""
+        )
+    assert run(conn, SponsorFilter(applied=True)) == (["Acme Care Ltd"], 1)
+    assert run(conn, SponsorFilter(city="london", applied=False)) == (
+        ["North London Nursing"],
+        1,
+    )
+    assert run(conn, SponsorFilter(applied=False))[1] == 3
+
+
+def walk_pages(conn, sponsor_filter, page_size, sort=SponsorSort()):
+    """Pages forward to the end and back to the start with a KeysetPager"""
+    builder = SponsorQueryBuilder(conn)
+    pager = KeysetPager(page_size, sort)
+
+    def load():
+        query, params, _, _ = builder.build(
+            sponsor_filter, pager.after, pager.limit, sort
+        )
+        return pager.record(conn.execute(query, params).fetchall())
+
+    forward = [load()]
+    while pager.next():
+        forward.append(load())
+    assert pager.next() is False, "❌ Paged past the last page"
+    backward = [forward[-1]]
+    while pager.prev():
+        backward.append(load())
+    return forward, backward[::-1]
+
+
+@pytest.mark.parametrize(
+    "sponsor_filter",
+    [SponsorFilter(), SponsorFilter(city="leeds", exact_city=True)],
+)
+def test_keyset_pages(large_register, sponsor_filter):
+    conn = large_register
+    query, params, _, _ = SponsorQueryBuilder(conn).build(sponsor_filter, None, 10**6)
+    expected = [row[:-1] for row in conn.execute(query, params)]
+    names = [row[0] for row in expected]
+    assert names == sorted(names), "❌ Rows are not in sort key order"
+
+    forward, backward = walk_pages(conn, sponsor_filter, 50)
+    assert [row for page in forward for row in page] == expected
+    assert backward == forward, "❌ Previous pages differ from the first visit"
+    assert all(len(page) == 50 for page in forward[:-1])
+
+
+def test_applied_pages(large_register):
+    conn = large_register
+    db_path = conn.execute("PRAGMA database_list").fetchone()[2]
+    ApplicationsModel(db_path=db_path)
+    with conn:
+        conn.execute(
+            "INSERT INTO applications (organisation_name, city) "
+            "SELECT organisation_name, town_city FROM sponsors WHERE id % 100 = 0"
+        )
+    try:
+        builder = SponsorQueryBuilder(conn)
+        for applied in (True, False):
+            sponsor_filter = SponsorFilter(applied=applied)
+            query, params, count_query, count_params = builder.build(
+                sponsor_filter, None, 10**6
+            )
+            expected = [row[:-1] for row in conn.execute(query, params)]
+            forward, _ = walk_pages(conn, sponsor_filter, 50)
+            assert [row for page in forward for row in page] == expected
+            total = conn.execute(count_query, count_params).fetchone()[0]
+            assert total == len(expected) > 0
+            # The few applied sponsors are looked up by id, not probed per sponsor
+            plan = query_plan(conn, count_query, count_params)
+            assert "idx_applications_org_city" in plan, f"❌ Index not used: {plan}"
+            assert "SEARCH sponsors USING INTEGER PRIMARY KEY" in plan, plan
+            assert "SEARCH applications" not in plan, f"❌ Probed per row: {plan}"
+    finally:
+        with conn:
+            conn.execute("DROP TABLE applications")
+
+
+def test_keyset_page_plan(large_register):
+    conn = large_register
+    query, params, _, _ = SponsorQueryBuilder(conn).build(SponsorFilter(), ("M", 1), 51)
+    plan = query_plan(conn, query, params)
+    assert "idx_sponsors_organisation_name" in plan, f"❌ Seek not indexed: {plan}"
+    assert "TEMP B-TREE" not in plan, f"❌ Page is sorted: {plan}"
+
+
+@pytest.mark.parametrize(
+    "sponsor_filter, sort",
+    [
+        (SponsorFilter(), SponsorSort(descending=True)),
+        (SponsorFilter(), SponsorSort("town_city")),
+        (SponsorFilter(organisation="a"), SponsorSort("county", descending=True)),
+    ],
+)
+def test_sorted_keyset_pages(large_register, sponsor_filter, sort):
+    conn = large_register
+    builder = SponsorQueryBuilder(conn)
+    query, params, _, _ = builder.build(sponsor_filter, None, 10**6, sort)
+    rows = conn.execute(query, params).fetchall()
+    keys = [sort.bookmark(row) for row in rows]
+    assert keys == sorted(keys, reverse=sort.descending), "❌ Rows out of order"
+
+    forward, backward = walk_pages(conn, sponsor_filter, 50, sort)
+    assert [row for page in forward for row in page] == [row[:-1] for row in rows]
+    assert backward == forward, "❌ Previous pages differ from the first visit"
+
+
+@pytest.mark.parametrize("trigram", [True, False])
+def test_relevance_ranking(register, trigram):
+    transform_db, conn = register
+    names = [
+        "Bamazonia Ltd",
+        "Zebra Amazon Logistics",
+        "Amazon UK Services Ltd",
+        "Amazon",
+        "Amazonas Trading",
+    ]
+    write_csv(transform_db.csv_path, [f"{name},London,,x,y" for name in names])
+    transform_db.import_csv()
+    if not trigram:
+        conn.execute("DROP TABLE sponsors_trigram")
+    builder = SponsorQueryBuilder(conn)
+    sponsor_filter = SponsorFilter(organisation="AMAZON")
+    query, params, _, _ = builder.build(
+        sponsor_filter, None, 50, SponsorSort(RELEVANCE)
+    )
+    rows = conn.execute(query, params).fetchall()
+    assert [row[0] for row in rows][0] == "Amazon"
+    ranks = conn.execute(*builder.rank_query(sponsor_filter)).fetchall()
+    assert [row[-1] for row in rows] == [row[-1] for row in ranks]
+    assert [row[0] for row in ranks] == [0, 1, 1, 2, 3], "❌ Not ranked by tier"
+    # Ties are broken by bm25 with the trigram index, shorter names first
+    assert [row[1] < 0 for row in ranks] == [trigram] * 5
+
+
+@pytest.mark.parametrize("organisation", ["qu", "name", "a* OR b*"])
+def test_relevance_keyset_pages(large_register, organisation):
+    conn = large_register
+    sort = SponsorSort(RELEVANCE)
+    sponsor_filter = SponsorFilter(organisation=organisation)
+    query, params, count_query, count_params = SponsorQueryBuilder(conn).build(
+        sponsor_filter, None, 10**6, sort
+    )
+    rows = conn.execute(query, params).fetchall()
+    keys = [sort.bookmark(row) for row in rows]
+    assert keys == sorted(keys), "❌ Rows out of order"
+    assert len(rows) == conn.execute(count_query, count_params).fetchone()[0] > 50
+
+    forward, backward = walk_pages(conn, sponsor_filter, 50, sort)
+    assert [row for page in forward for row in page] == [row[:5] for row in rows]
+    assert backward == forward, "❌ Previous pages differ from the first visit"
+
+
+def test_relevance_page_plan(large_register):
+    conn = large_register
+    builder = SponsorQueryBuilder(conn)
+    ranked = builder.ranked_ids(SponsorFilter(organisation="name"))
+    query, params = builder.ranked_page(ranked, (100, 0, "", 0), 51)
+    plan = query_plan(conn, query, params)
+    assert "SCAN ranked" in plan and "SEARCH sponsors USING INTEGER PRIMARY KEY" in plan
+    rows = conn.execute(query, params).fetchall()
+    assert [row[-1] for row in rows] == ranked[101:152].tolist()
+    assert [row[5] for row in rows] == list(range(101, 101 + len(rows)))
+
+
+@pytest.mark.parametrize("column", SORT_COLUMNS)
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_page_plan(large_register, column, descending):
+    conn = large_register
+    sort = SponsorSort(column, descending)
+    query, params, _, _ = SponsorQueryBuilder(conn).build(
+        SponsorFilter(), ("M", "M", 1), 51, sort
+    )
+    plan = query_plan(conn, query, params)
+    assert f"idx_sponsors_{column}_sort" in plan, f"❌ Seek not indexed: {plan}"
+    assert "TEMP B-TREE" not in plan, f"❌ Page is sorted: {plan}"
+
+
+def test_unknown_sort_column():
+    with pytest.raises(ValueError):
+        SponsorSort("id; DROP TABLE sponsors")
+
+
+@pytest.mark.parametrize(
+    "sponsor_filter",
+    [
+        SponsorFilter(),
+        SponsorFilter(organisation="a"),
+        SponsorFilter(city="ab"),
+    ],
+)
+def test_estimate_count(large_register, sponsor_filter):
+    builder = SponsorQueryBuilder(large_register)
+    _, _, count_query, count_params = builder.build(sponsor_filter, None, 1)
+    exact = large_register.execute(count_query, count_params).fetchone()[0]
+    estimate = builder.estimate_count(sponsor_filter)
+    assert abs(estimate - exact) <= max(exact * 0.2, 10), f"❌ {estimate} vs {exact}"
+
+
+def test_count_cache():
+    cache = CountCache(max_entries=2)
+    first = SponsorFilter(organisation="Care").cache_key
+    assert first == SponsorFilter(organisation="cARE").cache_key
+    cache.put(1, first, 10)
+    cache.put(1, SponsorFilter(city="x").cache_key, 20)
+    assert cache.get(1, first) == 10
+    cache.put(1, SponsorFilter(city="y").cache_key, 30)
+    assert cache.get(1, first) == 10, "❌ Recently used count was dropped"
+    assert cache.get(1, SponsorFilter(city="x").cache_key) is None
+    assert cache.get(2, first) is None, "❌ Count survived a new import"
+    cache.put(2, SponsorFilter(city="y").cache_key, 31)
+    assert cache.get(1, first) is None
+
+
+def test_builder_reads_import_generation(register):
+    transform_db, conn = register
+    builder = SponsorQueryBuilder(conn)
+    generation = builder.generation
+    write_csv(transform_db.csv_path, ROWS[1:])
+    transform_db.import_csv()
+    builder.refresh()
+    assert builder.generation == generation + 1
@@ -0,0 +1,26 @@
+import os
+import sys
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAZY_MODULES = {"pandas", "numpy", "requests", "bs4", "markdown2"}
+
+
+def test_heavy_modules_not_imported_on_startup(tmp_path):
+    """main must not import dependencies that are only needed by ingest/updates"""
+    env = dict(os.environ, HOME=str(tmp_path), PYTHONPATH=ROOT)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    imported = {
+        line.split("|")[-1].strip().split(".")[0]
+        for line in result.stderr.splitlines()
+        if line.startswith("import time:")
+    }
+    eager = LAZY_MODULES & imported
+    assert not eager, f"❌ Imported on startup: {sorted(eager)}"
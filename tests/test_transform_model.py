@@ -1,22 +1,26 @@
+import json
 import os
 import sqlite3
-import tempfile
 import pytest
-from models.transform_model import TransformDB
+from conftest import register_db
+from models.sponsor_model import IngestCancelled
+from models.transform_model import (
+    DERIVED_COLUMNS,
+    ENGINES,
+    FACETS_TABLE,
+    GENERATION_KEY,
+)
 
 
-@pytest.fixture(name="transform_db")
-def make_transform_db():
-    """Fresh transform DB instance with temp files for each test"""
-    with tempfile.TemporaryDirectory() as tempdir:
-        test_db_path = os.path.join(tempdir, "test.db")
-        test_csv_path = os.path.join(tempdir, "test.csv")
-
-        # Create a dummy CSV file for testing
-        with open(test_csv_path, "w", encoding="utf-8") as f:
-            f.write("organisation_name,City,County\nTest Company,London,UK\n")
-
-        yield TransformDB(csv_path=test_csv_path, db_path=test_db_path)
+@pytest.fixture(name="transform_db", params=ENGINES)
+def make_transform_db(request, tmp_path):
+    """Fresh transform DB instance with temp files for each test, for each engine"""
+    return register_db(
+        tmp_path,
+        ["Test Company,London,UK"],
+        header="organisation_name,City,County\n",
+        engine=request.param,
+    )
 
 
 @pytest.fixture(name="db_and_conn")
@@ -56,7 +60,7 @@ def test_save_as_sqlite(db_and_conn):
 
     # Check column names
     cursor.execute("PRAGMA table_info(sponsors)")
-    columns = {col[1] for col in cursor.fetchall()} - {"id"}
+    columns = {col[1] for col in cursor.fetchall()} - {"id", *DERIVED_COLUMNS}
     # raw_cols = pd.read_csv("data/sponsors.csv", encoding="utf-8")
     # print("Raw columns:", raw_cols.columns)
     # print("sql columns: "+str(columns))
@@ -101,3 +105,246 @@ def test_column_names_and_types(transform_db):
         assert col in df.columns, f"❌ Column {col} missing in DataFrame"
 
     print("✅ SQLite transformation tests passed")
+
+
+def test_import_skipped_when_csv_unchanged(transform_db):
+    assert transform_db.import_csv() is True, "❌ First import should run"
+    assert transform_db.import_csv() is False, "❌ Unchanged csv was imported again"
+
+
+def test_import_skipped_when_only_mtime_changed(transform_db):
+    transform_db.import_csv()
+    stat = os.stat(transform_db.csv_path)
+    os.utime(transform_db.csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert transform_db.import_csv() is False, "❌ Same content should not re-import"
+    stored = transform_db.get_stored_fingerprint()
+    assert stored["mtime"] == os.stat(transform_db.csv_path).st_mtime_ns
+
+
+def test_import_runs_when_csv_changed(transform_db):
+    transform_db.import_csv()
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("Other Company,Leeds,West Yorkshire\n")
+
+    assert transform_db.import_csv() is True, "❌ Changed csv was not imported"
+    with sqlite3.connect(transform_db.db_path) as conn:
+        row_count = conn.execute("SELECT COUNT(*) FROM sponsors").fetchone()[0]
+    assert row_count == 2
+
+
+def test_stream_to_sqlite_in_chunks(transform_db):
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("Organisation Name,Town/City,County\n")
+        for i in range(25):
+            f.write(f"Company {i},City {i},\n")
+    transform_db.chunk_size = 4
+
+    columns, chunks = transform_db.read_csv_chunks()
+    assert columns == ["organisation_name", "town_city", "county"]
+    assert max(len(rows) for rows in chunks) == 4
+
+    transform_db.stream_to_sqlite()
+    with sqlite3.connect(transform_db.db_path) as conn:
+        rows = conn.execute(
+            "SELECT organisation_name, town_city, county FROM sponsors ORDER BY id"
+        ).fetchall()
+    assert len(rows) == 25, "❌ Streamed row count mismatch"
+    assert rows[-1] == ("Company 24", "City 24", ""), "❌ Empty cell not kept as ''"
+
+
+def test_delta_import_records_changes(transform_db):
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("organisation_name,City,County\nA Ltd,London,\nB Ltd,Leeds,\n")
+    transform_db.import_csv()
+    with sqlite3.connect(transform_db.db_path) as conn:
+        ids = dict(conn.execute("SELECT organisation_name, id FROM sponsors"))
+
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("organisation_name,City,County\nA Ltd,London,\nC Ltd,Bath,\n")
+    transform_db.import_csv()
+
+    with sqlite3.connect(transform_db.db_path) as conn:
+        names = dict(conn.execute("SELECT organisation_name, id FROM sponsors"))
+        changes = conn.execute(
+            "SELECT change, json_extract(row_data, '$.organisation_name') "
+            "FROM sponsor_changes ORDER BY change"
+        ).fetchall()
+    assert names["A Ltd"] == ids["A Ltd"], "❌ Unchanged row was rewritten"
+    assert set(names) == {"A Ltd", "C Ltd"}
+    assert changes == [("added", "C Ltd"), ("removed", "B Ltd")]
+
+
+def test_generation_bumped_when_sponsors_change(transform_db):
+    def generation():
+        with sqlite3.connect(transform_db.db_path) as conn:
+            row = conn.execute(
+                "SELECT value FROM import_meta WHERE key = ?", (GENERATION_KEY,)
+            ).fetchone()
+        return int(row[0])
+
+    transform_db.import_csv()
+    assert generation() == 1
+    transform_db.import_csv(force=True)
+    assert generation() == 1, "❌ Unchanged import bumped the generation"
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("B Ltd,Leeds,\n")
+    transform_db.import_csv()
+    assert generation() == 2, "❌ Delta import did not bump the generation"
+
+
+def test_facet_counts_follow_delta_import(transform_db):
+    header = "organisation_name,City,County,Type & Rating,Route\n"
+    rows = [
+        "A Ltd,London,Kent,Worker (A rating),Skilled Worker",
+        "B Ltd,Leeds,,Worker (B rating),Skilled Worker",
+        "C Ltd,Bath,Kent,Worker (A rating),Creative Worker",
+    ]
+
+    def facet_counts():
+        with sqlite3.connect(transform_db.db_path) as conn:
+            stored = conn.execute(f"SELECT * FROM {FACETS_TABLE}").fetchall()
+            counted = conn.execute(
+                "SELECT county, type_and_rating, route, COUNT(*) FROM sponsors "
+                "GROUP BY county, type_and_rating, route"
+            ).fetchall()
+        return sorted(stored), sorted(counted)
+
+    for register in (rows, [*rows[1:], rows[0], rows[0]], rows[2:]):
+        with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+            f.write(header + "\n".join(register) + "\n")
+        transform_db.import_csv()
+        stored, counted = facet_counts()
+        assert stored == counted, "❌ Facet counts out of sync with sponsors"
+
+
+def test_city_table_follows_delta_import(transform_db):
+    def cities():
+        with sqlite3.connect(transform_db.db_path) as conn:
+            rows = conn.execute(
+                "SELECT key, id, name, aliases, sponsors FROM sponsor_cities"
+            ).fetchall()
+        return {
+            key: (id_, name, json.loads(aliases), n)
+            for key, id_, name, aliases, n in rows
+        }
+
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write(
+            "organisation_name,Town/City\nA Ltd,London\nB Ltd,LONDON.\n"
+            "C Ltd,Greater London\nD Ltd,London\nE Ltd,Leeds LS1\n"
+        )
+    transform_db.import_csv()
+    before = cities()
+    assert before["london"][1:] == (
+        "London",
+        ["London", "Greater London", "LONDON."],
+        4,
+    ), "❌ Spellings of a city were not merged"
+    assert before["leeds"][1:] == ("Leeds LS1", ["Leeds LS1"], 1)
+
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("F Ltd,leeds\nG Ltd,Bath\n")
+    transform_db.import_csv()
+    after = cities()
+    assert after["leeds"][0] == before["leeds"][0], "❌ City id changed on import"
+    assert after["leeds"][3] == 2 and after["bath"][3] == 1
+    # Spellings as common as each other are in sort order
+    assert after["leeds"][1:3] == ("Leeds LS1", ["Leeds LS1", "leeds"])
+
+
+def test_delta_import_keeps_duplicate_rows(transform_db):
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("organisation_name,City,County\n" + "A Ltd,London,\n" * 2)
+    transform_db.import_csv()
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("A Ltd,London,\n")
+    transform_db.import_csv()
+
+    with sqlite3.connect(transform_db.db_path) as conn:
+        row_count = conn.execute("SELECT COUNT(*) FROM sponsors").fetchone()[0]
+    assert row_count == 3, "❌ Duplicate csv rows were collapsed"
+
+
+def test_schema_change_swaps_in_shadow_table(transform_db):
+    transform_db.import_csv()
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("organisation_name,City,County,Route\nA Ltd,London,,Skilled Worker\n")
+    transform_db.import_csv()
+
+    with sqlite3.connect(transform_db.db_path) as conn:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master")}
+        route = conn.execute("SELECT route FROM sponsors").fetchone()[0]
+    assert "sponsors_shadow" not in tables, "❌ Shadow table left behind"
+    assert "idx_sponsors_row_hash" in tables, "❌ Index missing after swap"
+    assert route == "Skilled Worker"
+
+
+def test_failed_import_keeps_previous_rows(transform_db):
+    transform_db.import_csv()
+
+    def broken_chunks():
+        yield [("B Ltd", "Leeds", "", "Skilled Worker")]
+        raise ValueError("connection dropped")
+
+    with pytest.raises(ValueError):
+        transform_db._store(  # pylint: disable=protected-access
+            transform_db.db_path,
+            ["organisation_name", "city", "county", "route"],
+            broken_chunks(),
+        )
+    with sqlite3.connect(transform_db.db_path) as conn:
+        rows = conn.execute("SELECT organisation_name FROM sponsors").fetchall()
+    assert rows == [("Test Company",)], "❌ Failed import changed the live table"
+
+
+def test_cancelled_import_keeps_previous_rows(transform_db):
+    transform_db.import_csv()
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("B Ltd,Leeds,\n")
+
+    with pytest.raises(IngestCancelled):
+        transform_db.import_csv(cancelled=lambda: True)
+    with sqlite3.connect(transform_db.db_path) as conn:
+        rows = conn.execute("SELECT organisation_name FROM sponsors").fetchall()
+    assert rows == [("Test Company",)], "❌ Cancelled import changed the live table"
+    assert not transform_db.is_import_current(), "❌ Cancelled import was recorded"
+
+
+def test_import_cancelled_after_staging(transform_db):
+    # Cancelled once the rows are staged, while indexing or applying them
+    reported = []
+    with pytest.raises(IngestCancelled):
+        transform_db.import_csv(
+            progress=reported.append, cancelled=lambda: bool(reported)
+        )
+    assert reported, "❌ Cancelled before the rows were staged"
+    with sqlite3.connect(transform_db.db_path) as conn:
+        tables = conn.execute("SELECT name FROM sqlite_master").fetchall()
+    assert ("sponsors",) not in tables, "❌ Cancelled first import was swapped in"
+
+    transform_db.import_csv()
+    with open(transform_db.csv_path, "a", encoding="utf-8") as f:
+        f.write("B Ltd,Leeds,\n")
+    reported.clear()
+    with pytest.raises(IngestCancelled):
+        transform_db.import_csv(
+            progress=reported.append, cancelled=lambda: bool(reported)
+        )
+    with sqlite3.connect(transform_db.db_path) as conn:
+        rows = conn.execute("SELECT organisation_name FROM sponsors").fetchall()
+    assert rows == [("Test Company",)], "❌ Cancelled delta import was applied"
+
+
+def test_readers_agree_on_empty_and_na_cells(transform_db):
+    with open(transform_db.csv_path, "w", encoding="utf-8") as f:
+        f.write("organisation_name,City,County\nNA,,null\nB Ltd,Leeds,\n")
+    table = transform_db.clean_and_transform_csv()
+    if hasattr(table, "itertuples"):
+        rows = list(table.itertuples(index=False, name=None))
+    else:
+        rows = table.rows
+    _, chunks = transform_db.read_csv_chunks()
+    expected = [("NA", "", "null"), ("B Ltd", "Leeds", "")]
+    assert rows == expected, "❌ Whole csv read differs from the native engine"
+    assert [row for chunk in chunks for row in chunk] == expected
@@ -0,0 +1,53 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.update_checker import fetch_latest_release
+
+
+class GitHubStandIn(BaseHTTPRequestHandler):
+    """Local stand-in for the GitHub latest release endpoint"""
+
+    ETAG = '"release-1"'
+    RELEASE = {
+        "tag_name": "v9.9.9",
+        "html_url": "https://github.com/ugurserhattoy/TSA/releases/tag/v9.9.9",
+        "body": "* Faster startup",
+        "assets": [],
+    }
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        if self.headers.get("If-None-Match") == self.ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.RELEASE).encode()
+        self.send_response(200)
+        self.send_header("ETag", self.ETAG)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+@pytest.fixture
+def release_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), GitHubStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/releases/latest"
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_latest_release_with_etag(release_url):
+    release, etag = fetch_latest_release(url=release_url)
+    assert release["tag"] == "v9.9.9"
+    assert "<li>Faster startup</li>" in release["changelog"]
+    assert etag == GitHubStandIn.ETAG
+
+    not_modified, same_etag = fetch_latest_release(etag, url=release_url)
+    assert not_modified is None, "❌ 304 should not return a release"
+    assert same_etag == etag
@@ -0,0 +1,130 @@
+import sqlite3
+import threading
+import time
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from controllers.workers import (
+    CountWorker,
+    IngestWorker,
+    PrefetchWorker,
+    SearchWorker,
+    start_worker,
+)
+from models.sponsor_model import IngestCancelled
+
+# Counts far enough to keep SQLite busy until it is cancelled
+SLOW_QUERY = (
+    "WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n "
+    "WHERE i < 100000000) SELECT COUNT(*) FROM n"
+)
+
+
+class Database:
+    """Stands in for DataManager, each search worker opens its own connection"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def connect_database(self):
+        return sqlite3.connect(self.path, check_same_thread=False)
+
+
+class QuickWorker(QObject):
+    finished = pyqtSignal()
+    failed = pyqtSignal(str)
+
+    def run(self):
+        self.finished.emit()
+
+
+def test_thread_quits_while_gui_thread_waits():
+    # closeEvent waits without running the event loop
+    worker = QuickWorker()
+    thread = start_worker(None, worker)
+    assert thread.wait(5000), "❌ Worker thread never quit"
+
+
+class EndlessIngest:
+    """Stands in for DataManager, its ingest runs until it is cancelled"""
+
+    def prepare_database(self, progress, cancelled):
+        while not cancelled():
+            progress("Importing sponsor register...")
+            time.sleep(0.01)
+        raise IngestCancelled("Import cancelled")
+
+
+def test_ingest_cancelled():
+    worker = IngestWorker(EndlessIngest())
+    failures = []
+    worker.failed.connect(failures.append, Qt.ConnectionType.DirectConnection)
+    thread = start_worker(None, worker)
+    time.sleep(0.1)
+    worker.cancel()
+    assert thread.wait(5000), "❌ Cancelled ingest kept running"
+    assert failures == ["Import cancelled"]
+
+
+def search_worker(tmp_path):
+    worker = SearchWorker(Database(tmp_path / "sponsors.db"))
+    results = []
+    worker.found.connect(lambda *result: results.append(result))
+    worker.failed.connect(lambda *failure: results.append(failure))
+    return worker, results
+
+
+def test_latest_search_found(tmp_path):
+    worker, results = search_worker(tmp_path)
+    worker.supersede(2)
+    worker.search(1, ("SELECT 1", [], None, []))
+    worker.search(2, ("SELECT 2", [], "SELECT 3", []))
+    assert results == [(2, [(2,)], 3)], "❌ Stale search was not skipped"
+    worker.close()
+
+
+def test_failed_search_reported(tmp_path):
+    worker, results = search_worker(tmp_path)
+    worker.supersede(1)
+    worker.search(1, ("SELECT * FROM missing", [], None, []))
+    assert results == [(1, "no such table: missing")]
+    worker.close()
+
+
+def test_running_search_cancelled(tmp_path):
+    worker, results = search_worker(tmp_path)
+    worker.supersede(1)
+    timer = threading.Timer(0.2, worker.supersede, args=(2,))
+    timer.start()
+    start = time.perf_counter()
+    worker.search(1, (SLOW_QUERY, [], None, []))
+    timer.join()
+    assert time.perf_counter() - start < 5, "❌ Stale search kept running"
+    assert not results
+    worker.close()
+
+
+def test_running_count_cancelled(tmp_path):
+    worker = CountWorker(Database(tmp_path / "sponsors.db"))
+    results = []
+    worker.finished.connect(lambda *result: results.append(result))
+    worker.supersede(1)
+    timer = threading.Timer(0.2, worker.supersede, args=(2,))
+    timer.start()
+    start = time.perf_counter()
+    worker.count(1, ("old", SLOW_QUERY, []))
+    timer.join()
+    assert time.perf_counter() - start < 5, "❌ Stale count kept running"
+    worker.count(2, ("new", "SELECT 7", []))
+    assert results == [("new", 7)]
+    worker.close()
+
+
+def test_stale_prefetch_skipped(tmp_path):
+    worker = PrefetchWorker(Database(tmp_path / "sponsors.db"))
+    results = []
+    worker.fetched.connect(lambda *result: results.append(result))
+    worker.supersede(2)
+    worker.prefetch(1, [("old", "SELECT 1", [])])
+    worker.prefetch(2, [("next", "SELECT 2", []), ("prev", "SELECT 3", [])])
+    assert results == [("next", [(2,)]), ("prev", [(3,)])]
+    worker.close()
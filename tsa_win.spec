@@ -13,7 +13,9 @@ a = Analysis(
     hookspath=[],
     runtime_hooks=[],
     hooksconfig={},
-    excludes=[],
+    # Ingest uses the native csv engine, pandas is only needed for the pandas engine.
+    # numpy is bundled for the columnar filter engine.
+    excludes=['pandas'],
     noarchive=False,
     optimize=0,
 )
@@ -1,7 +1,6 @@
-import markdown2
-
-
 def read_md_file_to_html(path):
+    import markdown2  # Imported on use to keep it off the startup path
+
     with open(path, "r", encoding="utf-8") as f:
         md_text = f.read()
     return markdown2.markdown(md_text, extras=["tables"])
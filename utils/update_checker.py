@@ -1,7 +1,5 @@
 import logging
 import platform
-import requests
-import markdown2
 from config import GITHUB_REL
 
 
@@ -9,23 +7,37 @@ system = platform.system()
 logger = logging.getLogger()
 
 
-def fetch_latest_release():
+def fetch_latest_release(etag=None, url=GITHUB_REL):
+    """
+    Fetches the latest release, conditionally if the ETag of the previous
+    response is given.
+
+    Returns:
+        tuple: (release, etag). release is None when GitHub answered
+        304 Not Modified, i.e. the previously fetched release is still the latest.
+    """
+    import requests  # Imported on use to keep it off the startup path
+
+    headers = {"If-None-Match": etag} if etag else {}
     try:
-        rel_response = requests.get(GITHUB_REL, timeout=3)
-        if rel_response.status_code == 200:
-            data = rel_response.json()
-            changelog_md = data.get("body", "")
-            changelog_html = markdown_to_html(changelog_md)
-            return {
-                "tag": data["tag_name"],
-                "asset": find_asset_url(data.get("assets", []), data["html_url"]),
-                "changelog": changelog_html,
-                "html_url": data["html_url"],
-            }
-    except requests.exceptions.HTTPError as http_err:
-        logger.error("❌ [UpdateChecker] HTTP Error: %s", http_err)
+        rel_response = requests.get(url, headers=headers, timeout=3)
+        if rel_response.status_code == 304:
+            return None, etag
+        rel_response.raise_for_status()
+    except requests.exceptions.RequestException as err:
+        logger.error("❌ [UpdateChecker] Request Error: %s", err)
         raise
-    return None
+
+    data = rel_response.json()
+    changelog_md = data.get("body", "")
+    changelog_html = markdown_to_html(changelog_md)
+    release = {
+        "tag": data["tag_name"],
+        "asset": find_asset_url(data.get("assets", []), data["html_url"]),
+        "changelog": changelog_html,
+        "html_url": data["html_url"],
+    }
+    return release, rel_response.headers.get("ETag")
 
 
 def find_asset_url(assets, html_url):
@@ -50,6 +62,8 @@ def find_asset_url(assets, html_url):
 
 
 def markdown_to_html(md_text):
+    import markdown2
+
     return markdown2.markdown(md_text)
 
 
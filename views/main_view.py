@@ -3,22 +3,41 @@ from PyQt6.QtWidgets import (
     QVBoxLayout,
     QHBoxLayout,
     QLineEdit,
+    QCheckBox,
+    QComboBox,
     QPushButton,
     QLabel,
     QStackedWidget,
+    QCompleter,
 )
 from PyQt6.QtCore import Qt
 from views.table_view import TableView
 from utils.ui_helpers import button_style
 
+# Facet columns of the sponsor table and their labels
+FACET_LABELS = {
+    "county": "County",
+    "type_and_rating": "Type & Rating",
+    "route": "Route",
+}
+# Shown on the facet lists, the counts follow the applied filter
+FACET_TOOLTIP = "Sponsors matching the other filters, fuzzy organisation searches aside"
+# Applied status filter choices and the SponsorFilter.applied they select
+APPLIED_CHOICES = (("All", None), ("Applied", True), ("Not applied", False))
+
 
 class MainView(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.filter_panel = None
         self.city_input = None
+        self.city_completer = None
         self.org_input = None
+        self.fuzzy_checkbox = None
         self.apply_filter_button = None
+        self.facet_panel = None
+        self.facet_combos = {}
+        self.applied_combo = None
         self.actions_panel = None
         self.back_button = None
         self.edit_button = None
@@ -35,6 +54,7 @@ class MainView(QWidget):
 
     def init_ui(self):
         self.top_layout_sponsor()
+        self.facet_layout_sponsor()
         self.top_layout_applications()
         self.table_sponsor()
         self.table_applications()
@@ -45,6 +65,7 @@ class MainView(QWidget):
         self.sponsor_widget = QWidget()
         sponsor_layout = QVBoxLayout()
         sponsor_layout.addWidget(self.filter_panel)
+        sponsor_layout.addWidget(self.facet_panel)
         sponsor_layout.addWidget(self.sponsor_table)
         sponsor_layout.addWidget(self.sponsor_navigation_widget)
         self.sponsor_widget.setLayout(sponsor_layout)
@@ -72,17 +93,97 @@ class MainView(QWidget):
         filter_layout = QHBoxLayout()
         self.org_input = QLineEdit()
         self.org_input.setPlaceholderText("Filter by Organisation")
+        self.org_input.setToolTip(
+            'Search words with AND, OR and NOT, "exact phrases" and prefixes*, '
+            "e.g. care OR nursing NOT agency"
+        )
+        self.fuzzy_checkbox = QCheckBox("Fuzzy")
+        self.fuzzy_checkbox.setToolTip(
+            "Find similar organisation names despite typos or spelling, "
+            "best matches first"
+        )
         self.city_input = QLineEdit()
         self.city_input.setPlaceholderText("Filter by City")
+        self.city_input.setToolTip(
+            'Type the city in quotes, e.g. "Bath", for an exact match, '
+            "or pick it from the list"
+        )
+        self.city_completer = QCompleter([], self.city_input)
+        self.city_completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+        self.city_completer.setFilterMode(Qt.MatchFlag.MatchContains)
+        self.city_input.setCompleter(self.city_completer)
         self.apply_filter_button = QPushButton("Apply Filter")
         self.apply_filter_button.setStyleSheet(button_style("blue"))
         filter_layout.addWidget(QLabel("Organisation:"))
         filter_layout.addWidget(self.org_input)
+        filter_layout.addWidget(self.fuzzy_checkbox)
         filter_layout.addWidget(QLabel("City:"))
         filter_layout.addWidget(self.city_input)
         filter_layout.addWidget(self.apply_filter_button)
         self.filter_panel.setLayout(filter_layout)
 
+    def facet_layout_sponsor(self):
+        self.facet_panel = QWidget()
+        facet_layout = QHBoxLayout()
+        for column, label in FACET_LABELS.items():
+            combo = QComboBox()
+            combo.addItem("All", None)
+            combo.setToolTip(FACET_TOOLTIP)
+            facet_layout.addWidget(QLabel(f"{label}:"))
+            facet_layout.addWidget(combo, 1)
+            self.facet_combos[column] = combo
+        self.applied_combo = QComboBox()
+        for label, applied in APPLIED_CHOICES:
+            self.applied_combo.addItem(label, applied)
+        facet_layout.addWidget(QLabel("Applied:"))
+        facet_layout.addWidget(self.applied_combo)
+        self.facet_panel.setLayout(facet_layout)
+
+    def set_facet_counts(self, column, counts, selected=None):
+        """
+        Lists the values of a facet with their number of sponsors, keeping
+        the selected value even if no sponsor has it any more.
+        """
+        combo = self.facet_combos[column]
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItem("All", None)
+        for value, count in counts:
+            combo.addItem(f"{value or '(none)'} ({count:,})", value)
+        index = 0
+        if selected is not None:
+            index = combo.findData(selected)
+            if index < 0:
+                combo.addItem(f"{selected or '(none)'} (0)", selected)
+                index = combo.count() - 1
+        combo.setCurrentIndex(index)
+        combo.blockSignals(False)
+
+    def show_facet_counts(self, counts, facets):
+        """
+        Lists each facet's counts (see count_facets) with its applied value
+        selected, facets as SponsorFilter.facets. None disables the facets.
+        """
+        if counts is None:
+            self.facet_panel.setEnabled(False)
+            return
+        self.facet_panel.setEnabled(True)
+        selected = dict(facets)
+        for column, values in counts.items():
+            self.set_facet_counts(column, values, selected.get(column))
+
+    def set_city_names(self, names):
+        """Cities suggested while typing in the city filter"""
+        self.city_completer.model().setStringList(names)
+
+    def selected_facets(self):
+        """(column, value) pairs of the facets not set to All"""
+        return tuple(
+            (column, combo.currentData())
+            for column, combo in self.facet_combos.items()
+            if combo.currentIndex() > 0
+        )
+
     def top_layout_applications(self):
         self.actions_panel = QWidget()
         actions_layout = QHBoxLayout()
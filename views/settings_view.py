@@ -10,18 +10,15 @@ from PyQt6.QtWidgets import (
     QCheckBox,
 )
 from PyQt6.QtCore import pyqtSignal
+from config import FILTER_ENGINES
 
 
 class SettingsUI(QWidget):
-    settings_saved = pyqtSignal(str, int, bool)
+    # log_level, log_rotation_limit, check_for_release, estimate_counts,
+    # filter_engine, keyed as in the settings file
+    settings_saved = pyqtSignal(dict)
 
-    # log_level, rotation_limit, update_check
-    def __init__(
-        self,
-        current_log_level: str,
-        current_rotation_limit: int,
-        current_update_check: bool,
-    ):
+    def __init__(self, current: dict):
         super().__init__()
         self.setWindowTitle("Settings")
 
@@ -29,18 +26,29 @@ class SettingsUI(QWidget):
         self.log_level_label = QLabel("Log Level:")
         self.log_level_combo = QComboBox()
         self.log_level_combo.addItems(["DEBUG", "INFO", "WARNING", "ERROR"])
-        if current_log_level in ["DEBUG", "INFO", "WARNING", "ERROR"]:
-            self.log_level_combo.setCurrentText(current_log_level)
+        if current["log_level"] in ["DEBUG", "INFO", "WARNING", "ERROR"]:
+            self.log_level_combo.setCurrentText(current["log_level"])
 
         # Rotation Limit
         self.rotation_label = QLabel("Log Rotation Limit:")
         self.rotation_spin = QSpinBox()
         self.rotation_spin.setRange(1, 20)
-        self.rotation_spin.setValue(current_rotation_limit)
+        self.rotation_spin.setValue(current["log_rotation_limit"])
 
         # Update Check
         self.update_check_box = QCheckBox("Check for updates on startup")
-        self.update_check_box.setChecked(current_update_check)
+        self.update_check_box.setChecked(current["check_for_release"])
+
+        # Estimated Counts
+        self.estimate_counts_box = QCheckBox("Show estimated result counts first")
+        self.estimate_counts_box.setChecked(current["estimate_counts"])
+
+        # Filter Engine
+        self.filter_engine_label = QLabel("Filter Engine:")
+        self.filter_engine_combo = QComboBox()
+        self.filter_engine_combo.addItems(FILTER_ENGINES)
+        if current["filter_engine"] in FILTER_ENGINES:
+            self.filter_engine_combo.setCurrentText(current["filter_engine"])
 
         # Buttons
         self.save_button = QPushButton("Save")
@@ -56,6 +64,9 @@ class SettingsUI(QWidget):
         form_layout.addWidget(self.rotation_label)
         form_layout.addWidget(self.rotation_spin)
         form_layout.addWidget(self.update_check_box)
+        form_layout.addWidget(self.estimate_counts_box)
+        form_layout.addWidget(self.filter_engine_label)
+        form_layout.addWidget(self.filter_engine_combo)
 
         button_layout = QHBoxLayout()
         button_layout.addWidget(self.save_button)
@@ -65,10 +76,15 @@ class SettingsUI(QWidget):
         self.setLayout(form_layout)
 
     def save_settings(self):
-        log_level = self.log_level_combo.currentText()
-        rotation_limit = self.rotation_spin.value()
-        auto_update_check = self.update_check_box.isChecked()
-        self.settings_saved.emit(log_level, rotation_limit, auto_update_check)
+        self.settings_saved.emit(
+            {
+                "log_level": self.log_level_combo.currentText(),
+                "log_rotation_limit": self.rotation_spin.value(),
+                "check_for_release": self.update_check_box.isChecked(),
+                "estimate_counts": self.estimate_counts_box.isChecked(),
+                "filter_engine": self.filter_engine_combo.currentText(),
+            }
+        )
         QMessageBox.information(
             self, "Settings Saved", "Settings have been saved successfully."
         )
@@ -1,4 +1,6 @@
-from PyQt6.QtWidgets import QTableWidget, QHeaderView
+from PyQt6.QtCore import Qt
+from PyQt6.QtGui import QColor, QBrush
+from PyQt6.QtWidgets import QTableWidget, QTableWidgetItem, QHeaderView
 
 # from config import RES_SETTINGS
 
@@ -14,6 +16,58 @@ class TableView:
         """Allows external code (controller) to react to row double-clicks."""
         self.table.cellDoubleClicked.connect(callback)
 
+    def connect_sort_changed(self, callback):
+        """Header clicks call callback(column, order), the rows are not sorted here."""
+        self.table.horizontalHeader().sortIndicatorChanged.connect(callback)
+
+    def show_sort(self, column, order):
+        """Shows the sort indicator on a column, none for -1, without calling back."""
+        header = self.table.horizontalHeader()
+        header.blockSignals(True)
+        header.setSortIndicator(column, order)
+        header.blockSignals(False)
+
+    def fill_sponsor_rows(self, rows, offset):
+        """Shows a page of sponsor rows, numbered from offset + 1"""
+        self.table.setRowCount(len(rows))
+        self.table.setColumnCount(5)
+        self.table.setHorizontalHeaderLabels(
+            ["Organisation", "City", "County", "Type & Rating", "Route"]
+        )
+        for row_idx, row_data in enumerate(rows):
+            for col_idx, value in enumerate(row_data):
+                item = QTableWidgetItem(str(value))
+                if len(str(value)) > 16:
+                    item.setToolTip(str(value))
+                self.table.setItem(row_idx, col_idx, item)
+        for row_idx in range(len(rows)):
+            item = self.table.verticalHeaderItem(row_idx)
+            if item is None:
+                item = QTableWidgetItem()
+                self.table.setVerticalHeaderItem(row_idx, item)
+            item.setText(str(offset + row_idx + 1))
+
+    def highlight_applied_rows(self, application_pairs):
+        """Colours the rows whose organisation city pair has applications"""
+        for row_idx in range(self.table.rowCount()):
+            org_item = self.table.item(row_idx, 0)
+            city_item = self.table.item(row_idx, 1)
+            if not org_item or not city_item:
+                continue
+            org = org_item.text()
+            city = city_item.text()
+            if (org, city) in application_pairs:  # Applied
+                color = "#2A4520" if row_idx % 2 == 0 else "#49693C"
+                for col in range(self.table.columnCount()):
+                    item = self.table.item(row_idx, col)
+                    if item:
+                        item.setBackground(QColor(color))
+            else:  # Default
+                for col in range(self.table.columnCount()):
+                    item = self.table.item(row_idx, col)
+                    if item:
+                        item.setBackground(QBrush())
+
     def setup_main_table(self) -> None:
         """Sets up the main table"""
         self.table.setColumnCount(5)
@@ -28,6 +82,10 @@ class TableView:
         header = self.table.horizontalHeader()
         header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         # header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        # Sorted by the controller in SQL, a table sort would only order one page
+        header.setSectionsClickable(True)
+        header.setSortIndicatorShown(True)
+        header.setSortIndicator(0, Qt.SortOrder.AscendingOrder)
 
         # Set minimum widths for each column
         # self.table.setColumnWidth(0, 200)  # Organisation